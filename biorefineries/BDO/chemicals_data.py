@@ -19,6 +19,7 @@ All units are explicitly defined here for transparency and easy reference
 # =============================================================================
 
 import thermosteam as tmo
+from biorefineries.chemicals_cache import cached_chemical
 from thermosteam import functional as fn
 from biorefineries import sugarcane as sc
 from chemicals import Antoine_AB_coeffs_from_point
@@ -35,7 +36,7 @@ copied_chemicals_dict = {}
 defined_chemicals_dict = {}
 
 def chemical_database(ID, phase=None, **kwargs):
-    chemical = tmo.Chemical(ID, **kwargs)
+    chemical = cached_chemical(ID, **kwargs)
     if phase:
         chemical.at_state(phase)
         chemical.phase_ref = phase
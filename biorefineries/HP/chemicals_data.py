@@ -23,6 +23,7 @@ All units are explicitly defined here for transparency and easy reference
 # =============================================================================
 
 import thermosteam as tmo
+from biorefineries.chemicals_cache import cached_chemical
 import biorefineries.sugarcane as sc
 from thermosteam import functional as fn
 from biorefineries.sugarcane import chemicals as sugarcane_chems
@@ -43,7 +44,7 @@ copied_chemicals_dict = {}
 defined_chemicals_dict = {}
 
 def chemical_database(ID, phase=None, **kwargs):
-    chemical = tmo.Chemical(ID, **kwargs)
+    chemical = cached_chemical(ID, **kwargs)
     if phase:
         chemical.at_state(phase)
         chemical.phase_ref = phase
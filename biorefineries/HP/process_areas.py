@@ -41,7 +41,8 @@ from math import exp as math_exp, log
 from thermosteam import Stream
 from biorefineries.HP import units
 from biorefineries.HP.process_settings import price, CFs
-from biorefineries.HP.utils import find_split, splits_df
+from biorefineries.HP.utils import find_split, splits_df, StageCountSearch
+from biorefineries.partition_surrogate import PartitionSurrogate
 from biorefineries.HP.chemicals_data import chemical_groups, chems
 # from biorefineries.HP.models.solubility.fit_HP_solubility_in_water_one_parameter_van_laar_activity import get_mol_HP_dissolved, get_HP_solubility_in_water_gpL
 from biosteam import SystemFactory
@@ -319,7 +320,11 @@ def create_HP_fermentation_process(ins, outs,):
                       dict(ID='S404_raffinate', Water=68),
                                 ],
                                                )
-def create_HP_separation_hexanol_extraction_process(ins, outs,):
+def create_HP_separation_hexanol_extraction_process(ins, outs, update_partition_coefficients=False):
+    # If update_partition_coefficients is True, partition coefficients of 
+    # HP, water, and hexanol in S404 are updated before each run with 
+    # update_Ks (through a surrogate of rigorous LLE); otherwise, 
+    # constant partition coefficients at 80 C are used
     
     fermentation_broth, sulfuric_acid_separation, separation_hexanol = ins
     HP_solution, cell_mass, gypsum, F401_t, S404_raffinate = outs
@@ -462,8 +467,6 @@ def create_HP_separation_hexanol_extraction_process(ins, outs,):
         
     @S404.add_specification(run=False)
     def adjust_S404_streams():
-        S404.N_stages = max_N_stages # reset
-        S404._setup() # reset
         feed_hexanol, solvent_recycle = M401.ins
         process_stream = S404.ins[0]
         process_stream_F_mol = process_stream.F_mol
@@ -482,6 +485,10 @@ def create_HP_separation_hexanol_extraction_process(ins, outs,):
         
         M401._run()
         M401_H._run()
+        if update_partition_coefficients:
+            Ks = update_Ks(S404)
+            updated = ~np.isnan(Ks)
+            S404.partition_data['K'][updated] = 1. / Ks[updated]
         S404_run()
         
         if existing_hexanol > reqd_hexanol:
@@ -490,48 +497,42 @@ def create_HP_separation_hexanol_extraction_process(ins, outs,):
         
         for i in S404.outs: i.T = M401_H.outs[0].T
         
+    # Surrogate models of rigorous LLE by lle unit and chemicals in equilibrium
+    partition_surrogates = {}
+    
+    # Return partition coefficients (raffinate over extract) of solute, carrier,
+    # and solvent chemicals (nan for other chemicals in the partition data)
     def update_Ks(lle_unit, solute_indices = (0,), carrier_indices = (1,), solvent_indices = (2,)):
         IDs = lle_unit.partition_data['IDs']
-        # Ks = lle_unit.partition_data['K']
-        Ks = 1./lle_unit.partition_data['K']
         solute_chemicals = tuple([IDs[index] for index in solute_indices])
         carrier_chemicals = tuple([IDs[index] for index in carrier_indices])
         solvent_chemicals = tuple([IDs[index] for index in solvent_indices])
+        chemicals = solute_chemicals + carrier_chemicals + solvent_chemicals
         process_stream = lle_unit.ins[0]
         solvent_stream = lle_unit.ins[1]
         
-        test_stream = bst.Stream('test_stream')
-        test_stream_2 = bst.Stream('test_stream_2')
-        test_stream_2.mix_from([process_stream, solvent_stream])
+        key = (lle_unit, chemicals)
+        if key in partition_surrogates:
+            surrogate = partition_surrogates[key]
+        else:
+            partition_surrogates[key] = surrogate = PartitionSurrogate(
+                chemicals, solvent=solvent_chemicals[0], thermo=lle_unit.thermo,
+            )
+        test_stream = Stream(None, thermo=lle_unit.thermo)
         test_stream.imol[solute_chemicals] = process_stream.imol[solute_chemicals]
         test_stream.imol[carrier_chemicals] = process_stream.imol[carrier_chemicals]
         test_stream.imol[solvent_chemicals] = solvent_stream.imol[solvent_chemicals]
-        test_stream.lle(T=process_stream.T, top_chemical = 'Hexanol')
-        # test_stream.show()
-        Ks_new = (test_stream['l'].imol[IDs]/test_stream['l'].F_mol)/(test_stream['L'].imol[IDs]/test_stream['L'].F_mol)
-        
+        Ks_new = np.full(len(IDs), np.nan)
+        if test_stream.imol[chemicals].sum() == 0.: return Ks_new
+        Ks = surrogate(test_stream, T=process_stream.T) # Extract over raffinate
+        if Ks is not None: Ks_new[[IDs.index(i) for i in chemicals]] = 1. / Ks
         return Ks_new
     
+    # Runs S404 at the largest feasible number of stages, starting from the
+    # last feasible number of stages of previous runs
     def S404_run():
-        try:
-            S404._run()
-            
-            if has_negative_flows(S404):
-                raise InfeasibleRegion('negative flows')
-        except:
-            # import pdb
-            # pdb.set_trace()
-            S404.N_stages-=1
-            if S404.N_stages == 0:
-                S404.N_stages = max_N_stages # reset
-                S404._setup() # reset
-                raise InfeasibleRegion('number of stages in %s'%(S404.ID))   
-            else:
-                S404._setup()
-                # print('\nReduced S404.N_stages to %s\n'%S404.N_stages)
-            S404_run()
+        S404_stage_search()
         
-    
     def has_negative_flows(unit):
         for stream in unit.outs + unit.ins:
             if (stream.mol < 0.).any():
@@ -541,7 +542,9 @@ def create_HP_separation_hexanol_extraction_process(ins, outs,):
     # S404.specification = adjust_S404_streams
     
     S404_spec = S404.specifications[0]
-    globals().update({'S404_spec': S404_spec})
+    S404_stage_search = StageCountSearch(S404, max_N_stages, has_negative_flows)
+    globals().update({'S404_spec': S404_spec, 'S404_stage_search': S404_stage_search,
+                      'update_Ks': update_Ks, 'partition_surrogates': partition_surrogates})
     
     ideal_thermo = S404.thermo.ideal()
     
@@ -22,6 +22,7 @@ All units are explicitly defined here for transparency and easy reference
 import numpy as np
 import pandas as pd
 import thermosteam as tmo
+from biosteam.exceptions import InfeasibleRegion
 from biorefineries.HP.chemicals_data import HP_chemicals
 _kg_per_ton = 907.18474
 
@@ -278,3 +279,129 @@ def get_sugar_conc(stream, sugars=()):
         fermentable_sugar += stream.imass[sugar]
     fermentable_sugar_conc = fermentable_sugar/stream.F_vol    
     return fermentable_sugar_conc
+
+
+# =============================================================================
+# Search for the number of stages of multistage units
+# =============================================================================
+
+class StageCountSearch:
+    """
+    Run a multistage unit (e.g., MultiStageMixerSettlers) at the largest
+    feasible number of stages, assuming that feasibility decreases with
+    the number of stages. The last feasible number of stages is remembered 
+    across runs (e.g., recycle iterations) and verified by probing its 
+    neighbors; the search moves away from it in doubling steps and bisects 
+    once the largest feasible number of stages is bracketed. This replaces 
+    decreasing the number of stages one at a time from the maximum, which 
+    requires a full cascade solve per stage.
+
+    Parameters
+    ----------
+    unit : Unit
+        Multistage unit with an `N_stages` attribute.
+    max_N_stages : int
+        Maximum number of stages.
+    infeasible : Callable[[Unit], bool], optional
+        Return whether the simulated unit is infeasible (e.g., has negative
+        flows). Exceptions raised during simulation are also taken as 
+        infeasible.
+
+    Attributes
+    ----------
+    N_stages : int|None
+        Last feasible number of stages.
+    runs : int
+        Number of runs.
+    solves : int
+        Number of cascade solves.
+    linear_solves : int
+        Number of cascade solves that decreasing the number of stages
+        one at a time from the maximum would have required.
+
+    """
+    __slots__ = ('unit', 'max_N_stages', 'infeasible', 'N_stages',
+                 'runs', 'solves', 'linear_solves')
+
+    def __init__(self, unit, max_N_stages, infeasible=None):
+        self.unit = unit
+        self.max_N_stages = max_N_stages
+        self.infeasible = infeasible
+        self.N_stages = None
+        self.runs = self.solves = self.linear_solves = 0
+
+    @property
+    def saved_solves(self):
+        """[int] Number of cascade solves saved with respect to decreasing
+        the number of stages one at a time from the maximum."""
+        return self.linear_solves - self.solves
+
+    def reset(self):
+        """Forget the last feasible number of stages and clear counts."""
+        self.N_stages = None
+        self.runs = self.solves = self.linear_solves = 0
+
+    def _solve(self, N_stages):
+        unit = self.unit
+        unit.N_stages = N_stages
+        unit._setup()
+        self.solves += 1
+        try:
+            unit._run()
+        except:
+            return False
+        infeasible = self.infeasible
+        return not (infeasible and infeasible(unit))
+
+    def __call__(self):
+        max_N_stages = self.max_N_stages
+        solve = self._solve
+        N_guess = self.N_stages or max_N_stages
+        self.runs += 1
+        feasible = 0 # Largest number of stages known to be feasible (0 if none)
+        infeasible = max_N_stages + 1 # Smallest number of stages known to be infeasible
+        # Probe above the last feasible number of stages first, so that
+        # the last solve is usually the feasible one
+        if N_guess < max_N_stages and solve(N_guess + 1):
+            last = feasible = N_guess + 1
+            step = 2
+            while feasible < max_N_stages:
+                last = N_stages = min(feasible + step, max_N_stages)
+                if solve(N_stages):
+                    feasible = N_stages
+                    step *= 2
+                else:
+                    infeasible = N_stages
+                    break
+        else:
+            if N_guess < max_N_stages: infeasible = N_guess + 1
+            step = 1
+            N_stages = N_guess
+            while True:
+                last = N_stages
+                if solve(N_stages):
+                    feasible = N_stages
+                    break
+                infeasible = N_stages
+                if N_stages == 1: break
+                N_stages = max(N_stages - step, 1)
+                step *= 2
+        while infeasible - feasible > 1:
+            last = N_stages = (feasible + infeasible) // 2
+            if solve(N_stages): feasible = N_stages
+            else: infeasible = N_stages
+        if feasible:
+            self.linear_solves += max_N_stages - feasible + 1
+            if last != feasible: solve(feasible) # Restore solution
+            self.N_stages = feasible
+        else:
+            unit = self.unit
+            self.linear_solves += max_N_stages
+            self.N_stages = None
+            unit.N_stages = max_N_stages # reset
+            unit._setup() # reset
+            raise InfeasibleRegion('number of stages in %s'%(unit.ID))
+
+    def __repr__(self):
+        return (f"<{type(self).__name__}: {self.unit.ID}, N_stages={self.N_stages}, "
+                f"{self.solves} solves, {self.saved_solves} saved>")
@@ -9,9 +9,11 @@
 """
 import os
 import thermosteam as tmo
+from biorefineries.chemicals_cache import persistent_chemical_cache
 
 __all__ = ('create_chemicals',)
 
+@persistent_chemical_cache(files=['chemicals.yaml'])
 def create_chemicals():
     chemical_data_path = os.path.join(os.path.dirname(__file__), 'chemicals.yaml')
     chemical_data = tmo.ThermoData.from_yaml(chemical_data_path)
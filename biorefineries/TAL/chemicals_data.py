@@ -19,6 +19,7 @@ This module is a modified implementation of modules from the following:
 # =============================================================================
 
 import thermosteam as tmo
+from biorefineries.chemicals_cache import cached_chemical
 from thermosteam import functional as fn
 from biorefineries.sugarcane import chemicals as sugarcane_chems
 from biorefineries.cornstover import chemicals as cornstover_chems
@@ -38,7 +39,7 @@ copied_chemicals_dict = {}
 defined_chemicals_dict = {}
 
 def chemical_database(ID, search_ID=None, phase=None, **kwargs):
-    chemical = tmo.Chemical(ID,search_ID=search_ID, **kwargs)
+    chemical = cached_chemical(ID,search_ID=search_ID, **kwargs)
     if phase:
         chemical.at_state(phase)
         chemical.phase_ref = phase
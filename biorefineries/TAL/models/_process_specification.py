@@ -18,6 +18,11 @@ import biosteam as bst
 import flexsolve as flx
 import numpy as np
 from biosteam.exceptions import InfeasibleRegion
+from biorefineries.TRY import (
+    evaluate_across_specs_in_parallel,
+    evaluate_across_specs_along_path,
+    FeasibilityBoundary,
+)
 from biorefineries.TAL.units import compute_TAL_titer, compute_TAL_mass
 # from winsound import Beep
 
@@ -26,7 +31,6 @@ _yellow_text = '\033[1;33m'
 _reset_text = '\033[1;0m'
 
 skip_infeasible_titers = True # if running feedstock carbohydrate/sugar content analysis, set this to False
-last_infeasible_simulation = [] # yield, titer
 
 def get_IDs(units_list):
     return [i.ID for i in units_list]
@@ -41,10 +45,9 @@ _kg_per_ton = 907.18474
 def evaluate_across_specs(spec, system,
             spec_1, spec_2, metrics, spec_3):
     spec.count += 1
-    if skip_infeasible_titers and last_infeasible_simulation:
-        yield_, titer = last_infeasible_simulation
-        if spec_1 <= yield_ and spec_2 >= titer:
-            return np.nan*np.ones([len(metrics), len(spec_3)])
+    infeasible_region = spec.titer_inhibitor_specification.infeasible_region
+    if skip_infeasible_titers and infeasible_region.skip(spec_1, spec_2):
+        return np.nan*np.ones([len(metrics), len(spec_3)])
     if bugfix:
         def reset_and_reload():
             print('Resetting cache and emptying recycles ...')
@@ -122,7 +125,7 @@ def evaluate_across_specs(spec, system,
         if error: raise e1
         str_e1 = str(e1)
         if 'sugar concentration' in str_e1:
-            last_infeasible_simulation[:] = (spec_1, spec_2)
+            infeasible_region.add(spec_1, spec_2)
             print('Infeasible sugar concentration (routine infeasible region error).')
             sugars_tuple = spec.titer_inhibitor_specification.sugars
             reactor_ins_0 = spec.titer_inhibitor_specification.reactor.ins[0]
@@ -344,7 +347,8 @@ class ProcessSpecification(bst.process_tools.ReactorSpecification):
         return data
 
     def evaluate_across_specs(self, system, 
-            spec_1, spec_2, metrics, spec_3):
+            spec_1, spec_2, metrics, spec_3, processes=None, loader=None,
+            path=None):
         
         """
         Evaluate metrics at given titer and yield across a set of 
@@ -360,6 +364,18 @@ class ProcessSpecification(bst.process_tools.ReactorSpecification):
             Should return a number given no parameters.
         productivities : array_like[P elements]
             Productivities to evaluate.
+        processes : int, optional
+            Number of worker processes to split the titer/yield grid across.
+            Defaults to evaluating all points serially in this process.
+        loader : Callable, optional
+            Should return a (spec, system, metrics) tuple given no parameters.
+            Required if `processes` is given; it is called once by each 
+            worker to build its own flowsheet.
+        path : str, optional
+            Order in which to visit titer/yield points; either 'serpentine' 
+            or 'hilbert'. If given, each simulation is seeded with the 
+            converged recycle flows of its nearest already-solved neighbor.
+            Defaults to plain meshgrid order without warm-starting.
         
         Returns
         -------
@@ -383,12 +399,33 @@ class ProcessSpecification(bst.process_tools.ReactorSpecification):
         self.total_iterations = 0
         # self.average_HXN_energy_balance_percent_error = 0.
         self.exceptions_dict = {}
-        
+        infeasible_region = self.titer_inhibitor_specification.infeasible_region
+        infeasible_region.reset()
+        
+        if processes is not None:
+            if loader is None:
+                raise ValueError('a loader is required to evaluate across '
+                                 'specifications in parallel')
+            results, self.count_exceptions, infeasible_region.simulations_avoided = evaluate_across_specs_in_parallel(
+                loader, spec_1, spec_2, spec_3, processes, path=path,
+            )
+            if skip_infeasible_titers:
+                print(f"{infeasible_region.simulations_avoided} simulations avoided in the infeasible region.")
+            return results
         self.total_iterations = len(spec_1) * len(spec_2) * len(spec_3)
-        results = evaluate_across_specs(self, system, 
-                                   spec_1, spec_2, 
-                                   metrics, spec_3)
+        if path is None:
+            results = evaluate_across_specs(self, system, 
+                                       spec_1, spec_2, 
+                                       metrics, spec_3)
+        else:
+            results, scheduler = evaluate_across_specs_along_path(
+                evaluate_across_specs.pyfunc, self, system,
+                spec_1, spec_2, metrics, spec_3, path,
+            )
+            print(f"{scheduler.warm_starts} warm starts, {scheduler.cold_starts} cold starts.")
         self.average_HXN_energy_balance_percent_error /= self.total_iterations
+        if skip_infeasible_titers:
+            print(f"{infeasible_region.simulations_avoided} simulations avoided in the infeasible region.")
         return results
     
     @property
@@ -686,6 +723,10 @@ class TiterAndInhibitorsSpecification:
     
     max_sugar_concentration = 600. # g / L
     
+    #: [bool] Whether to check if the target titer is reachable within the 
+    #: maximum sugar concentration before solving for the evaporation.
+    precheck = True
+    
     def __init__(self, evaporator, pump, mixer, heat_exchanger, seed_train_system, reactor, 
                  target_titer, product,
                  maximum_inhibitor_concentration=1.,
@@ -710,6 +751,7 @@ class TiterAndInhibitorsSpecification:
         self.maximum_inhibitor_concentration = maximum_inhibitor_concentration
         self.get_products_mass = compute_TAL_mass
         self.seed_train_system = seed_train_system
+        self.infeasible_region = FeasibilityBoundary() # learned from infeasible sugar concentrations
         
     @property
     def feed(self):
@@ -749,6 +791,44 @@ class TiterAndInhibitorsSpecification:
         if self.calculate_sugar_concentration() > self.max_sugar_concentration:
             raise InfeasibleRegion('sugar concentration')
     
+    def estimate_V_at_max_sugar_concentration(self):
+        """
+        Return an estimate of the overall molar fraction evaporated at which 
+        the sugar solution reaches the maximum sugar concentration, assuming 
+        only water is evaporated from the current feed.
+        
+        """
+        feed = self.feed
+        if not feed.F_mol: return 0.
+        F_vol_at_max = feed.imass[self.sugars].sum() / self.max_sugar_concentration # m3 / hr
+        water_molar_volume = 1000. * feed.chemicals.Water.V('l', feed.T, feed.P) # m3 / kmol
+        return (feed.F_vol - F_vol_at_max) / (feed.F_mol * water_molar_volume)
+    
+    def precheck_sugar_concentration(self, V_max):
+        """
+        Raise an InfeasibleRegion error if the target titer cannot be reached 
+        without exceeding the maximum sugar concentration. Otherwise, return 
+        the evaporation at the maximum sugar concentration and the titer 
+        objective there (or None if the sugar limit cannot be reached with 
+        evaporation up to `V_max`).
+        
+        Notes
+        -----
+        Titer and sugar concentration both increase with evaporation, so 
+        the target is unreachable if it is not met at the point where the 
+        sugar solution hits the limit. This costs one pass through the unit 
+        path, as opposed to a full solve for the evaporation.
+        
+        """
+        V = self.estimate_V_at_max_sugar_concentration()
+        if V >= V_max: return None
+        if V < 0.: V = 0.
+        y = self.titer_objective_function(V)
+        if self.calculate_sugar_concentration() < self.max_sugar_concentration:
+            return None # Estimate fell short of the limit; nothing can be concluded
+        if y < 0.: raise InfeasibleRegion('sugar concentration')
+        return V, y
+    
     def titer_objective_function(self, V):
         self.evaporator.V = V
         self.run_units()
@@ -763,17 +843,24 @@ class TiterAndInhibitorsSpecification:
     
     def run(self):
         self.dilution_water.empty()
+        # V_min = 0.00001
+        V_min = 0.
+        V_max = 0.9999
+        sugar_limit = self.precheck_sugar_concentration(V_max) if self.precheck else None
         self.evaporator.V = 0.
         self.run_units()
         reactor = self.reactor
         x_titer = self.calculate_titer()
-        # V_min = 0.00001
-        V_min = 0.
-        V_max = 0.9999
         
         if x_titer < self.target_titer: # Evaporate
+            if sugar_limit is None:
+                V_upper = V_max
+                y_upper = None
+            else:
+                V_upper, y_upper = sugar_limit
             self.evaporator.V = V_min = flx.IQ_interpolation(self.titer_objective_function,
-                                                             V_min, V_max, ytol=1e-3, maxiter=200) 
+                                                             V_min, V_upper, x_titer - self.target_titer, y_upper,
+                                                             ytol=1e-3, maxiter=200) 
             self.titer_objective_function(V_min)
         elif x_titer > self.target_titer: # Dilute
             self.update_dilution_water(x_titer)
@@ -9,20 +9,9 @@
 
 import numpy as np
 from math import exp as math_exp
-from scipy.optimize import minimize
-from biorefineries.TAL.models.solubility.plot_utils import plot_solubility_model
-import pandas as pd
-from biorefineries import TAL
+from biorefineries.TAL.models.solubility.fit_utils import load_experimental_data, load_fitted_parameters, save_fitted_parameters, fit_TAL_c
 
-#%% Load experimental 
-
-TAL_filepath = TAL.__file__.replace('\\__init__.py', '')
-
-
-experimental_data_df = pd.read_excel(TAL_filepath+'\\models\\solubility\\'+'experimental_data_TAL_solubility_in_water.xlsx')
-
-experimental_Ts = 273.15 + np.array(list(experimental_data_df['Temperature (degrees C)']))
-experimental_solubilities = np.array(list(experimental_data_df['TAL solubility in water (g-TAL/L-water)']))
+model = 'simplified_one_parameter_margules_activity'
 
 # %% Utils
 R = 8.3145
@@ -45,44 +34,49 @@ def get_mol_TAL_dissolved_for_fit(T, mol_water, TAL_c_fit):
 def get_TAL_solubility_in_water_gpL_for_fit(T, TAL_c_fit):
     return get_mol_TAL_dissolved_for_fit(T, mL_per_L/H2O_molar_volume, TAL_c_fit)*TAL_molar_mass
 
-def get_negative_Rsq(c):
-    TAL_c_fit = c[0]
-    TSS, RSS = 0, 0
-    y_mean = experimental_solubilities.mean()
-    for i in range(len(experimental_Ts)):
-        T = experimental_Ts[i]
-        yi = experimental_solubilities[i]
-        y_pred = get_TAL_solubility_in_water_gpL_for_fit(T, TAL_c_fit)
-        RSS += (yi - y_pred)**2
-        TSS += (yi - y_mean)**2
-    return - (1 - RSS/TSS)
-
-#%% Fit
-res = minimize(fun=get_negative_Rsq, 
-               x0=np.array([1000]), # initial guess
-               )
-TAL_c = res.x
+#%% Fitted parameter (see `refit` to fit again to experimental data)
 
-print(f'\nSolubility model fit to experimental data with R^2 = {round(-get_negative_Rsq(TAL_c), 3)}.\n')
+TAL_c = load_fitted_parameters(model)['TAL_c']
 
-
-def get_TAL_solubility_in_water(T, TAL_c_fit=TAL_c): # mol TAL / mol (TAL+water)
+def get_TAL_solubility_in_water(T, TAL_c_fit=None): # mol TAL / mol (TAL+water)
+    if TAL_c_fit is None: TAL_c_fit = TAL_c
     return math_exp(-(TAL_Hm_by_R) * (1/T - 1/TAL_Tm) -\
                     (TAL_c_fit/(R*T)))
 
-def get_mol_TAL_dissolved(T, mol_water, TAL_c_fit=TAL_c): # mol TAL dissolved in given mol water
+def get_mol_TAL_dissolved(T, mol_water, TAL_c_fit=None): # mol TAL dissolved in given mol water
     TAL_x = get_TAL_solubility_in_water(T, TAL_c_fit)
     return mol_water*TAL_x/(1-TAL_x)
 
-def get_TAL_solubility_in_water_gpL(T, TAL_c_fit=TAL_c): # g TAL / L water
+def get_TAL_solubility_in_water_gpL(T, TAL_c_fit=None): # g TAL / L water
     return get_mol_TAL_dissolved(T, mL_per_L/H2O_molar_volume, TAL_c_fit)*TAL_molar_mass
 
-#%% Plot
+#%% Fit
 
+def refit(save=False, plot=False):
+    """
+    Fit the solubility model to experimental data, update the fitted 
+    parameter used by this module, and return the fitted parameter and R^2.
+    If `save` is True, the fitted parameter is stored so that it is loaded 
+    at import from then on. If `plot` is True, the model is plotted against
+    the experimental data.
+    """
+    global TAL_c
+    experimental_Ts, experimental_solubilities = load_experimental_data()
+    TAL_c, R_squared = fit_TAL_c(get_TAL_solubility_in_water_gpL_for_fit,
+                                 experimental_Ts, experimental_solubilities)
+    print(f'\nSolubility model fit to experimental data with R^2 = {round(R_squared, 3)}.\n')
+    if save: save_fitted_parameters(model, TAL_c=TAL_c, R_squared=R_squared)
+    if plot:
+        from biorefineries.TAL.models.solubility.plot_utils import plot_solubility_model
+        plot_solubility_model(experimental_Ts=experimental_Ts,
+                              experimental_solubilities=experimental_solubilities,
+                              get_TAL_solubility_in_water_gpL=get_TAL_solubility_in_water_gpL,
+                              R_squared=R_squared,
+                              filename='plot_TAL_solubility_in_water_simplified_one_parameter_margules_activity.png',
+                              )
+    return TAL_c, R_squared
+
+#%% Plot
 
-plot_solubility_model(experimental_Ts=experimental_Ts,
-                      experimental_solubilities=experimental_solubilities,
-                      get_TAL_solubility_in_water_gpL=get_TAL_solubility_in_water_gpL,
-                      R_squared=-get_negative_Rsq(TAL_c),
-                      filename='plot_TAL_solubility_in_water_simplified_one_parameter_margules_activity.png',
-                      )
+if __name__ == '__main__':
+    refit(plot=True)
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# Bioindustrial-Park: BioSTEAM's Premier Biorefinery Models and Results
+# Copyright (C) 2021-, Sarang Bhagwat <sarangb2@illinois.edu>
+#
+# This module is under the UIUC open-source license. See
+# github.com/BioSTEAMDevelopmentGroup/biosteam/blob/master/LICENSE.txt
+# for license details.
+"""
+Utilities for fitting TAL solubility models to experimental data and
+storing the fitted parameters, so that the models can be loaded without
+refitting (or reading Excel files) at import.
+"""
+import os
+import json
+import numpy as np
+
+__all__ = ('experimental_data_filepath', 'fitted_parameters_filepath',
+           'load_experimental_data', 'load_fitted_parameters',
+           'save_fitted_parameters', 'get_negative_Rsq', 'fit_TAL_c')
+
+solubility_folder = os.path.dirname(__file__)
+experimental_data_filepath = os.path.join(solubility_folder, 'experimental_data_TAL_solubility_in_water.xlsx')
+fitted_parameters_filepath = os.path.join(solubility_folder, 'fitted_parameters.json')
+
+def load_experimental_data():
+    """Return experimental temperatures [K] and TAL solubilities in water
+    [g-TAL/L-water]."""
+    import pandas as pd
+    experimental_data_df = pd.read_excel(experimental_data_filepath)
+    experimental_Ts = 273.15 + np.array(list(experimental_data_df['Temperature (degrees C)']))
+    experimental_solubilities = np.array(list(experimental_data_df['TAL solubility in water (g-TAL/L-water)']))
+    return experimental_Ts, experimental_solubilities
+
+def load_fitted_parameters(model):
+    """Return a dictionary of fitted parameters of the given solubility
+    model (e.g., 'one_parameter_van_laar_activity')."""
+    with open(fitted_parameters_filepath) as file:
+        return json.load(file)[model]
+
+def save_fitted_parameters(model, **parameters):
+    """Store fitted parameters of the given solubility model."""
+    if os.path.exists(fitted_parameters_filepath):
+        with open(fitted_parameters_filepath) as file:
+            fitted_parameters = json.load(file)
+    else:
+        fitted_parameters = {}
+    fitted_parameters[model] = parameters
+    with open(fitted_parameters_filepath, 'w') as file:
+        json.dump(fitted_parameters, file, indent=4, sort_keys=True)
+
+def get_negative_Rsq(c, get_TAL_solubility_in_water_gpL_for_fit,
+                     experimental_Ts, experimental_solubilities):
+    TAL_c_fit = c[0]
+    TSS, RSS = 0, 0
+    y_mean = experimental_solubilities.mean()
+    for i in range(len(experimental_Ts)):
+        T = experimental_Ts[i]
+        yi = experimental_solubilities[i]
+        y_pred = get_TAL_solubility_in_water_gpL_for_fit(T, TAL_c_fit)
+        RSS += (yi - y_pred)**2
+        TSS += (yi - y_mean)**2
+    return - (1 - RSS/TSS)
+
+def fit_TAL_c(get_TAL_solubility_in_water_gpL_for_fit,
+              experimental_Ts, experimental_solubilities,
+              x0=1000.):
+    """Fit the TAL activity parameter to experimental data by maximizing
+    R^2 and return the fitted parameter and R^2."""
+    from scipy.optimize import minimize
+    args = (get_TAL_solubility_in_water_gpL_for_fit,
+            experimental_Ts, experimental_solubilities)
+    res = minimize(fun=get_negative_Rsq,
+                   x0=np.array([x0]), # initial guess
+                   args=args)
+    TAL_c = float(res.x[0])
+    R_squared = -get_negative_Rsq(res.x, *args)
+    return TAL_c, R_squared
@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# Bioindustrial-Park: BioSTEAM's Premier Biorefinery Models and Results
+# Copyright (C) 2021-, Sarang Bhagwat <sarangb2@illinois.edu>
+#
+# This module is under the UIUC open-source license. See
+# github.com/BioSTEAMDevelopmentGroup/biosteam/blob/master/LICENSE.txt
+# for license details.
+
+import numpy as np
+from math import exp
+
+__all__ = ('SolubilityTable',)
+
+class SolubilityTable:
+    """
+    Create a SolubilityTable object that tabulates the solubility of a solute
+    in water across temperatures, so that the amount dissolved (and its
+    inverse, the temperature required to dissolve a given amount) can be
+    evaluated by interpolation instead of nested root-finding.
+
+    The molar ratio of solute to water at saturation, r = x/(1-x), is
+    tabulated as ln(r), which is nearly linear in 1/T for van't Hoff-like
+    models and monotonically increasing in T, so both the forward and
+    inverse lookups are well-defined. The table is built on first use.
+
+    Parameters
+    ----------
+    get_solubility : Callable(T)
+        Should return the mole fraction of solute at saturation
+        [mol solute : mol (solute + water)] at a given temperature [K].
+    T_lb : float, optional
+        Lowest temperature in the table [K]. Defaults to 250.
+    T_ub : float, optional
+        Highest temperature in the table [K]. Defaults to 420.
+    N : int, optional
+        Number of temperatures in the table. Defaults to 681 (0.25 K steps).
+
+    Attributes
+    ----------
+    Ts : 1d array
+        Tabulated temperatures [K].
+    ln_ratios : 1d array
+        Natural log of the tabulated molar ratios of solute to water at
+        saturation.
+    max_relative_error : float
+        Largest relative error in the molar ratio interpolated at the
+        midpoints of the table, as compared to the exact solubility model.
+
+    Notes
+    -----
+    Temperatures outside the table are evaluated with the exact solubility
+    model. Temperatures returned by the inverse lookup are limited to the
+    range of the table.
+
+    """
+    __slots__ = ('get_solubility', 'T_lb', 'T_ub', 'N', 'dT',
+                 'Ts', 'ln_ratios', 'max_relative_error')
+
+    def __init__(self, get_solubility, T_lb=250., T_ub=420., N=681):
+        self.get_solubility = get_solubility
+        self.T_lb = T_lb
+        self.T_ub = T_ub
+        self.N = N
+        self.dT = (T_ub - T_lb) / (N - 1)
+        self.reset()
+
+    def reset(self):
+        """Discard the table (e.g., after changing the solubility model)."""
+        self.Ts = self.ln_ratios = self.max_relative_error = None
+
+    def get_exact_mol_ratio(self, T):
+        """Return the molar ratio of solute to water at saturation using the
+        exact solubility model."""
+        x = self.get_solubility(T)
+        return x / (1. - x)
+
+    def tabulate(self):
+        """Build the table and estimate its error bound."""
+        get_exact_mol_ratio = self.get_exact_mol_ratio
+        Ts = np.linspace(self.T_lb, self.T_ub, self.N)
+        ratios = np.array([get_exact_mol_ratio(T) for T in Ts])
+        if (np.diff(ratios) <= 0.).any():
+            raise RuntimeError('solubility must increase with temperature '
+                               'within the tabulated range')
+        self.Ts = Ts
+        self.ln_ratios = np.log(ratios)
+        Ts_mid = 0.5 * (Ts[1:] + Ts[:-1])
+        exact = np.array([get_exact_mol_ratio(T) for T in Ts_mid])
+        approximate = np.exp(np.interp(Ts_mid, Ts, self.ln_ratios))
+        self.max_relative_error = float(np.abs(approximate / exact - 1.).max())
+
+    def get_mol_ratio(self, T):
+        """Return the molar ratio of solute to water at saturation."""
+        if self.Ts is None: self.tabulate()
+        if isinstance(T, (float, int)):
+            # Uniform grid; locate the interval directly
+            if not self.T_lb <= T <= self.T_ub: return self.get_exact_mol_ratio(T)
+            ln_ratios = self.ln_ratios
+            i = min(int((T - self.T_lb) / self.dT), self.N - 2)
+            x = (T - self.Ts[i]) / self.dT
+            return exp((1. - x) * ln_ratios[i] + x * ln_ratios[i + 1])
+        T = np.asarray(T, dtype=float)
+        ratio = np.exp(np.interp(T, self.Ts, self.ln_ratios))
+        outside = (T < self.T_lb) | (T > self.T_ub)
+        if outside.any():
+            get_exact_mol_ratio = self.get_exact_mol_ratio
+            if T.ndim:
+                ratio[outside] = [get_exact_mol_ratio(i) for i in T[outside]]
+            else:
+                return get_exact_mol_ratio(float(T))
+        return ratio if ratio.ndim else float(ratio)
+
+    def get_mol_dissolved(self, T, mol_water):
+        """Return the moles of solute that dissolve in the given moles of
+        water at saturation."""
+        return mol_water * self.get_mol_ratio(T)
+
+    def get_T_at_mol_dissolved(self, mol_solute, mol_water):
+        """Return the temperature [K] at which the given moles of solute
+        saturate the given moles of water."""
+        if self.Ts is None: self.tabulate()
+        mol_solute, mol_water = np.broadcast_arrays(
+            np.asarray(mol_solute, dtype=float),
+            np.asarray(mol_water, dtype=float),
+        )
+        with np.errstate(divide='ignore', invalid='ignore'):
+            ln_ratio = np.log(mol_solute) - np.log(mol_water)
+        ln_ratio = np.where(mol_solute > 0., ln_ratio, -np.inf)
+        ln_ratio = np.where(mol_water > 0., ln_ratio, np.inf)
+        T = np.interp(ln_ratio, self.ln_ratios, self.Ts)
+        return T if T.ndim else float(T)
+
+    def __repr__(self):
+        return f"<{type(self).__name__}: {self.T_lb:.2f}-{self.T_ub:.2f} K, {self.N} points>"
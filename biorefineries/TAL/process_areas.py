@@ -43,7 +43,7 @@ from biorefineries.TAL import units
 from biorefineries.TAL.process_settings import price, CFs
 from biorefineries.TAL.utils import find_split, splits_df
 from biorefineries.TAL.chemicals_data import chemical_groups, chems
-from biorefineries.TAL.models.solubility.fit_TAL_solubility_in_water_one_parameter_van_laar_activity import get_mol_TAL_dissolved, get_TAL_solubility_in_water_gpL
+from biorefineries.TAL.models.solubility.fit_TAL_solubility_in_water_one_parameter_van_laar_activity import get_mol_TAL_dissolved, get_TAL_solubility_in_water_gpL, get_mol_TAL_dissolved_tabulated, get_T_given_mol_TAL_dissolved_tabulated
 from biosteam import SystemFactory
 from flexsolve import IQ_interpolation
 from scipy.interpolate import interp1d, interp2d
@@ -280,7 +280,8 @@ def create_TAL_separation_solubility_exploit_process(ins, outs,):
     
     # from biosteam._graphics import stream_unit
     U401._graphics = tmo._graphics.junction_graphics
-    U401.get_mol_TAL_dissolved_given_T_and_mol_water = get_mol_TAL_dissolved
+    U401.get_mol_TAL_dissolved_given_T_and_mol_water = get_mol_TAL_dissolved_tabulated
+    U401.get_T_given_mol_TAL_dissolved_and_mol_water = get_T_given_mol_TAL_dissolved_tabulated
     @U401.add_specification()
     def U401_spec():
         U401_ins_0 = U401.ins[0]
@@ -431,18 +432,9 @@ def create_TAL_separation_solubility_exploit_process(ins, outs,):
         # ub_T = 99.+273.15
         lb_T = max(H401.lower_bound_T, H401_ins_0.T)
         ub_T = max(H401.upper_bound_T, H401_ins_0.T)
-        get_mol_TAL_dissolved_given_T_and_mol_water = U401.get_mol_TAL_dissolved_given_T_and_mol_water
-        if tot_TAL>TAL_solubility_multiplier*get_mol_TAL_dissolved_given_T_and_mol_water(ub_T, H401_ins_0_water):
-            H401.T=ub_T
-        elif tot_TAL<TAL_solubility_multiplier*get_mol_TAL_dissolved_given_T_and_mol_water(lb_T, H401_ins_0_water):
-            H401.T=lb_T
-        else:
-            H401_spec_obj_fn = lambda T: TAL_solubility_multiplier*get_mol_TAL_dissolved_given_T_and_mol_water(T, H401_ins_0_water) - tot_TAL
-            H401.T = IQ_interpolation(H401_spec_obj_fn, lb_T, ub_T, 
-                                      # ytol=5e-2,
-                                       # ytol=0.1, 
-                                      ytol = 0.5,
-                                      maxiter=300)
+        # Minimum T required to completely dissolve TAL, by inverse lookup of the tabulated solubility
+        T = U401.get_T_given_mol_TAL_dissolved_and_mol_water(tot_TAL/TAL_solubility_multiplier, H401_ins_0_water)
+        H401.T = min(max(T, lb_T), ub_T)
         
         H401._run()
         
@@ -0,0 +1,18 @@
+# -*- coding: utf-8 -*-
+"""
+Tools for evaluating metrics across titer, rate (productivity), and yield
+(TRY) specifications.
+"""
+from . import _parallel
+from . import _scheduling
+from . import _feasibility
+
+__all__ = (
+    *_parallel.__all__,
+    *_scheduling.__all__,
+    *_feasibility.__all__,
+)
+
+from ._parallel import *
+from ._scheduling import *
+from ._feasibility import *
@@ -0,0 +1,87 @@
+# -*- coding: utf-8 -*-
+"""
+"""
+import numpy as np
+
+__all__ = (
+    'FeasibilityBoundary',
+)
+
+class FeasibilityBoundary:
+    """
+    Create a FeasibilityBoundary object that learns the boundary of the
+    infeasible region of a titer/yield grid from failed simulations and
+    flags dominated points before they are simulated.
+
+    The boundary is assumed to be monotone: if a titer cannot be reached at a
+    given yield (e.g., because the sugar concentration required exceeds
+    the maximum of the evaporator, see
+    `TiterAndInhibitorsSpecification.check_sugar_concentration`), then
+    neither can any higher titer at the same or any lower yield.
+
+    Attributes
+    ----------
+    yields : 1d array
+        Yields of the infeasible points defining the boundary.
+    titers : 1d array
+        Titers of the infeasible points defining the boundary.
+    simulations_avoided : int
+        Number of points flagged as infeasible without simulation.
+
+    Examples
+    --------
+    >>> from biorefineries.TRY import FeasibilityBoundary
+    >>> boundary = FeasibilityBoundary()
+    >>> boundary.add(0.5, 100.)
+    >>> boundary.skip(0.4, 120.), boundary.skip(0.6, 120.), boundary.skip(0.4, 80.)
+    (True, False, False)
+    >>> boundary.add(0.8, 150.)
+    >>> boundary.titer_limit(0.3), boundary.titer_limit(0.7), boundary.titer_limit(0.9)
+    (100.0, 150.0, inf)
+    >>> boundary.simulations_avoided
+    1
+
+    """
+    __slots__ = ('yields', 'titers', 'simulations_avoided')
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        """Forget all infeasible points and reset the number of simulations
+        avoided."""
+        self.yields = np.zeros(0)
+        self.titers = np.zeros(0)
+        self.simulations_avoided = 0
+
+    def add(self, yield_, titer):
+        """Add an infeasible point to the boundary."""
+        yield_ = float(yield_)
+        titer = float(titer)
+        if self.is_infeasible(yield_, titer): return
+        yields = self.yields
+        titers = self.titers
+        redundant = (yields <= yield_) & (titers >= titer)
+        self.yields = np.append(yields[~redundant], yield_)
+        self.titers = np.append(titers[~redundant], titer)
+
+    def is_infeasible(self, yield_, titer):
+        """Return whether the point is dominated by a known infeasible point."""
+        return bool(((yield_ <= self.yields) & (titer >= self.titers)).any())
+
+    def skip(self, yield_, titer):
+        """Return whether the point is dominated by a known infeasible point
+        and count it as an avoided simulation if so."""
+        if self.is_infeasible(yield_, titer):
+            self.simulations_avoided += 1
+            return True
+        else:
+            return False
+
+    def titer_limit(self, yield_):
+        """Return the lowest titer known to be infeasible at the given yield."""
+        mask = yield_ <= self.yields
+        return float(self.titers[mask].min()) if mask.any() else np.inf
+
+    def __repr__(self):
+        return f"<{type(self).__name__}: {self.yields.size} infeasible points, {self.simulations_avoided} simulations avoided>"
@@ -0,0 +1,102 @@
+# -*- coding: utf-8 -*-
+"""
+"""
+import os
+import numpy as np
+from math import ceil
+from multiprocessing import get_context
+
+__all__ = (
+    'evaluate_across_specs_in_parallel',
+)
+
+# Flowsheet built once per worker process by the loader.
+_worker_state = {}
+
+def _initialize_worker(loader):
+    spec, system, metrics = loader()
+    _worker_state['spec'] = spec
+    _worker_state['system'] = system
+    _worker_state['metrics'] = metrics
+
+def _evaluate_chunk(args):
+    spec_1, spec_2, spec_3, path = args
+    spec = _worker_state['spec']
+    kwargs = {} if path is None else {'path': path}
+    results = spec.evaluate_across_specs(
+        _worker_state['system'], spec_1, spec_2,
+        _worker_state['metrics'], spec_3, **kwargs
+    )
+    return results, spec.count_exceptions, spec.titer_inhibitor_specification.infeasible_region.simulations_avoided
+
+def evaluate_across_specs_in_parallel(loader, spec_1, spec_2, spec_3,
+                                      processes=None, chunksize=None,
+                                      path=None, context=None):
+    """
+    Evaluate metrics at given titers and yields across a set of productivities
+    by splitting the (spec_1, spec_2) grid across a process pool. Return an
+    array with the all metric results, the number of points that failed, and
+    the number of simulations avoided in the infeasible region.
+
+    Parameters
+    ----------
+    loader : Callable
+        Should return a (spec, system, metrics) tuple given no parameters.
+        It is called once in each worker process to build the flowsheet, so
+        it must be a module-level (picklable) function.
+    spec_1 : array_like[shape]
+        Yields to evaluate.
+    spec_2 : array_like[shape]
+        Titers to evaluate.
+    spec_3 : array_like[P elements]
+        Productivities to evaluate.
+    processes : int, optional
+        Number of worker processes. Defaults to the number of CPUs.
+    chunksize : int, optional
+        Number of grid rows (along the first axis) sent to a worker at a
+        time. Defaults to splitting the grid into 4 chunks per process.
+    path : str, optional
+        Order in which each worker visits the points of its chunk; either
+        'serpentine' or 'hilbert' (see `WarmStartScheduler`). Defaults to
+        plain meshgrid order.
+    context : str, optional
+        Multiprocessing start method (e.g., 'fork' or 'spawn').
+
+    Returns
+    -------
+    results : array[shape x M x P]
+        All metric results at given titer/yield across productivities.
+    count_exceptions : int
+        Number of points that failed to simulate.
+    simulations_avoided : int
+        Number of points flagged as infeasible without simulation. Each 
+        worker learns the infeasible region from its own chunks only.
+
+    Notes
+    -----
+    The grid is split into contiguous blocks of rows and results are
+    stitched back in the same order, so the returned array is identical in
+    layout to the serial `ProcessSpecification.evaluate_across_specs`.
+
+    """
+    spec_1, spec_2 = np.broadcast_arrays(
+        np.asarray(spec_1, dtype=float),
+        np.asarray(spec_2, dtype=float),
+    )
+    spec_3 = np.asarray(spec_3, dtype=float).flatten()
+    shape = spec_1.shape
+    N = shape[0] if shape else 1
+    spec_1 = spec_1.reshape([N, -1])
+    spec_2 = spec_2.reshape([N, -1])
+    if processes is None: processes = os.cpu_count() or 1
+    processes = min(processes, N)
+    if chunksize is None: chunksize = max(1, ceil(N / (4 * processes)))
+    chunks = [(spec_1[i:i + chunksize], spec_2[i:i + chunksize], spec_3, path)
+              for i in range(0, N, chunksize)]
+    pool = get_context(context).Pool(processes, _initialize_worker, (loader,))
+    with pool:
+        chunk_results = pool.map(_evaluate_chunk, chunks, chunksize=1)
+    results = np.concatenate([i for i, _, _ in chunk_results])
+    count_exceptions = sum([j for _, j, _ in chunk_results])
+    simulations_avoided = sum([k for _, _, k in chunk_results])
+    return results.reshape([*shape, *results.shape[2:]]), count_exceptions, simulations_avoided
@@ -0,0 +1,185 @@
+# -*- coding: utf-8 -*-
+"""
+"""
+import numpy as np
+
+__all__ = (
+    'serpentine_order',
+    'hilbert_order',
+    'WarmStartScheduler',
+    'evaluate_across_specs_along_path',
+)
+
+def serpentine_order(shape):
+    """
+    Return grid indices ordered along a serpentine (boustrophedon) path,
+    where the last axis is traversed in alternating directions so that
+    consecutive points are always neighbors.
+
+    Examples
+    --------
+    >>> serpentine_order((2, 3))
+    [(0, 0), (0, 1), (0, 2), (1, 2), (1, 1), (1, 0)]
+
+    """
+    shape = tuple(shape)
+    if not shape: return [()]
+    *outer, N = shape
+    indices = []
+    for n, index in enumerate(np.ndindex(*outer)):
+        inner = range(N) if n % 2 == 0 else range(N - 1, -1, -1)
+        indices.extend([(*index, i) for i in inner])
+    return indices
+
+def _hilbert_index_to_xy(n, d):
+    x = y = 0
+    s = 1
+    while s < n:
+        rx = 1 & (d // 2)
+        ry = 1 & (d ^ rx)
+        if ry == 0:
+            if rx == 1:
+                x = s - 1 - x
+                y = s - 1 - y
+            x, y = y, x
+        x += s * rx
+        y += s * ry
+        d //= 4
+        s *= 2
+    return x, y
+
+def hilbert_order(shape):
+    """
+    Return 2-d grid indices ordered along a Hilbert curve. Non-square
+    grids are embedded in the smallest enclosing power-of-two square and
+    points outside the grid are skipped.
+
+    Examples
+    --------
+    >>> hilbert_order((2, 2))
+    [(0, 0), (0, 1), (1, 1), (1, 0)]
+
+    """
+    if len(shape) != 2:
+        raise ValueError('Hilbert curve ordering is only available for 2-d grids')
+    M, N = shape
+    n = 1
+    while n < max(M, N): n *= 2
+    indices = []
+    for d in range(n * n):
+        i, j = _hilbert_index_to_xy(n, d)
+        if i < M and j < N: indices.append((i, j))
+    return indices
+
+orderings = {
+    'serpentine': serpentine_order,
+    'hilbert': hilbert_order,
+}
+
+class WarmStartScheduler:
+    """
+    Create a WarmStartScheduler object that orders grid points along a
+    space-filling path and seeds each simulation with the converged recycle
+    flows of the nearest already-solved neighbor.
+
+    Parameters
+    ----------
+    system : System
+        System with recycle streams to seed.
+    path : str, optional
+        Either 'serpentine' or 'hilbert'. Defaults to 'serpentine'.
+
+    Attributes
+    ----------
+    warm_starts : int
+        Number of simulations seeded from a solved neighbor.
+    cold_starts : int
+        Number of simulations without a solved neighbor to seed from.
+
+    """
+    __slots__ = ('system', 'path', 'solved_indices', 'recycle_data',
+                 'warm_starts', 'cold_starts')
+
+    def __init__(self, system, path='serpentine'):
+        if path not in orderings:
+            raise ValueError(f"path must be one of {', '.join(orderings)}; not {path!r}")
+        self.system = system
+        self.path = path
+        self.solved_indices = []
+        self.recycle_data = []
+        self.warm_starts = 0
+        self.cold_starts = 0
+
+    def order(self, shape):
+        """Return grid indices in the order they should be simulated."""
+        return orderings[self.path](shape)
+
+    def nearest_solved(self, index):
+        """Return the position of the nearest solved point or None if no
+        point has been solved yet. Ties go to the most recently solved point."""
+        if not self.solved_indices: return None
+        distance = np.abs(np.array(self.solved_indices) - index).sum(axis=1)
+        return int(distance.size - 1 - distance[::-1].argmin())
+
+    def seed(self, index):
+        """Set recycle streams to the converged state of the nearest solved
+        neighbor to the given grid index."""
+        n = self.nearest_solved(index)
+        if n is None:
+            self.cold_starts += 1
+        else:
+            self.recycle_data[n].reset()
+            self.warm_starts += 1
+
+    def record(self, index):
+        """Record the converged recycle state at the given grid index."""
+        self.solved_indices.append(index)
+        self.recycle_data.append(self.system.get_recycle_data())
+
+    def __repr__(self):
+        return f"{type(self).__name__}({self.system}, path={self.path!r})"
+
+
+def evaluate_across_specs_along_path(f, spec, system, spec_1, spec_2,
+                                     metrics, spec_3, path='serpentine'):
+    """
+    Evaluate metrics at given titers and yields across a set of productivities,
+    visiting grid points along a space-filling path and warm-starting each
+    simulation from its nearest already-solved neighbor.
+
+    Parameters
+    ----------
+    f : Callable(spec, system, spec_1, spec_2, metrics, spec_3)
+        Should return an array of metric results [M x P] at a single titer
+        and yield or NaN values if the point failed.
+    spec : ProcessSpecification
+        Fermentation specification.
+    system : System
+        System to simulate.
+    spec_1 : array_like[shape]
+        Yields to evaluate.
+    spec_2 : array_like[shape]
+        Titers to evaluate.
+    metrics : Iterable[Callable; M elements]
+        Should return a number given no parameters.
+    spec_3 : array_like[P elements]
+        Productivities to evaluate.
+    path : str, optional
+        Either 'serpentine' or 'hilbert'. Defaults to 'serpentine'.
+
+    Returns
+    -------
+    results : array[shape x M x P]
+        All metric results at given titer/yield across productivities.
+    scheduler : WarmStartScheduler
+        Scheduler with warm/cold start statistics.
+
+    """
+    spec_1, spec_2 = np.broadcast_arrays(spec_1, spec_2)
+    scheduler = WarmStartScheduler(system, path)
+    results = np.zeros([*spec_1.shape, len(metrics), len(spec_3)])
+    for index in scheduler.order(spec_1.shape):
+        scheduler.seed(index)
+        results[index] = data = f(spec, system, spec_1[index], spec_2[index], metrics, spec_3)
+        if not np.isnan(data).all(): scheduler.record(index)
+    return results, scheduler
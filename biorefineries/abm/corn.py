@@ -42,11 +42,20 @@ Name: (Biorefinery, MESP [USD/kr]), dtype: float64
 1     0.09
 Name: (Corn, Price [USD/kg]), dtype: float64
 
+Samples that only differ in prices, IRR, venture years, or operating days
+(at the same hourly corn flow rate) can be evaluated in batches, simulating 
+the biorefinery once per batch:
+
+>>> evaluate_in_batches() # Same results as ABM_TEA_model.evaluate()
+
 """
 from biorefineries import corn as cn
+from biorefineries.tea import BatchTEA
+from warnings import warn
 import biosteam as bst
+import numpy as np
 
-__all__ = ('ABM_TEA_model',)
+__all__ = ('ABM_TEA_model', 'evaluate_in_batches')
 
 cn.load()
 bst.CE = 607.5
@@ -171,3 +180,54 @@ def set_end_year(end_year):
 @ABM_TEA_model.parameter(units='kg/yr')
 def set_plant_capacity(plant_capacity):
     cn.corn.F_mass = plant_capacity / operating_hours
+
+# %% Batch evaluation of economic scenarios
+
+def evaluate_in_batches():
+    """
+    Evaluate metrics of `ABM_TEA_model` over the loaded samples and save
+    values to its table (as in `ABM_TEA_model.evaluate()`). Samples are
+    grouped by hourly corn flow rate (i.e., plant capacity over operating 
+    hours) and the biorefinery is simulated once per group; the cash flows
+    of all samples in a group are evaluated at once through a BatchTEA object.
+    
+    """
+    model = ABM_TEA_model
+    samples = model._samples
+    if samples is None: raise RuntimeError('must load samples before evaluating')
+    (price_corn, price_DDGS, price_corn_oil, price_ethanol, operating_days, 
+     IRR, start_year, end_year, plant_capacity) = samples.T
+    hours = 24. * operating_days
+    _, batches = np.unique(plant_capacity / hours, return_inverse=True)
+    values = np.full([len(samples), len(metrics)], np.nan)
+    for batch in np.unique(batches):
+        index = np.flatnonzero(batches == batch)
+        try:
+            model._update_state(samples[index[0]])
+        except Exception as exception:
+            warn(f'[batch of samples {index.tolist()}] {type(exception).__name__}: {exception}', RuntimeWarning)
+            model._reset_system()
+            continue
+        tea = BatchTEA(
+            cn.corn_tea, IRR=IRR[index],
+            duration=(start_year[index], end_year[index]),
+            operating_days=operating_days[index],
+            prices={cn.corn: price_corn[index],
+                    cn.DDGS: price_DDGS[index],
+                    cn.crude_oil: price_corn_oil[index],
+                    cn.ethanol: price_ethanol[index]},
+        )
+        batch_hours = hours[index]
+        values[index] = np.column_stack([
+            tea.solve_price(cn.ethanol),
+            tea.solve_price(cn.corn),
+            tea.solve_IRR(),
+            tea.NPV,
+            tea.TCI,
+            tea.VOC,
+            tea.FOC,
+            batch_hours * cn.all_areas.get_electricity_consumption(),
+            batch_hours * cn.all_areas.get_electricity_production(),
+            batch_hours * cn.ethanol.F_mass,
+        ])
+    model.table[[i.index for i in metrics]] = values
@@ -42,13 +42,22 @@ Name: (Biorefinery, MESP [USD/kr]), dtype: float64
 1     0.06
 Name: (Corn stover, Price [USD/kg]), dtype: float64
 
+Samples that only differ in prices, IRR, venture years, or operating days
+(at the same hourly feedstock flow rate) can be evaluated in batches,
+simulating the biorefinery once per batch:
+
+>>> evaluate_in_batches() # Same results as ABM_TEA_model.evaluate()
+
 """
 from biorefineries import cornstover as cs
+from biorefineries.tea import BatchTEA
+from warnings import warn
 import biosteam as bst
+import numpy as np
 import os
 import pandas as pd
 
-__all__ = ('ABM_TEA_model',)
+__all__ = ('ABM_TEA_model', 'evaluate_in_batches')
 
 cs.load()
 bst.CE = 607.5
@@ -228,3 +237,55 @@ def set_plant_capacity(plant_capacity):
 ABM_TEA_model.parameter(set_mixed_cornstover_miscanthus_feedstock,
                         name='Corn stover fraction', units='by wt.')
 
+
+# %% Batch evaluation of economic scenarios
+
+def evaluate_in_batches():
+    """
+    Evaluate metrics of `ABM_TEA_model` over the loaded samples and save
+    values to its table (as in `ABM_TEA_model.evaluate()`). Samples are
+    grouped by corn stover fraction and hourly feedstock flow rate (i.e.,
+    plant capacity over operating hours) and the biorefinery is simulated
+    once per group; the cash flows of all samples in a group are evaluated
+    at once through a BatchTEA object.
+    
+    """
+    model = ABM_TEA_model
+    samples = model._samples
+    if samples is None: raise RuntimeError('must load samples before evaluating')
+    (price_cornstover, price_miscanthus, price_ethanol, operating_days, IRR,
+     start_year, end_year, plant_capacity, x_cornstover) = samples.T
+    hours = 24. * operating_days
+    _, batches = np.unique(
+        np.column_stack([plant_capacity / hours, x_cornstover]), 
+        axis=0, return_inverse=True,
+    )
+    values = np.full([len(samples), len(metrics)], np.nan)
+    for batch in np.unique(batches):
+        index = np.flatnonzero(batches == batch)
+        try:
+            model._update_state(samples[index[0]])
+        except Exception as exception:
+            warn(f'[batch of samples {index.tolist()}] {type(exception).__name__}: {exception}', RuntimeWarning)
+            model._reset_system()
+            continue
+        tea = BatchTEA(
+            cs.cornstover_tea, IRR=IRR[index],
+            duration=(start_year[index], end_year[index]),
+            operating_days=operating_days[index],
+            prices={cs.ethanol: price_ethanol[index]},
+        )
+        batch_hours = hours[index]
+        values[index] = np.column_stack([
+            tea.solve_price(cs.ethanol),
+            tea.solve_price(cs.cornstover),
+            tea.solve_IRR(),
+            tea.NPV,
+            tea.TCI,
+            tea.VOC,
+            tea.FOC,
+            batch_hours * cs.AllAreas.get_electricity_consumption(),
+            batch_hours * cs.AllAreas.get_electricity_production(),
+            batch_hours * cs.ethanol.F_mass,
+        ])
+    model.table[[i.index for i in metrics]] = values
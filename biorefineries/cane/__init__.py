@@ -1,35 +1,133 @@
 # -*- coding: utf-8 -*-
 """
 """
+from importlib import import_module
 from . import chemicals
 from . import composition
 from . import oil_extraction
 from . import process_settings
 from . import units
 from . import systems
+from . import derivatives
+from . import response_surface
 from . import biorefinery
-from . import evaluation
-from . import results
-from . import contour_plots
+from . import columnar_results
 from . import feature_mockups
-from . import uncertainty_plots
 from . import parse_configuration
-from . import tables
 
-__all__ = (
+# Evaluation, result, table, and plotting modules (which import matplotlib,
+# colorpalette, scipy.ndimage, etc.) are loaded on first access of any of
+# their names (see `__getattr__`), as listed in their `__all__`.
+_lazy_submodules = {
+    'results': (
+        'images_folder', 'results_folder', 'spearman_file',
+        'monte_carlo_file', 'telemetry_file', 'autoload_file_name',
+        'get_monte_carlo_sheet', 'get_spearman',
+        'get_monte_carlo_across_oil_content', 'get_monte_carlo',
+        'get_line_monte_carlo', 'montecarlo_results',
+        'montecarlo_results_short',
+        'montecarlo_results_feedstock_comparison',
+        'montecarlo_results_configuration_comparison',
+        'montecarlo_results_agile_comparison',
+        'montecarlo_results_crude_comparison',
+        'get_minimum_GWP_reduction',
+        'mcr_sc_microbial_oil_comparison', 'mcr_sc_microbial_oil',
+        'mcr_target_microbial_oil',
+        'mcr_target_microbial_oil_comparison',
+        'mcr_target_improved_fermentation_microbial_oil',
+    ),
+    'evaluation': (
+        'evaluate_configurations_across_recovery_and_oil_content',
+        'evaluate_configurations_across_sorghum_and_cane_oil_content',
+        'evaluate_metrics_at_composition',
+        'evaluate_metrics_oil_recovery_integration',
+        'evaluate_metrics_at_biomass_yield',
+        'run_uncertainty_and_sensitivity', 'save_pickled_results',
+        'run_all', 'run_all_in_parallel',
+        'run_sugarcane_microbial_oil', 'run_oilcane_microbial_oil',
+        'run_oilcane_microbial_oil_across_oil_content',
+        'run_oilcane_microbial_oil_across_lines',
+        'run_oilcane_ethanol_constant_biomass',
+        'run_oilcane_microbial_oil_constant_biomass',
+        'save_target_biomass_yield',
+        'run_oilcane_development_pathway',
+    ),
+    'contour_engine': (
+        'ContourEngine',
+    ),
+    'tables': (
+        'save_system_reports', 'save_detailed_expenditure_tables',
+        'save_detailed_life_cycle_tables',
+        'save_YRCP2023_distribution_table',
+    ),
+    'contour_plots': (
+        'plot_sorghum_oil_content_and_cane_oil_content_contours_manuscript',
+        'plot_metrics_across_composition_manuscript',
+        'plot_metrics_across_biomass_yield_manuscript',
+        'plot_sorghum_oil_content_and_cane_oil_content_contours_seminar',
+        'plot_recovery_and_oil_content_contours_manuscript',
+        'plot_oil_recovery_integration_manuscript',
+        'plot_recovery_and_oil_content_contours',
+        'plot_sorghum_oil_content_and_cane_oil_content_contours',
+        'plot_recovery_and_oil_content_contours_biodiesel_only',
+        'plot_recovery_and_oil_content_contours_with_oilsorghum_only',
+        'plot_metrics_across_biomass_yield',
+        'plot_metrics_across_biomass_yield_TOC',
+        'plot_metrics_across_composition',
+        'plot_oil_recovery_integration', 'plot_lines_biomass_yield',
+    ),
+    'uncertainty_plots': (
+        'plot_all',
+        'plot_competitive_biomass_yield_across_oil_content_presentation',
+        'plot_breakdowns', 'plot_montecarlo_feedstock_comparison',
+        'plot_montecarlo_configuration_comparison',
+        'plot_montecarlo_agile_comparison',
+        'plot_montecarlo_derivative', 'plot_montecarlo_absolute',
+        'plot_lines_monte_carlo_manuscript', 'plot_spearman_tea',
+        'plot_spearman_lca', 'plot_spearman_tea_short',
+        'plot_spearman_lca_short',
+        'plot_monte_carlo_across_coordinate', 'monte_carlo_box_plot',
+        'plot_monte_carlo', 'plot_spearman',
+        'plot_configuration_breakdown',
+        'plot_feedstock_conventional_comparison_kde',
+        'plot_feedstock_cellulosic_comparison_kde',
+        'plot_open_comparison_kde', 'plot_feedstock_comparison_kde',
+        'plot_feedstock_comparison_kde_2023',
+        'plot_crude_configuration_comparison_kde',
+        'plot_agile_comparison_kde',
+        'plot_separated_configuration_comparison_kde',
+        'plot_unlabeled_feedstock_conventional_comparison_kde',
+        'plot_competitive_biomass_yield_across_oil_content',
+        'plot_competitive_microbial_oil_yield_across_oil_content',
+        'plot_microbial_oil_feedstock_comparison_kde',
+        'plot_microbial_oil_bioethanol_comparison_kde',
+        'plot_microbial_oil_sustainability_kde_2023',
+        'plot_microbial_oil_economics_kde_2023',
+        'plot_spearman_tea_YRCP2023', 'area_colors',
+        'area_colors_biodiesel', 'area_hatches',
+        'area_hatches_biodiesel', 'plot_spearman_YRCP2023',
+        'plot_spearman_lca_YRCP2023',
+        'plot_oilcane_microbial_oil_development_sustainability_kde_2023',
+        'plot_oilcane_microbial_oil_development_economics_kde_2023',
+        'plot_oilcane_cellulosic_microbial_oil_development_sustainability_kde_2023',
+        'plot_oilcane_cellulosic_microbial_oil_development_economics_kde_2023',
+    ),
+}
+_lazy_names = {j: i for i, names in _lazy_submodules.items() for j in names}
+_loaded_submodules = set()
+
+_eager_names = (
     *chemicals.__all__,
     *composition.__all__,
     *oil_extraction.__all__,
     *process_settings.__all__,
     *units.__all__,
     *systems.__all__,
+    *derivatives.__all__,
+    *response_surface.__all__,
     *biorefinery.__all__,
-    *evaluation.__all__,
-    *results.__all__,
-    *contour_plots.__all__,
-    *uncertainty_plots.__all__,
+    *columnar_results.__all__,
     *parse_configuration.__all__,
-    *tables.__all__,
 )
 
 from .chemicals import *
@@ -38,11 +136,29 @@ from .oil_extraction import *
 from .process_settings import *
 from .units import *
 from .systems import *
+from .derivatives import *
+from .response_surface import *
 from .biorefinery import *
-from .evaluation import *
-from .results import *
-from .contour_plots import *
+from .columnar_results import *
 from .feature_mockups import *
-from .uncertainty_plots import *
 from .parse_configuration import *
-from .tables import *
\ No newline at end of file
+
+def _load_submodule(name):
+    module = import_module(f'{__name__}.{name}')
+    if name not in _loaded_submodules:
+        globals().update({i: getattr(module, i) for i in module.__all__})
+        _loaded_submodules.add(name)
+    return module
+
+def __getattr__(name):
+    if name in _lazy_submodules:
+        return _load_submodule(name)
+    elif name in _lazy_names:
+        return getattr(_load_submodule(_lazy_names[name]), name)
+    elif name == '__all__':
+        globals()['__all__'] = names = (*_eager_names, *_lazy_names)
+        return names
+    raise AttributeError(f"module '{__name__}' has no attribute '{name}'")
+
+def __dir__():
+    return sorted({*globals(), *__getattr__('__all__')})
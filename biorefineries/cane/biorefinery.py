@@ -20,6 +20,8 @@ from biorefineries.cane.composition import (
 from biosteam import main_flowsheet, UnitGroup
 from chaospy import distributions as shape
 import numpy as np
+from .derivatives import MetricDerivatives, BaseStateMetrics
+from .response_surface import ResponseSurface
 from .feature_mockups import (
     all_parameter_mockups,
     all_metric_mockups, 
@@ -27,6 +29,11 @@ from .feature_mockups import (
 from .process_settings import load_process_settings
 from .chemicals import create_cellulosic_oilcane_chemicals as create_chemicals
 from biorefineries.cellulosic import PretreatmentReactorSystem as PRS
+from biorefineries.cellulosic import BiorefineryCache
+from biorefineries.snapshot import (
+    dump_snapshot, load_header, load_snapshot, 
+    unit_ticket_numbers, loaded_ticket_numbers,
+)
 from .systems import (
     create_sugarcane_to_ethanol_system,
     create_sugarcane_to_sugar_and_ethanol_system,
@@ -209,7 +216,7 @@ def YRCP2023():
     Biorefinery._derivative_disabled = True
 
 class Biorefinery:
-    cache = {}
+    cache = BiorefineryCache()
     baseline_dry_biomass_yield = 25.62 # dry MT / ha / y
     baseline_available_land = 1600000 * 0.3 / baseline_dry_biomass_yield # ha
     set_feedstock_line = set_line_composition_parameters
@@ -316,6 +323,71 @@ class Biorefinery:
             self._chemicals = chemicals = create_chemicals()
         return chemicals
     
+    @classmethod
+    def clear_cache(cls):
+        """Remove all cached biorefineries and reset cache statistics."""
+        cls.cache.clear()
+    
+    @classmethod
+    def cache_info(cls):
+        """Return cache hit/miss statistics."""
+        return cls.cache.info()
+    
+    def save(self, file):
+        """
+        Save a snapshot of the converged biorefinery (including recycle 
+        states and model parameter baselines) to a file.
+        
+        """
+        header = {
+            'arguments': self._arguments,
+            'ticket_numbers': self._ticket_numbers,
+            'baselines': [i.baseline for i in self.model._parameters],
+        }
+        with open(file, 'wb') as f:
+            dump_snapshot(f, header, self.flowsheet,
+                          {'biorefinery': self, 'tea': self.tea, 'model': self.model})
+    
+    @classmethod
+    def load(cls, file, chemicals=None):
+        """
+        Return a biorefinery restored from a snapshot file. The flowsheet is 
+        constructed (but not simulated) and the saved state is merged into it.
+        Custom chemicals used to create the saved biorefinery must be passed
+        again.
+        
+        """
+        with open(file, 'rb') as f:
+            header = load_header(f)
+            with loaded_ticket_numbers(header['ticket_numbers']):
+                self = cls(**header['arguments'], chemicals=chemicals, 
+                           cache=None, simulate=False)
+            for parameter, baseline in zip(self.model._parameters, header['baselines']):
+                parameter.baseline = baseline
+                parameter.setter(baseline)
+            load_snapshot(f, self.flowsheet, 
+                          {'biorefinery': self, 'tea': self.tea, 'model': self.model}, self.sys)
+        return self
+    
+    def load_biomass_yield_surface(self):
+        """
+        Load the response surface of net earnings and TCI at twice the dry 
+        biomass yield (used to compute the competitive biomass yield) fitted 
+        under the active default settings of biorefineries (e.g., after 
+        `YRCP2023`). Settings not used before start a new response surface.
+        
+        """
+        cls = type(self)
+        settings = tuple([
+            (i, repr(getattr(cls, i))) for i in dir(cls) if i.startswith('default_')
+        ])
+        surfaces = self.biomass_yield_surfaces
+        if settings in surfaces:
+            surface = surfaces[settings]
+        else:
+            surfaces[settings] = surface = ResponseSurface(log=(False, True))
+        self.biomass_yield_surface = surface
+    
     _derivative_disabled = False
     @classmethod
     def disable_derivative(cls, disable=True):
@@ -399,15 +471,26 @@ class Biorefinery:
         key = (number, agile, feedstock_line,
                WWT_key, conversion_performance_distribution,
                year, case)
-        if cache and key in cache: 
-            return cache[key]
+        if cache is not None and key in cache: 
+            self = cache[key]
+            self.load_biomass_yield_surface()
+            return self
         else:
             self = super().__new__(cls)
+        self._arguments = dict(
+            name=name, avoid_natural_gas=avoid_natural_gas, 
+            conversion_performance_distribution=conversion_performance_distribution,
+            year=year, prices_correleted_to_crude_oil=prices_correleted_to_crude_oil,
+            WWT_kwargs=WWT_kwargs, oil_content_range=oil_content_range,
+            remove_biodiesel_production=remove_biodiesel_production,
+            update_feedstock_price=update_feedstock_price,
+        )
         
         ## Add BioSTEAM objects to module for easy access
         self.price_distribution_module = dist = get_price_distributions_module(year)
         self.configuration = configuration
         flowsheet_name = format_configuration(configuration, latex=False)
+        self._ticket_numbers = unit_ticket_numbers() # Saved in snapshots to reproduce default unit IDs
         flowsheet = bst.Flowsheet(flowsheet_name)
         main_flowsheet.set_flowsheet(flowsheet)
         if chemicals: self._chemicals = chemicals
@@ -1382,55 +1465,71 @@ class Biorefinery:
             else:
                 return 0.
     
+        if agile:
+            def get_oil_content():
+                return cane_mode.oil_content
+            
+            def set_oil_content(oil_content):
+                doil = oil_content - cane_mode.oil_content
+                cane_mode.oil_content += doil
+                sorghum_mode.oil_content += doil
+        else:
+            def get_oil_content():
+                return composition_specification.oil
+            
+            set_oil_content = composition_specification.load_oil_content
+        
+        self.derivatives = derivatives = MetricDerivatives(
+            sys, [MFPP, biodiesel_production, ethanol_production, 
+                  electricity_production, natural_gas_consumption, 
+                  TCI, GWP_economic],
+            get_oil_content, set_oil_content,
+        )
+        
         @metric(units='USD/MT')
         def MFPP_derivative():
             if number < 0:
                 return 0.
             if self._derivative_disabled:
                 return np.nan
-            if agile:
-                cane_mode.oil_content += 0.01
-                sorghum_mode.oil_content += 0.01
-            else:
-                composition_specification.load_oil_content(composition_specification.oil + 0.01)
-            sys.simulate()
-            return MFPP.difference()
+            derivatives.evaluate()
+            return derivatives.get(MFPP)
         
         @metric(units='L/MT')
         def biodiesel_production_derivative():
             if number < 0: return 0.
             if self._derivative_disabled: return np.nan
-            return biodiesel_production.difference()
+            return derivatives.get(biodiesel_production)
         
         @metric(units='L/MT')
         def ethanol_production_derivative():
             if number < 0: return 0.
             if self._derivative_disabled: return np.nan
-            return ethanol_production.difference()
+            return derivatives.get(ethanol_production)
         
         @metric(units='kWh/MT')
         def electricity_production_derivative():
             if number < 0: return 0.
             if self._derivative_disabled: return np.nan
-            return electricity_production.difference()
+            return derivatives.get(electricity_production)
         
         @metric(units='cf/MT')
         def natural_gas_consumption_derivative():
             if number < 0: return 0.
             if self._derivative_disabled: return np.nan
-            return natural_gas_consumption.difference()
+            return derivatives.get(natural_gas_consumption)
         
         @metric(units='10^6*USD')
         def TCI_derivative():
             if number < 0: return 0.
             if self._derivative_disabled: return np.nan
-            return TCI.difference()
+            return derivatives.get(TCI)
         
         @metric(name='GWP derivative', element='Economic allocation', units='kg*CO2e / USD')
         def GWP_economic_derivative(): # Cradle to gate
             if number < 0: return 0.
             if self._derivative_disabled: return 0.
-            return GWP_economic.difference()
+            return derivatives.get(GWP_economic)
     
         @metric(name='GWP derivative', element='Ethanol', units='kg*CO2e / L')
         def GWP_ethanol_derivative(): # Cradle to gate
@@ -1497,6 +1596,11 @@ class Biorefinery:
             sys.simulate()
             return tea.net_earnings, tea.TCI
         
+        # Net earnings (linear) and TCI (power law) at twice the dry biomass
+        # yield given the state of the sample
+        self.biomass_yield_surfaces = {}
+        self.load_biomass_yield_surface()
+        
         def competitive_biomass_yield_objective(biomass_yield, target, mb_NE, An_TCI):
             return 100. * linear_val(biomass_yield, mb_NE) / exponential_val(max(biomass_yield, 1), An_TCI) - target
         
@@ -1509,8 +1613,26 @@ class Biorefinery:
             assert x0 < 100, "dry biomass yield over 100 dry MT / ha"
             x1 = 2 * x0
             NE0, TCI0 = tea.net_earnings, tea.TCI
-            NE1, TCI1 = NE_and_TCI_at_biomass_yield(x1)
-            self.dry_biomass_yield = x0 # Reset dry biomass yield
+            features = (x0, NE0, TCI0, tea.sales, tea.VOC, tea.FOC, self.feedstock.cost)
+            biomass_yield_surface = self.biomass_yield_surface
+            responses = biomass_yield_surface.predict(features)
+            if responses is None:
+                # Metrics evaluated afterwards are saved at the sample so 
+                # that the system need not be simulated back at x0
+                base_state.save([IRR])
+                recycle_data = sys.get_recycle_data() if hasattr(sys, 'get_recycle_data') else None
+                try:
+                    NE1, TCI1 = NE_and_TCI_at_biomass_yield(x1)
+                except:
+                    base_state.clear()
+                    raise
+                finally:
+                    self.dry_biomass_yield = x0
+                    self.update_feedstock()
+                    if recycle_data is not None: recycle_data.reset()
+                biomass_yield_surface.add(features, (NE1, TCI1))
+            else:
+                NE1, TCI1 = responses
             mb_NE = linear_fit(x0, x1, NE0, NE1)
             An_TCI = exponential_fit(x0, x1, TCI0, TCI1)
             
@@ -1582,6 +1704,12 @@ class Biorefinery:
                 IRR = tea.solve_IRR()
             return 100. * IRR
         
+        # Evaluated before derivatives perturb the oil content, so that the 
+        # system need not be simulated back at the sample
+        derivatives.base_state = base_state = BaseStateMetrics(
+            [ROI, IRR, competitive_biomass_yield]
+        )
+        
         # def competitive_microbial_oil_yield_objective(microbial_oil_yield, target):
         #     self.update_dry_biomass_yield(self.baseline_dry_biomass_yield)
         #     set_glucose_to_microbial_oil_yield.setter(microbial_oil_yield)
@@ -1663,7 +1791,8 @@ class Biorefinery:
         self.net_energy_target = None
         self.microbial_oil_analysis_disactivated = True
         self.__dict__.update(flowsheet.to_dict())
-        
+        derivatives.record_parameters(model._parameters)
+        base_state.record_parameters(model._parameters)
         for i in model._parameters: 
             setattr(self, i.setter.__name__, i)
         if case is not None:
@@ -19,6 +19,7 @@ import thermosteam as tmo
 from thermosteam import functional as fn
 from chemicals import atoms_to_Hill
 from thermosteam.utils import chemical_cache
+from biorefineries.chemicals_cache import persistent_chemical_cache
 from biorefineries import cellulosic
 import biosteam as bst
 
@@ -30,7 +31,7 @@ __all__ = (
     'create_acetyl_diolein',
 )
 
-@chemical_cache
+@persistent_chemical_cache
 def create_sugarcane_chemicals(yeast_includes_nitrogen=None):
     if yeast_includes_nitrogen is None: yeast_includes_nitrogen = False
     (Water, Ethanol, Glucose, Sucrose, H3PO4, P4O10, CO2, Octane, O2, N2, CH4) = chemicals = tmo.Chemicals(
@@ -159,7 +160,7 @@ def create_acyl_olein(N_acyl):
     chemical.V.add_model(fn.rho_to_V(rho=900, MW=chemical.MW))
     chemical.Cn.add_model(model.Cp(298.15) * chemical.MW)
     chemical.copy_models_from(model, ['mu', 'sigma', 'kappa'])
-    if ID == 'MonoOlein': chemical.mu.add_model(lambda T: 0.0001)
+    if ID == 'MonoOlein': chemical.mu.add_model(0.0001)
     return chemical
 
 @chemical_cache
@@ -186,7 +187,7 @@ def create_acetyl_diolein():
     chemical.copy_models_from(model, ['sigma', 'kappa'])
     return chemical
 
-@chemical_cache
+@persistent_chemical_cache
 def create_oilcane_chemicals(yeast_includes_nitrogen=None):
     chemicals = create_sugarcane_chemicals(yeast_includes_nitrogen).copy()
     (Water, Ethanol, Glucose, Sucrose, H3PO4, P4O10, CO2, Octane, O2, N2, CH4, 
@@ -219,6 +220,8 @@ def create_oilcane_chemicals(yeast_includes_nitrogen=None):
     # Assume sodium methoxide has some of the same properties as methanol
     LiquidMethanol = Methanol.at_state(phase='l', copy=True)
     NaOCH3.copy_models_from(LiquidMethanol, ['V', 'sigma', 'kappa', 'Cn'])
+    # Copied CoolProp data is referenced by the CAS of methanol (needed for pickling)
+    for model in (NaOCH3.V, NaOCH3.kappa, NaOCH3.Cn): model.CASRN = Methanol.CAS
     chemicals.extend([
         tmo.Chemical('Phosphatidylinositol', formula='C47H83O13P',
                      search_db=False, CAS='383907-36-6', default=True,
@@ -245,7 +248,7 @@ def create_oilcane_chemicals(yeast_includes_nitrogen=None):
     chemicals.set_synonym('Yeast', 'DryYeast')
     return chemicals
 
-@chemical_cache
+@persistent_chemical_cache(modules=['biorefineries.cellulosic.chemicals'])
 def create_cellulosic_oilcane_chemicals(yeast_includes_nitrogen=None):
     oilcane_chemicals = create_oilcane_chemicals(yeast_includes_nitrogen)
     cellulosic_chemicals = cellulosic.create_cellulosic_ethanol_chemicals()
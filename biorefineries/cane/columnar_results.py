@@ -0,0 +1,153 @@
+# -*- coding: utf-8 -*-
+"""
+Columnar on-disk format for Monte Carlo results. Each column (or sheet) is
+stored as a separate array in an uncompressed .npz file (so that individual
+metrics can be loaded lazily) with a .json sidecar holding the index and
+column labels.
+"""
+import os
+import json
+import numpy as np
+import pandas as pd
+
+__all__ = (
+    'columnar_file',
+    'columnar_file_exists',
+    'save_columnar_table',
+    'load_columnar_table',
+    'save_columnar_sheets',
+    'load_columnar_sheet',
+    'columnar_to_excel',
+)
+
+def columnar_file(file):
+    """Return the .npz file path of the columnar store for the given
+    result file (e.g., an .xlsx file)."""
+    return os.path.splitext(file)[0] + '.npz'
+
+def metadata_file(file):
+    return os.path.splitext(file)[0] + '.json'
+
+def columnar_file_exists(file):
+    """Return whether a columnar store exists for the given result file."""
+    file = columnar_file(file)
+    return os.path.exists(file) and os.path.exists(metadata_file(file))
+
+def _python_scalar(value):
+    return value.item() if isinstance(value, np.generic) else value
+
+def _index_to_json(index):
+    if isinstance(index, pd.MultiIndex):
+        values = [[_python_scalar(j) for j in i] for i in index]
+    else:
+        values = [_python_scalar(i) for i in index]
+    return {'names': list(index.names), 'values': values}
+
+def _index_from_json(dct):
+    names = dct['names']
+    values = dct['values']
+    if len(names) > 1:
+        return pd.MultiIndex.from_tuples([tuple(i) for i in values], names=names)
+    else:
+        return pd.Index(values, name=names[0])
+
+def _load_metadata(file):
+    with open(metadata_file(file)) as f: return json.load(f)
+
+def _save(file, metadata, arrays):
+    file = columnar_file(file)
+    np.savez(file, **arrays)
+    with open(metadata_file(file), 'w') as f: json.dump(metadata, f)
+
+def save_columnar_table(df, file):
+    """Save a DataFrame (e.g., a Model table or spearman table)
+    column-by-column."""
+    keys = [f'c{i}' for i in range(df.shape[1])]
+    metadata = {
+        'kind': 'table',
+        'index': _index_to_json(df.index),
+        'columns': _index_to_json(df.columns),
+        'keys': keys,
+    }
+    _save(file, metadata, {i: df.iloc[:, n].values for n, i in enumerate(keys)})
+
+def load_columnar_table(file, columns=None):
+    """
+    Load a DataFrame saved with `save_columnar_table`. Only the arrays of
+    the given columns are read from disk.
+
+    Parameters
+    ----------
+    file : str
+        Result file (any extension).
+    columns : Iterable, optional
+        Column labels to load. Defaults to all columns.
+
+    """
+    metadata = _load_metadata(file)
+    if metadata['kind'] != 'table':
+        raise ValueError(f"'{file}' is not a columnar table")
+    all_columns = _index_from_json(metadata['columns'])
+    if columns is None:
+        columns = all_columns
+    elif isinstance(all_columns, pd.MultiIndex):
+        columns = pd.MultiIndex.from_tuples(columns, names=all_columns.names)
+    else:
+        columns = pd.Index(columns, name=all_columns.name)
+    locations = all_columns.get_indexer(columns)
+    if (locations == -1).any():
+        raise KeyError(f"{list(columns[locations == -1])} not in '{file}'")
+    keys = metadata['keys']
+    with np.load(columnar_file(file)) as arrays:
+        data = {n: arrays[keys[i]] for n, i in enumerate(locations)}
+    df = pd.DataFrame(data, index=_index_from_json(metadata['index']))
+    df.columns = columns
+    return df
+
+def save_columnar_sheets(sheets, coordinate, name, file):
+    """
+    Save Monte Carlo results across a coordinate (one 2d array of
+    samples by coordinate points for each sheet).
+
+    Parameters
+    ----------
+    sheets : dict[str, array]
+        Metric data by sheet name (e.g., metric short description).
+    coordinate : Iterable
+        Coordinate values (columns of each sheet).
+    name : str
+        Name of coordinate.
+    file : str
+        Result file (any extension).
+
+    """
+    keys = {j: f's{i}' for i, j in enumerate(sheets)}
+    metadata = {
+        'kind': 'sheets',
+        'columns': _index_to_json(pd.Index(coordinate, name=name)),
+        'sheets': keys,
+    }
+    _save(file, metadata, {keys[i]: np.asarray(j) for i, j in sheets.items()})
+
+def load_columnar_sheet(file, sheet):
+    """Load a single sheet saved with `save_columnar_sheets` as a
+    DataFrame with coordinate values as columns."""
+    metadata = _load_metadata(file)
+    if metadata['kind'] != 'sheets':
+        raise ValueError(f"'{file}' does not have columnar sheets")
+    with np.load(columnar_file(file)) as arrays:
+        data = arrays[metadata['sheets'][sheet]]
+    return pd.DataFrame(data, columns=_index_from_json(metadata['columns']))
+
+def columnar_to_excel(file, xlfile=None):
+    """Export a columnar store to Excel. Defaults to the same file name with
+    an .xlsx extension."""
+    if xlfile is None: xlfile = os.path.splitext(file)[0] + '.xlsx'
+    metadata = _load_metadata(file)
+    if metadata['kind'] == 'table':
+        load_columnar_table(file).to_excel(xlfile)
+    else:
+        with pd.ExcelWriter(xlfile) as writer:
+            for sheet in metadata['sheets']:
+                load_columnar_sheet(file, sheet).to_excel(writer, sheet_name=sheet)
+    return xlfile
@@ -0,0 +1,358 @@
+# -*- coding: utf-8 -*-
+"""
+Parallel and adaptive evaluation of contour data. A `ContourEngine` evaluates
+a function of two variables (e.g.,
+`evaluate_configurations_across_recovery_and_oil_content`) on a grid with a
+process pool. Starting from a coarse grid, cells are bisected only where
+evaluations fail, the curvature of the surface is large, or contour levels 
+cross where bilinear interpolation would misplace them; values at all other 
+points are interpolated bilinearly. Evaluated
+points are saved to a checkpoint file as they complete, so interrupted jobs
+resume where they left off.
+
+Examples
+--------
+>>> import numpy as np # doctest: +SKIP
+>>> from biorefineries import cane # doctest: +SKIP
+>>> x = np.linspace(0.40, 1.0, 20) # doctest: +SKIP
+>>> y = np.linspace(0.05, 0.15, 20) # doctest: +SKIP
+>>> engine = cane.ContourEngine( # doctest: +SKIP
+...     'evaluate_configurations_across_recovery_and_oil_content', x, y,
+...     args=(np.array([['O1', 'O1*'], ['O2', 'O2*']]),),
+...     checkpoint='oil_extraction_analysis_checkpoint.npz', step=4,
+... )
+>>> data = engine.evaluate() # doctest: +SKIP
+>>> engine.evaluated.sum() # Points simulated (others are interpolated) # doctest: +SKIP
+
+"""
+import os
+import numpy as np
+from warnings import catch_warnings, simplefilter
+from multiprocessing import get_context
+from biorefineries import cane
+from .evaluation import _initialize_worker
+
+__all__ = (
+    'ContourEngine',
+)
+
+_worker_function = None # Function and arguments evaluated by worker processes
+
+def _resolve_function(f):
+    return getattr(cane, f) if isinstance(f, str) else f
+
+def _initialize_contour_worker(f, args, initializer):
+    global _worker_function
+    _initialize_worker(initializer)
+    _worker_function = (_resolve_function(f), args)
+
+def _evaluate_point(task):
+    index, x, y = task
+    f, args = _worker_function
+    try:
+        return index, np.asarray(f(x, y, *args), dtype=float)
+    except Exception: # Failed points are saved as nan (and refined around)
+        return index, None
+
+def coarse_indices(n, step):
+    return np.unique(np.r_[0:n:step, n - 1])
+
+def second_differences(values, axis):
+    # Deviation of each point from the linear interpolation of its neighbors;
+    # boundary points take the value of their interior neighbor
+    n = values.shape[axis]
+    if n < 3: return np.full(values.shape, np.inf)
+    v = np.moveaxis(values, axis, 0)
+    d = np.abs(v[:-2] - 2 * v[1:-1] + v[2:]) / 2
+    d = np.concatenate([d[:1], d, d[-1:]])
+    return np.moveaxis(d, 0, axis)
+
+
+class ContourEngine:
+    """
+    Create a ContourEngine object that evaluates contour data of a function
+    over a grid in parallel, with adaptive refinement and checkpoints.
+
+    Parameters
+    ----------
+    f : str|Callable
+        Function of x, y, and `args` that returns an array of metrics (of
+        any shape); either the name of a function in `cane` (e.g.,
+        'evaluate_configurations_across_recovery_and_oil_content') or a
+        picklable function.
+    x : 1d array
+        Grid points in the x-axis.
+    y : 1d array
+        Grid points in the y-axis.
+    args : tuple, optional
+        Additional arguments of `f`.
+    checkpoint : str, optional
+        Path of the npz file that evaluated points are saved to and resumed
+        from. The file is removed once all contour data is evaluated.
+    processes : int, optional
+        Number of worker processes. Defaults to the number of CPUs. If 1,
+        points are evaluated in this process.
+    step : int, optional
+        Number of grid intervals between points of the initial coarse grid.
+        Defaults to 1 (i.e., all points are evaluated).
+    levels : int|1d array, optional
+        Contour levels; cells crossed by a contour level are refined unless
+        bilinear interpolation places the contour within `contour_tolerance`.
+        An integer gives the number of evenly spaced levels within the range
+        of each metric. Defaults to 10.
+    tolerance : float, optional
+        Curvature (relative to the range of each metric) above which cells
+        are refined. Defaults to 0.02.
+    contour_tolerance : float, optional
+        Estimated displacement of contour lines by bilinear interpolation 
+        [grid intervals] above which cells crossed by a contour level are
+        refined. Defaults to 0.5.
+    metrics : index, optional
+        Index of the array returned by `f` of metrics that are refined for 
+        (e.g., the plotted metrics). Defaults to all metrics.
+    autosave : int, optional
+        Number of evaluations between checkpoints. Defaults to 10.
+    initializer : Callable, optional
+        Called with no arguments once in each worker process to load
+        default settings (e.g., `cane.YRCP2023`); must be picklable.
+    context : str, optional
+        Multiprocessing start method (e.g., 'fork' or 'spawn').
+
+    Attributes
+    ----------
+    data : ndarray
+        Values of metrics by y and x (as in `np.meshgrid(x, y)`), followed
+        by the dimensions of the metrics returned by `f`.
+    evaluated : 2d array[bool]
+        Whether each point was evaluated (rather than interpolated).
+    evaluations : int
+        Number of evaluations (excluding points resumed from the checkpoint).
+
+    Notes
+    -----
+    The curvature of cells of the initial grid is estimated by second
+    differences of their corners; the curvature of bisected cells is the
+    largest deviation of the points added by the bisection of their parent
+    from the bilinear interpolation of its corners. A contour crossing a
+    cell is displaced by about the curvature over the change of the metric
+    across the cell (times the size of the cell). Failed evaluations are 
+    saved as nan and cells around them are refined down to single grid 
+    intervals.
+
+    """
+    __slots__ = ('f', 'x', 'y', 'args', 'checkpoint', 'processes', 'step',
+                 'levels', 'tolerance', 'contour_tolerance', 'metrics', 
+                 'autosave', 'initializer', 'context', 'data', 'evaluated', 
+                 'evaluations', '_pool', '_unsaved')
+
+    def __init__(self, f, x, y, args=(), checkpoint=None, processes=None,
+                 step=1, levels=10, tolerance=0.02, contour_tolerance=0.5,
+                 metrics=None, autosave=10, initializer=None, context=None):
+        self.f = f
+        self.x = np.asarray(x, dtype=float)
+        self.y = np.asarray(y, dtype=float)
+        self.args = tuple(args)
+        self.checkpoint = checkpoint
+        self.processes = (os.cpu_count() or 1) if processes is None else processes
+        self.step = step
+        self.levels = levels
+        self.tolerance = tolerance
+        self.contour_tolerance = contour_tolerance
+        self.metrics = metrics
+        self.autosave = autosave
+        self.initializer = initializer
+        self.context = context
+        self.data = None
+        self.evaluated = np.zeros([self.y.size, self.x.size], bool)
+        self.evaluations = 0
+        self._pool = None
+        self._unsaved = 0
+
+    def load_checkpoint(self):
+        """Load evaluated points from the checkpoint file (if any)."""
+        file = self.checkpoint
+        if not (file and os.path.exists(file)): return
+        with np.load(file) as checkpoint:
+            if not (checkpoint['x'].shape == self.x.shape and np.allclose(checkpoint['x'], self.x)
+                    and checkpoint['y'].shape == self.y.shape and np.allclose(checkpoint['y'], self.y)):
+                raise ValueError(f"grid of checkpoint {file!r} does not match; "
+                                  "remove it or use another checkpoint file")
+            self.data = checkpoint['data']
+            self.evaluated = checkpoint['evaluated']
+
+    def save_checkpoint(self):
+        """Save evaluated points to the checkpoint file."""
+        file = self.checkpoint
+        self._unsaved = 0
+        if not file or self.data is None: return
+        temporary = file + '.tmp'
+        with open(temporary, 'wb') as f:
+            np.savez(f, x=self.x, y=self.y, data=self.data, evaluated=self.evaluated)
+        os.replace(temporary, file) # Never leave a partially written checkpoint
+
+    def _store(self, index, values):
+        data = self.data
+        if data is None and values is not None:
+            self.data = data = np.full([*self.evaluated.shape, *values.shape], np.nan)
+        if values is not None: data[index] = values
+        elif data is not None: data[index] = np.nan
+        self.evaluated[index] = True
+        self.evaluations += 1
+        self._unsaved += 1
+        if self._unsaved >= self.autosave: self.save_checkpoint()
+
+    def _evaluate_points(self, points):
+        evaluated = self.evaluated
+        x = self.x
+        y = self.y
+        tasks = [((i, j), x[j], y[i]) for i, j in dict.fromkeys(points) if not evaluated[i, j]]
+        if not tasks: return
+        failed = []
+        if self._pool is None:
+            for task in tasks:
+                index, values = _evaluate_point(task)
+                if values is None: failed.append(index)
+                else: self._store(index, values)
+        else:
+            for index, values in self._pool.imap_unordered(_evaluate_point, tasks):
+                if values is None: failed.append(index)
+                else: self._store(index, values)
+        # Failures are stored last, once the shape of the data is known
+        for index in failed: self._store(index, None)
+        if self.data is None: raise RuntimeError('all evaluations failed')
+        self.save_checkpoint()
+
+    def _metric_values(self):
+        data = self.data
+        return data.reshape([*data.shape[:2], -1])
+
+    def _scales_and_levels(self):
+        values = self._metric_values()[self.evaluated]
+        finite = np.where(np.isfinite(values), values, np.nan)
+        with catch_warnings():
+            simplefilter('ignore', RuntimeWarning) # All-nan metrics
+            lb = np.nanmin(finite, 0)
+            ub = np.nanmax(finite, 0)
+        scale = ub - lb
+        scale[~(scale > 0)] = np.inf # Constant (or all nan) metrics need no refinement
+        if self.metrics is not None:
+            selected = np.zeros(self.data.shape[2:], bool)
+            selected[self.metrics] = True
+            scale[~selected.ravel()] = np.inf # Other metrics need no refinement either
+        levels = self.levels
+        if levels is None:
+            levels = np.zeros([lb.size, 0])
+        elif np.ndim(levels) == 0:
+            levels = lb[:, None] + (ub - lb)[:, None] * np.arange(1, levels + 1) / (levels + 1)
+        else:
+            levels = np.broadcast_to(np.asarray(levels, dtype=float), [lb.size, len(levels)])
+        return scale, levels
+
+    def _refine(self, cell, scale, levels):
+        i0, i1, j0, j1, deviation = cell
+        if i1 - i0 < 2 and j1 - j0 < 2: return False
+        corners = self._metric_values()[[i0, i0, i1, i1], [j0, j1, j0, j1]]
+        if not np.isfinite(corners).all(): return True
+        refined = scale < np.inf
+        curvature = deviation[refined] / scale[refined]
+        if (curvature > self.tolerance).any(): return True
+        lb = corners.min(0)[refined]
+        ub = corners.max(0)[refined]
+        levels = levels[refined]
+        crossed = ((levels > lb[:, None]) & (levels <= ub[:, None])).any(1)
+        if not crossed.any(): return False
+        size = max(i1 - i0, j1 - j0)
+        displacement = size * deviation[refined][crossed] / (ub - lb)[crossed]
+        return (displacement > self.contour_tolerance).any()
+
+    def _interpolate(self, i0, i1, j0, j1, i, j):
+        # Bilinear interpolation of metrics at points (i, j) within a cell
+        values = self._metric_values()
+        x = self.x
+        y = self.y
+        v = (y[i] - y[i0]) / (y[i1] - y[i0]) if i1 != i0 else np.zeros_like(y[i])
+        u = (x[j] - x[j0]) / (x[j1] - x[j0]) if j1 != j0 else np.zeros_like(x[j])
+        u = u[..., None]
+        v = v[..., None]
+        return ((1 - v) * ((1 - u) * values[i0, j0] + u * values[i0, j1])
+                + v * ((1 - u) * values[i1, j0] + u * values[i1, j1]))
+
+    @staticmethod
+    def _bisect(cell):
+        i0, i1, j0, j1, _ = cell
+        si = [i0, (i0 + i1) // 2, i1] if i1 - i0 > 1 else [i0, i1]
+        sj = [j0, (j0 + j1) // 2, j1] if j1 - j0 > 1 else [j0, j1]
+        points = [(i, j) for i in si for j in sj if (i in (i0, i1)) + (j in (j0, j1)) < 2]
+        children = [(a, b, c, d) for a, b in zip(si[:-1], si[1:]) for c, d in zip(sj[:-1], sj[1:])]
+        return points, children
+
+    def _initial_cells(self):
+        yi = coarse_indices(self.y.size, self.step)
+        xi = coarse_indices(self.x.size, self.step)
+        self._evaluate_points([(i, j) for i in yi for j in xi])
+        values = self._metric_values()[np.ix_(yi, xi)]
+        with np.errstate(invalid='ignore'):
+            deviation = np.maximum(second_differences(values, 0), second_differences(values, 1))
+        deviation = np.where(np.isnan(deviation), np.inf, deviation)
+        return [
+            (yi[a], yi[a + 1], xi[b], xi[b + 1], deviation[a:a+2, b:b+2].max((0, 1)))
+            for a in range(yi.size - 1) for b in range(xi.size - 1)
+        ]
+
+    def _fill(self, leaves):
+        # Smaller cells overwrite interpolated values of larger cells
+        evaluated = self.evaluated
+        values = self._metric_values().copy()
+        leaves = sorted(leaves, key=lambda c: (c[1] - c[0]) * (c[3] - c[2]), reverse=True)
+        for i0, i1, j0, j1, _ in leaves:
+            i, j = np.meshgrid(np.arange(i0, i1 + 1), np.arange(j0, j1 + 1), indexing='ij')
+            mask = ~evaluated[i, j]
+            if not mask.any(): continue
+            i = i[mask]
+            j = j[mask]
+            with np.errstate(invalid='ignore'):
+                values[i, j] = self._interpolate(i0, i1, j0, j1, i, j)
+        return values.reshape(self.data.shape)
+
+    def evaluate(self):
+        """Evaluate and return contour data (see `data`)."""
+        self.load_checkpoint()
+        if self.processes > 1:
+            self._pool = get_context(self.context).Pool(
+                self.processes, _initialize_contour_worker,
+                (self.f, self.args, self.initializer),
+            )
+        else:
+            _initialize_contour_worker(self.f, self.args, self.initializer)
+        try:
+            cells = self._initial_cells()
+            leaves = []
+            while cells:
+                scale, levels = self._scales_and_levels()
+                refined = []
+                for cell in cells:
+                    if self._refine(cell, scale, levels): refined.append(cell)
+                    else: leaves.append(cell)
+                bisections = [self._bisect(i) for i in refined]
+                self._evaluate_points([j for i, _ in bisections for j in i])
+                values = self._metric_values()
+                cells = []
+                for cell, (points, children) in zip(refined, bisections):
+                    i, j = np.array(points).T
+                    with np.errstate(invalid='ignore'):
+                        deviation = np.abs(values[i, j] - self._interpolate(*cell[:4], i, j))
+                    deviation = np.where(np.isnan(deviation), np.inf, deviation).max(0)
+                    cells.extend([(*child, deviation) for child in children])
+        finally:
+            if self._pool is not None:
+                self._pool.close()
+                self._pool.join()
+                self._pool = None
+            _initialize_worker(None)
+        self.data = data = self._fill(leaves)
+        if self.checkpoint and os.path.exists(self.checkpoint): os.remove(self.checkpoint)
+        return data
+
+    def __repr__(self):
+        return (f"<{type(self).__name__}: {self.evaluated.sum()} of "
+                f"{self.evaluated.size} points evaluated>")
@@ -648,7 +648,9 @@ def plot_metrics_across_biomass_yield(
                     
     return fig, axes
 
-def relative_sorghum_oil_content_and_cane_oil_content_data(load, configurations):
+def relative_sorghum_oil_content_and_cane_oil_content_data(
+        load, configurations, processes=None, step=1, **kwargs
+    ):
     # Generate contour data
     y = np.linspace(0.01, 0.10, 20)
     x = np.linspace(0.01, 0.10, 20)
@@ -662,9 +664,12 @@ def relative_sorghum_oil_content_and_cane_oil_content_data(load, configurations)
         data = np.load(file)
     else:
         from warnings import filterwarnings; filterwarnings('ignore')
-        data = cane.evaluate_configurations_across_sorghum_and_cane_oil_content(
-            X, Y, configurations, 
+        engine = cane.ContourEngine(
+            'evaluate_configurations_across_sorghum_and_cane_oil_content', 
+            x, y, args=(configurations,), processes=processes, step=step,
+            checkpoint=file.replace('.npy', '_checkpoint.npz'), **kwargs
         )
+        data = engine.evaluate()
         np.save(file, data)
     return X, Y, data
     
@@ -811,15 +816,19 @@ def plot_oil_recovery_integration(
     return fig, axes, other_axes
 
 def plot_sorghum_oil_content_and_cane_oil_content_contours(
-        load=False, configuration_index=None, smooth=None,
+        load=False, configuration_index=None, smooth=None, processes=None, 
+        step=1, **kwargs
     ):
     if configuration_index is None: configuration_index = [1, 2]
-    # Generate contour data
-    X, Y, data = relative_sorghum_oil_content_and_cane_oil_content_data(load, configuration_index)
     MFPP = cane.MFPP
     TCI = cane.TCI
     metrics = [MFPP, TCI]
     metric_indices = [cane.all_metric_mockups.index(i) for i in metrics]
+    # Generate contour data (refined for plotted metrics only)
+    kwargs.setdefault('metrics', (slice(None), metric_indices))
+    X, Y, data = relative_sorghum_oil_content_and_cane_oil_content_data(
+        load, configuration_index, processes, step, **kwargs
+    )
     data = data[:, :, :, metric_indices]
     
     # Plot contours
@@ -881,7 +890,7 @@ def plot_sorghum_oil_content_and_cane_oil_content_contours(
 def plot_recovery_and_oil_content_contours(
         load=False, metric_index=0, N_decimals=1, configurations=None,
         N_points=20, yticks=None, titles=None, cmap=None, smooth=None,
-        with_oilsorghum_only=False,
+        with_oilsorghum_only=False, processes=None, step=1, **kwargs
     ):
     if yticks is None: yticks = [5, 7.5, 10, 12.5, 15]
     if configurations is None:
@@ -904,9 +913,13 @@ def plot_recovery_and_oil_content_contours(
     if load:
         data = np.load(file)
     else:
-        data = cane.evaluate_configurations_across_recovery_and_oil_content(
-            X, Y, configurations,
+        kwargs.setdefault('metrics', (..., metric_index)) # Refine for plotted metric only
+        engine = cane.ContourEngine(
+            'evaluate_configurations_across_recovery_and_oil_content', 
+            x, y, args=(configurations,), processes=processes, step=step,
+            checkpoint=file.replace('.npy', '_checkpoint.npz'), **kwargs
         )
+        data = engine.evaluate()
     np.save(file, data)
     data = data[:, :, :, :, metric_index]
     
@@ -0,0 +1,106 @@
+# -*- coding: utf-8 -*-
+"""
+Shared utilities for compiling price data. Yearly RIN credit prices are
+compiled from the weekly RIN price CSV files and cached in a JSON file
+next to the CSV (keyed by the hash of the CSV), so that price distribution
+modules only parse the CSV files when they change.
+"""
+import os
+import json
+import hashlib
+import numpy as np
+
+__all__ = (
+    'LinearModel',
+    'file_hash',
+    'summarize_RIN_credit_by_year',
+    'load_RIN_credit_by_year',
+)
+
+RIN_codes = ('D3', 'D4', 'D5', 'D6')
+
+class LinearModel:
+    """
+    Create a LinearModel object for ordinary least squares regression. It
+    implements the subset of the scikit-learn `LinearRegression` interface
+    used by the price distribution modules.
+
+    Parameters
+    ----------
+    coef : 1d array, optional
+        Coefficients of the predictors.
+    intercept : float, optional
+        Intercept. Defaults to 0.
+
+    """
+    __slots__ = ('coef_', 'intercept_')
+
+    def __init__(self, coef=None, intercept=0.):
+        self.coef_ = None if coef is None else np.asarray(coef, dtype=float)
+        self.intercept_ = intercept
+
+    def fit(self, X, y):
+        X = np.asarray(X, dtype=float)
+        A = np.hstack([X, np.ones([X.shape[0], 1])])
+        solution, *_ = np.linalg.lstsq(A, np.asarray(y, dtype=float), rcond=None)
+        self.coef_ = solution[:-1]
+        self.intercept_ = float(solution[-1])
+        return self
+
+    def predict(self, X):
+        return np.asarray(X, dtype=float) @ self.coef_ + self.intercept_
+
+    def score(self, X, y):
+        """Return the coefficient of determination (R^2)."""
+        y = np.asarray(y, dtype=float)
+        residuals = y - self.predict(X)
+        deviations = y - y.mean()
+        return 1. - (residuals @ residuals) / (deviations @ deviations)
+
+    def __repr__(self):
+        return f"{type(self).__name__}(coef={self.coef_}, intercept={self.intercept_})"
+
+
+def file_hash(file):
+    with open(file, 'rb') as f: return hashlib.sha1(f.read()).hexdigest()
+
+def summarize_RIN_credit_by_year(df):
+    """Return a Series of the mean RIN price [USD / RIN] by calendar year
+    of the transfer week."""
+    import pandas as pd
+    year = pd.to_datetime(df['Transfer Date by Week'], format='%m/%d/%Y').dt.year
+    price = df['RIN Price'].str.strip('$').astype(float)
+    return price.groupby(year.values).mean()
+
+def load_RIN_credit_by_year(file, years):
+    """
+    Return a dictionary of mean RIN prices [USD / RIN] at the given years
+    by fuel D code (D3, D4, D5, and D6). Results are loaded from the cache if
+    the RIN price file has not changed.
+
+    """
+    years = [int(i) for i in years]
+    cache_file = os.path.splitext(file)[0] + '.json'
+    key = file_hash(file)
+    try:
+        with open(cache_file) as f: cache = json.load(f)
+        if cache['hash'] == key and cache['years'] == years:
+            return {i: np.array(cache['prices'][i]) for i in RIN_codes}
+    except (OSError, ValueError, KeyError):
+        pass
+    import pandas as pd
+    df = pd.read_csv(file)
+    prices = {}
+    for code in RIN_codes:
+        by_year = summarize_RIN_credit_by_year(df[df['Fuel (D Code)'] == code])
+        prices[code] = by_year.loc[years].to_numpy()
+    cache = {
+        'hash': key,
+        'years': years,
+        'prices': {i: j.tolist() for i, j in prices.items()},
+    }
+    try:
+        with open(cache_file, 'w') as f: json.dump(cache, f, indent=4)
+    except OSError: # For example, in read-only installations
+        pass
+    return prices
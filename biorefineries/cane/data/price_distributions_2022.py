@@ -4,12 +4,12 @@ Created on Fri May 14 22:48:34 2021
 
 @author: yrc2
 """
-from matplotlib import pyplot as plt
 import numpy as np
 import pandas as pd
 import os
 from chaospy import distributions as shape
 from math import sqrt
+from .price_data import load_RIN_credit_by_year, LinearModel
 
 __all__ = (
     'ethanol_no_RIN_price_distribution', 
@@ -32,39 +32,15 @@ __all__ = (
 
 liter_per_gal = 3.7854
 RINfile = os.path.join(os.path.dirname(__file__), 'RIN_prices_2022.csv')
-df_RIN = pd.read_csv(RINfile)
-df_D3 = df_RIN[df_RIN['Fuel (D Code)'] == 'D3'] # Cellulosic ethanol
-df_D4 = df_RIN[df_RIN['Fuel (D Code)'] == 'D4'] # Biodiesel
-df_D5 = df_RIN[df_RIN['Fuel (D Code)'] == 'D5'] # Advanced ethanol
-df_D6 = df_RIN[df_RIN['Fuel (D Code)'] == 'D6'] # Conventional ethanol
-
-def summarize_RIN_credit_by_year(df, month_offset):
-    data = {}
-    for date, price in zip(df['Transfer Date by Week'], df['RIN Price']):
-        month, day, year = date.split('/')
-        year = int(year)
-        if year in data:
-            data_by_year = data[year]
-        else:
-            data_by_year = data[year] = []
-        if int(month) - month_offset < 0: year -= 1
-        data_by_year.append(float(price.strip('$')))
-    
-    for year, data_by_year in data.items():
-        data[year] = np.mean(data_by_year)
-    return data
-
-def get_RIN_credit_by_year_June2017_to_May2022(df):
-    offset = 6
-    dct = summarize_RIN_credit_by_year(df, offset)
-    years = (2017, 2018, 2019, 2020, 2021)
-    return np.array([dct[y] for y in years])
+RIN_prices_by_year = load_RIN_credit_by_year( # USD / RIN
+    RINfile, years=(2017, 2018, 2019, 2020, 2021)
+)
 
 # June 2017 to May 2022 (start of year is offset by 6 months)
-RIN_D3_prices = get_RIN_credit_by_year_June2017_to_May2022(df_D3) / liter_per_gal
-RIN_D4_prices = get_RIN_credit_by_year_June2017_to_May2022(df_D4) / liter_per_gal
-RIN_D5_prices = get_RIN_credit_by_year_June2017_to_May2022(df_D5) / liter_per_gal
-RIN_D6_prices = get_RIN_credit_by_year_June2017_to_May2022(df_D6) / liter_per_gal
+RIN_D3_prices = RIN_prices_by_year['D3'] / liter_per_gal
+RIN_D4_prices = RIN_prices_by_year['D4'] / liter_per_gal
+RIN_D5_prices = RIN_prices_by_year['D5'] / liter_per_gal
+RIN_D6_prices = RIN_prices_by_year['D6'] / liter_per_gal
 
 
 # %% Raw data
@@ -155,9 +131,11 @@ def fit_triangular_distribution(x, median=False):
     return a, b, c
 
 def plot_triangular_distribution(a, b, c):
+    from matplotlib import pyplot as plt
     return plt.plot([a, b, c], [0, 2 / (b - a), 1])
 
 def plot_histogram(x, *args, bins=10, density=True, **kwargs):
+    from matplotlib import pyplot as plt
     return plt.hist(x, *args, **kwargs)
 
 # Price distributions
@@ -0,0 +1,257 @@
+# -*- coding: utf-8 -*-
+"""
+"""
+import numpy as np
+from functools import wraps
+
+__all__ = ('MetricDerivatives', 'BaseStateMetrics')
+
+class MetricDerivatives:
+    """
+    Create a MetricDerivatives object that evaluates the change in a set of
+    metrics with respect to a process variable (e.g., oil content). The
+    perturbed point(s) are simulated once per sample and all metrics are
+    cached at every point, so any number of derivative metrics can be
+    retrieved at the cost of one (forward) or two (central) extra simulations.
+
+    Parameters
+    ----------
+    system : System
+        System simulated at each point.
+    metrics : Iterable[Metric]
+        Metrics to differentiate.
+    get_x : Callable()
+        Should return the current value of the process variable.
+    set_x : Callable(x)
+        Should load the process variable.
+    step : float, optional
+        Perturbation of the process variable. Defaults to 0.01.
+    unit : float, optional
+        Change in the process variable per which derivatives are
+        reported (e.g., 0.01 for a change of 1% oil content). Defaults
+        to 0.01.
+    scheme : str, optional
+        Either 'forward' or 'central'. Defaults to 'forward'.
+    restore : bool, optional
+        Whether to simulate the system back at the base point after evaluating
+        derivatives. Defaults to False; the process variable is always
+        reloaded, but the system is left at the last perturbed point. Metrics
+        evaluated afterwards that depend on the state of the sample should
+        be passed as `base_state` instead of restoring.
+    base_state : BaseStateMetrics, optional
+        Metrics saved at the base point before the system is perturbed.
+    radius : float, optional
+        If given, derivatives of the nearest previously simulated sample are
+        reused when it lies within this distance (max-norm of parameter values
+        scaled by their distribution bounds), as in a local linear surrogate.
+        Requires parameters to be recorded (see `record_parameters`).
+
+    Attributes
+    ----------
+    simulations : int
+        Number of perturbed simulations.
+    reuses : int
+        Number of samples evaluated with the surrogate.
+
+    Notes
+    -----
+    All simulations are warm started from the converged recycle data of the
+    base point instead of from a cold start (or from the last perturbed point).
+    Systems without recycle data (e.g., agile systems) continue from their
+    last state.
+
+    """
+    __slots__ = ('system', 'metrics', 'index', 'get_x', 'set_x',
+                 'step', 'unit', 'scheme', 'restore', 'base_state', 'radius',
+                 'bounds', 'sample', 'values', 'derivatives',
+                 'samples', 'sample_derivatives', 'simulations', 'reuses')
+
+    def __init__(self, system, metrics, get_x, set_x, step=0.01, unit=0.01,
+                 scheme='forward', restore=False, base_state=None, radius=None):
+        self.system = system
+        self.metrics = metrics = tuple(metrics)
+        self.index = {j: i for i, j in enumerate(metrics)}
+        self.get_x = get_x
+        self.set_x = set_x
+        self.step = step
+        self.unit = unit
+        self.scheme = scheme
+        self.restore = restore
+        self.base_state = base_state
+        self.radius = radius
+        self.bounds = ()
+        self.sample = None
+        self.reset()
+
+    def reset(self):
+        """Clear cached derivatives, surrogate data, and counters."""
+        self.values = {}
+        self.derivatives = None
+        self.samples = []
+        self.sample_derivatives = []
+        self.simulations = self.reuses = 0
+
+    def record_parameters(self, parameters):
+        """Wrap parameter setters to record the current sample (for the
+        surrogate)."""
+        parameters = tuple(parameters)
+        self.sample = sample = np.zeros(len(parameters))
+        bounds = []
+        for i, p in enumerate(parameters):
+            distribution = p.distribution
+            if distribution is None:
+                lb = ub = 0.
+            else:
+                lb = float(np.min(distribution.lower))
+                ub = float(np.max(distribution.upper))
+            bounds.append((lb, ub - lb if ub > lb else 1.))
+            p.setter = self._recorder(p.setter, sample, i)
+        self.bounds = tuple(bounds)
+
+    @staticmethod
+    def _recorder(setter, sample, index):
+        @wraps(setter)
+        def record_and_set(value):
+            sample[index] = value
+            return setter(value)
+        return record_and_set
+
+    def _scaled_sample(self):
+        return np.array([(x - lb) / dx for x, (lb, dx) in zip(self.sample, self.bounds)])
+
+    def _nearest_derivatives(self, sample):
+        samples = self.samples
+        if not samples: return None
+        distances = np.abs(np.array(samples) - sample).max(axis=1)
+        i = distances.argmin()
+        if distances[i] <= self.radius: return self.sample_derivatives[i]
+
+    def _simulate_at(self, x, recycle_data):
+        self.set_x(x)
+        if recycle_data is not None: recycle_data.reset()
+        self.system.simulate()
+        self.simulations += 1
+        return np.array([i.getter() for i in self.metrics])
+
+    def evaluate(self):
+        """Evaluate and cache metrics at the base and perturbed points and
+        the derivatives of all metrics."""
+        if self.scheme not in ('forward', 'central'):
+            raise ValueError(
+                f"scheme must be either 'forward' or 'central', not {self.scheme!r}"
+            )
+        metrics = self.metrics
+        base_state = self.base_state
+        if base_state is not None: base_state.clear()
+        base = np.array([i() for i in metrics])
+        values = self.values = {0.: base}
+        surrogate = self.radius is not None and self.sample is not None
+        if surrogate:
+            sample = self._scaled_sample()
+            derivatives = self._nearest_derivatives(sample)
+            if derivatives is not None:
+                self.derivatives = derivatives
+                self.reuses += 1
+                return
+        x0 = self.get_x()
+        h = self.step
+        system = self.system
+        recycle_data = system.get_recycle_data() if hasattr(system, 'get_recycle_data') else None
+        if base_state is not None: base_state.save()
+        try:
+            values[h] = upper = self._simulate_at(x0 + h, recycle_data)
+            if self.scheme == 'forward':
+                derivatives = (upper - base) * (self.unit / h)
+            else:
+                values[-h] = lower = self._simulate_at(x0 - h, recycle_data)
+                derivatives = (upper - lower) * (self.unit / (2. * h))
+        except:
+            if base_state is not None: base_state.clear()
+            raise
+        finally:
+            self.set_x(x0)
+            if self.restore:
+                if recycle_data is not None: recycle_data.reset()
+                system.simulate()
+        self.derivatives = derivatives
+        if surrogate:
+            self.samples.append(sample)
+            self.sample_derivatives.append(derivatives)
+
+    def get(self, metric):
+        """Return the derivative of a metric at the last evaluated sample."""
+        return self.derivatives[self.index[metric]]
+
+    def __repr__(self):
+        return f"<{type(self).__name__}: {self.scheme} difference, step={self.step}>"
+
+
+class BaseStateMetrics:
+    """
+    Create a BaseStateMetrics object that evaluates metrics ahead of their 
+    turn, before the system is perturbed away from the sample (e.g., by 
+    finite differences), so that the system does not need to be simulated 
+    back at the base point. The getters of the metrics are wrapped to return 
+    the saved value on their next evaluation.
+
+    Parameters
+    ----------
+    metrics : Iterable[Metric]
+        Metrics that depend on the state of the sample in the order they 
+        are saved.
+
+    Notes
+    -----
+    Saved values are discarded when parameters are set (see 
+    `record_parameters`), so values saved by a sample that failed before 
+    they were read are never returned for the next sample.
+
+    """
+    __slots__ = ('metrics', 'getters', 'values')
+
+    def __init__(self, metrics):
+        self.metrics = metrics = tuple(metrics)
+        self.getters = {}
+        self.values = {}
+        for i in metrics:
+            self.getters[i] = getter = i.getter
+            i.getter = self._saved_value_getter(i, getter, self.values)
+
+    def record_parameters(self, parameters):
+        """Wrap parameter setters to discard saved values once a new sample
+        is loaded."""
+        for p in parameters: p.setter = self._discarder(p.setter, self.values)
+
+    @staticmethod
+    def _discarder(setter, values):
+        @wraps(setter)
+        def discard_and_set(value):
+            if values: values.clear()
+            return setter(value)
+        return discard_and_set
+
+    @staticmethod
+    def _saved_value_getter(metric, getter, values):
+        @wraps(getter)
+        def get_saved_value_or_evaluate():
+            if metric in values: return values.pop(metric)
+            return getter()
+        return get_saved_value_or_evaluate
+
+    def save(self, metrics=None):
+        """Evaluate and save metrics (all by default) that are not saved yet."""
+        values = self.values
+        getters = self.getters
+        try:
+            for i in (self.metrics if metrics is None else metrics):
+                if i not in values: values[i] = getters[i]()
+        except:
+            values.clear()
+            raise
+
+    def clear(self):
+        """Discard saved values."""
+        self.values.clear()
+
+    def __repr__(self):
+        return f"<{type(self).__name__}: {', '.join([i.name for i in self.metrics])}>"
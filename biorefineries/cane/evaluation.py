@@ -7,6 +7,7 @@ import pandas as pd
 import biosteam as bst
 from warnings import warn
 from warnings import filterwarnings
+from multiprocessing import get_context
 from biorefineries import cane
 from scipy import interpolate
 from scipy.ndimage.filters import gaussian_filter
@@ -14,10 +15,18 @@ from chaospy import distributions as shape
 from .feature_mockups import (
     all_metric_mockups, 
 )
+from biorefineries.telemetry import ConvergenceTelemetry, save_telemetry_tables
 from .results import (
     monte_carlo_file,
+    telemetry_file,
     autoload_file_name,
     spearman_file,
+    get_monte_carlo_sheet,
+)
+from .columnar_results import (
+    save_columnar_table,
+    save_columnar_sheets,
+    columnar_to_excel,
 )
 
 __all__ = (
@@ -29,6 +38,7 @@ __all__ = (
     'run_uncertainty_and_sensitivity',
     'save_pickled_results',
     'run_all',
+    'run_all_in_parallel',
     'run_sugarcane_microbial_oil',
     'run_oilcane_microbial_oil',
     'run_oilcane_microbial_oil_across_oil_content',
@@ -156,7 +166,18 @@ def evaluate_metrics_oil_recovery_integration(microbial_oil_recovery, microbial_
             data[i, j, :] = [i() for i in br.model.metrics]
     return data
 
-def save_pickled_results(N, configurations=None, rule='L', optimize=True):
+def save_table(table, file, excel=False):
+    save_columnar_table(table, file)
+    if excel: table.to_excel(file)
+
+def save_table_across_coordinate(model, metric_data, coordinate, name, file, excel=False):
+    save_columnar_sheets(
+        {i.short_description: metric_data[i.index] for i in model.metrics},
+        coordinate, name, file,
+    )
+    if excel: columnar_to_excel(file)
+
+def save_pickled_results(N, configurations=None, rule='L', optimize=True, excel=False):
     from warnings import filterwarnings
     filterwarnings('ignore', category=bst.exceptions.DesignWarning)
     filterwarnings('ignore', category=bst.exceptions.CostWarning)
@@ -171,14 +192,14 @@ def save_pickled_results(N, configurations=None, rule='L', optimize=True):
             file=autoload_file_name(name),
             safe=False
         )
-        br.model.table.to_excel(file)
+        save_table(br.model.table, file, excel)
         br.model.table = br.model.table.dropna(how='all', axis=1)
         for i in br.model.metrics:
             if i.index not in br.model.table: br.model._metrics.remove(i)
         br.model.table = br.model.table.dropna(how='any', axis=0)
         rho, p = br.model.spearman_r()
         file = spearman_file(name)
-        rho.to_excel(file)
+        save_table(rho, file, excel)
 
 def run_uncertainty_and_sensitivity(name, N, rule='L',
                                     across_lines=False, 
@@ -189,6 +210,8 @@ def run_uncertainty_and_sensitivity(name, N, rule='L',
                                     autoload=True,
                                     optimize=True,
                                     N_coordinate=None,
+                                    excel=False,
+                                    telemetry=False,
                                     **kwargs):
     print(f"Running {name}!")
     filterwarnings('ignore', category=bst.exceptions.DesignWarning)
@@ -234,15 +257,15 @@ def run_uncertainty_and_sensitivity(name, N, rule='L',
             if config is br_sugarcane:
                 br.model.table = br_sugarcane.model.table
             
-        br.model.evaluate_across_coordinate(
+        metric_data = br.model.evaluate_across_coordinate(
             name='Line',
             notify=int(N/10),
             f_coordinate=set_line,
             f_evaluate=evaluate,
             coordinate=df.index,
             notify_coordinate=True,
-            xlfile=file,
         )
+        save_table_across_coordinate(br.model, metric_data, df.index, 'Line', file, excel)
     elif across_oil_content:
         evaluate = None
         # Remove cane oil content setter and replace with ROI target setter
@@ -372,15 +395,15 @@ def run_uncertainty_and_sensitivity(name, N, rule='L',
                 #     **kwargs,
                 # )
             
-        br.model.evaluate_across_coordinate(
+        metric_data = br.model.evaluate_across_coordinate(
             name='Oil content',
             notify=int(N/10),
             f_coordinate=br.composition_specification.load_oil_content,
             f_evaluate=evaluate,
             coordinate=coordinate,
             notify_coordinate=True,
-            xlfile=file,
         )
+        save_table_across_coordinate(br.model, metric_data, coordinate, 'Oil content', file, excel)
     else:
         autoload_file = autoload_file_name(name)
         np.random.seed(1)
@@ -388,9 +411,11 @@ def run_uncertainty_and_sensitivity(name, N, rule='L',
         br.model.load_samples(samples, optimize=optimize)
         success = False
         if not derivative: br.disable_derivative()
+        if telemetry: telemetry = ConvergenceTelemetry(br.model)
         for i in range(3):
             try:
                 if derivative and name not in ('O1', 'O2'): br.disable_derivative()
+                if telemetry: telemetry.attach()
                 br.model.evaluate(
                     notify=int(N/10),
                     autosave=autosave,
@@ -404,55 +429,235 @@ def run_uncertainty_and_sensitivity(name, N, rule='L',
                 success = True
                 if derivative: br.enable_derivative()
                 break
+            finally:
+                if telemetry: telemetry.detach()
         if not success:
             raise RuntimeError('evaluation failed')
-        br.model.table.to_excel(file)
-        br.model.table = br.model.table.dropna(how='all', axis=1)
-        for i in br.model.metrics:
-            if i.index not in br.model.table: br.model._metrics.remove(i)
-        br.model.table = br.model.table.dropna(how='any', axis=0)
-        rho, p = br.model.spearman_r(filter='omit nan')
-        file = spearman_file(name)
-        rho.to_excel(file)
+        if telemetry: 
+            telemetry.save(telemetry_file(name, 'xlsx' if excel else 'csv'))
+        save_uncertainty_and_sensitivity(br, name, file, excel)
 
 run = run_uncertainty_and_sensitivity
+
+def save_uncertainty_and_sensitivity(br, name, file, excel=False):
+    save_table(br.model.table, file, excel)
+    br.model.table = br.model.table.dropna(how='all', axis=1)
+    for i in br.model.metrics:
+        if i.index not in br.model.table: br.model._metrics.remove(i)
+    br.model.table = br.model.table.dropna(how='any', axis=0)
+    rho, p = br.model.spearman_r(filter='omit nan')
+    file = spearman_file(name)
+    save_table(rho, file, excel)
+
+def load_uncertainty_samples(br, N, rule='L', optimize=True):
+    np.random.seed(1)
+    samples = br.model.sample(N, rule)
+    br.model.load_samples(samples, optimize=optimize)
+
+def sample_chunks(N, chunks):
+    """Return (start, stop) bounds that split N samples into contiguous
+    chunks of nearly equal size."""
+    bounds = np.linspace(0, N, min(chunks, N) + 1).round().astype(int)
+    return [(int(i), int(j)) for i, j in zip(bounds[:-1], bounds[1:])]
+
+def chunk_autoload_file_name(name, chunk, chunks):
+    # A single chunk shares the autoload file of the serial evaluation
+    file = autoload_file_name(name)
+    return file if chunks == 1 else f"{file}_chunk_{chunk}_of_{chunks}"
+
+def _initialize_worker(initializer):
+    filterwarnings('ignore', category=bst.exceptions.DesignWarning)
+    filterwarnings('ignore', category=bst.exceptions.CostWarning)
+    if initializer is not None: initializer()
+
+def _evaluate_samples_chunk(args):
+    (name, N, rule, chunk, chunks, derivative, autosave, 
+     autoload, optimize, telemetry, biorefinery_kwargs) = args
+    cane.Biorefinery.disable_derivative(
+        not (derivative and name in ('O1', 'O2'))
+    )
+    br = cane.Biorefinery(name, **biorefinery_kwargs)
+    model = br.model
+    model.retry_evaluation = True
+    np.random.seed(1)
+    samples = model.sample(N, rule)
+    start, stop = sample_chunks(N, chunks)[chunk]
+    model.load_samples(samples[start:stop], optimize=optimize)
+    N_chunk = stop - start
+    N_notify = min(int(N_chunk/10), 20)
+    print(f"Running {name} (chunk {chunk + 1} of {chunks})!")
+    if telemetry: 
+        telemetry = ConvergenceTelemetry(model)
+        telemetry.attach()
+    try:
+        model.evaluate(
+            notify=int(N_chunk/10),
+            autosave=N_notify if autosave else False,
+            autoload=autoload,
+            file=chunk_autoload_file_name(name, chunk, chunks),
+        )
+    finally:
+        if telemetry: telemetry.detach()
+    columns = [i.index for i in model.metrics]
+    if telemetry:
+        tables = [telemetry.table(), telemetry.iteration_table()]
+        for table in tables: 
+            table.index = table.index.where(table.index < 0, table.index + start)
+    else:
+        tables = None
+    return name, start, stop, model.table[columns].values, tables
+
+def run_all_in_parallel(N, rule='L', configurations=None, 
+                        processes=None, chunks=None,
+                        initializer=None, context=None,
+                        derivative=False,
+                        autosave=True,
+                        autoload=True,
+                        optimize=True,
+                        excel=False,
+                        telemetry=False,
+                        biorefinery_kwargs=None):
+    """
+    Run Monte Carlo uncertainty and sensitivity analyses of biorefinery 
+    configurations, splitting configurations and chunks of samples within 
+    each configuration across a process pool. Results are saved just as in
+    `run_uncertainty_and_sensitivity`.
+
+    Parameters
+    ----------
+    N : int
+        Number of samples.
+    rule : str, optional
+        Sampling rule. Defaults to 'L' (Latin hypercube).
+    configurations : Iterable[str], optional
+        Names of biorefinery configurations. Defaults to all configurations.
+    processes : int, optional
+        Number of worker processes. Defaults to the number of CPUs.
+    chunks : int, optional
+        Number of chunks of samples per configuration. Defaults to evenly
+        distributing worker processes among configurations.
+    initializer : Callable, optional
+        Called with no arguments once in each worker process to load
+        default settings (e.g., `cane.YRCP2023`); must be picklable.
+    context : str, optional
+        Multiprocessing start method (e.g., 'fork' or 'spawn').
+    derivative, autosave, autoload, optimize, excel, telemetry : bool, optional
+        Evaluation options as in `run_uncertainty_and_sensitivity`.
+    biorefinery_kwargs : dict, optional
+        Keyword arguments passed to `cane.Biorefinery`.
     
-def run_all(N, across_lines=False, rule='L', configurations=None,
-            filter=None,**kwargs):
+    Notes
+    -----
+    All chunks sample the same values (seeded with `np.random.seed(1)`) and 
+    each loads a contiguous block of samples (optimizing its own order of 
+    evaluation), so the merged table is identical in layout to the serial 
+    evaluation regardless of the order in which chunks finish. Each chunk 
+    saves its progress to its own autoload file, so interrupted runs resume 
+    when rerun with the same number of chunks; a single chunk resumes from 
+    the autoload file of the serial evaluation.
+    
+    """
     if configurations is None: configurations = configuration_names
+    if biorefinery_kwargs is None: biorefinery_kwargs = {}
+    configurations = list(configurations)
+    if processes is None: processes = os.cpu_count() or 1
+    if chunks is None: chunks = max(1, processes // len(configurations))
+    chunks = min(chunks, N)
+    tasks = [
+        (name, N, rule, chunk, chunks, derivative, autosave, 
+         autoload, optimize, telemetry, biorefinery_kwargs)
+        for name in configurations
+        for chunk in range(chunks)
+    ]
+    processes = min(processes, len(tasks))
+    pool = get_context(context).Pool(processes, _initialize_worker, (initializer,))
+    with pool:
+        results = pool.map(_evaluate_samples_chunk, tasks, chunksize=1)
+    _initialize_worker(None)
     for name in configurations:
-        if filter and not filter(name): continue
-        run_uncertainty_and_sensitivity(
-            name, N, rule, across_lines, **kwargs
+        print(f"Merging {name}!")
+        br = cane.Biorefinery(name, **biorefinery_kwargs)
+        load_uncertainty_samples(br, N, rule, optimize)
+        table = br.model.table
+        columns = [i.index for i in br.model.metrics]
+        data = table[columns].values.copy()
+        telemetry_tables = []
+        for config, start, stop, values, tables in results:
+            if config != name: continue
+            data[start:stop] = values
+            if tables: telemetry_tables.append(tables)
+        table[columns] = data
+        if telemetry:
+            telemetry_tables = [
+                pd.concat([i[n] for i in telemetry_tables]).sort_index(kind='stable')
+                for n in (0, 1)
+            ]
+            save_telemetry_tables(
+                *telemetry_tables, telemetry_file(name, 'xlsx' if excel else 'csv')
+            )
+        file = monte_carlo_file(name, False)
+        save_uncertainty_and_sensitivity(br, name, file, excel)
+    
+def run_all(N, across_lines=False, rule='L', configurations=None,
+            filter=None, processes=None, chunks=None, initializer=None,
+            context=None, derivative=False, autosave=True, autoload=True,
+            optimize=True, excel=False, telemetry=False, 
+            biorefinery_kwargs=None):
+    """
+    Run Monte Carlo uncertainty and sensitivity analyses of biorefinery
+    configurations, either serially (by default) or in parallel (if 
+    `processes` or `chunks` are given; see `run_all_in_parallel`). 
+    Evaluation options are the same in both cases and keyword arguments 
+    of `cane.Biorefinery` are given separately as `biorefinery_kwargs`.
+    
+    """
+    if configurations is None: configurations = configuration_names
+    if filter: configurations = [i for i in configurations if filter(i)]
+    if biorefinery_kwargs is None: biorefinery_kwargs = {}
+    options = dict(
+        derivative=derivative, autosave=autosave, autoload=autoload,
+        optimize=optimize, excel=excel, telemetry=telemetry,
+    )
+    if processes is None and chunks is None:
+        for name in configurations:
+            run_uncertainty_and_sensitivity(
+                name, N, rule, across_lines, **options, **biorefinery_kwargs
+            )
+    elif across_lines:
+        raise ValueError('evaluation across lines cannot be run in parallel')
+    else:
+        run_all_in_parallel(
+            N, rule, configurations, processes, chunks, initializer, context,
+            biorefinery_kwargs=biorefinery_kwargs, **options
         )
 
-def run_sugarcane_microbial_oil(N=None):
+def run_sugarcane_microbial_oil(N=None, processes=None, chunks=None):
     if N is None: N = 5000
     filterwarnings('ignore')
     cane.YRCP2023()
-    run_uncertainty_and_sensitivity('O7.WT', N)
-    run_uncertainty_and_sensitivity('O9.WT', N)
+    run_all(N, configurations=('O7.WT', 'O9.WT'), processes=processes, 
+            chunks=chunks, initializer=cane.YRCP2023)
     
-def run_oilcane_microbial_oil(N=None):
+def run_oilcane_microbial_oil(N=None, processes=None, chunks=None):
     if N is None: N = 5000
     filterwarnings('ignore')
     cane.YRCP2023()
-    run_uncertainty_and_sensitivity('O7', N)
-    run_uncertainty_and_sensitivity('O9', N)
+    run_all(N, configurations=('O7', 'O9'), processes=processes, 
+            chunks=chunks, initializer=cane.YRCP2023)
 
-def run_oilcane_ethanol_constant_biomass(N=None):
+def run_oilcane_ethanol_constant_biomass(N=None, processes=None, chunks=None):
     if N is None: N = 5000
     filterwarnings('ignore')
     cane.YRCP2023()
-    run_uncertainty_and_sensitivity('O1|constant biomass yield', N)
-    run_uncertainty_and_sensitivity('O2|constant biomass yield', N)
+    run_all(N, configurations=('O1|constant biomass yield', 'O2|constant biomass yield'), processes=processes, 
+            chunks=chunks, initializer=cane.YRCP2023)
 
-def run_oilcane_microbial_oil_constant_biomass(N=None):
+def run_oilcane_microbial_oil_constant_biomass(N=None, processes=None, chunks=None):
     if N is None: N = 5000
     filterwarnings('ignore')
     cane.YRCP2023()
-    run_uncertainty_and_sensitivity('O7|constant biomass yield', N)
-    run_uncertainty_and_sensitivity('O9|constant biomass yield', N)
+    run_all(N, configurations=('O7|constant biomass yield', 'O9|constant biomass yield'), processes=processes, 
+            chunks=chunks, initializer=cane.YRCP2023)
 
 def run_oilcane_microbial_oil_across_oil_content(N=None, N_coordinate=None, configurations=None):
     if N is None: N = 200
@@ -493,10 +698,10 @@ def save_target_biomass_yield(configuration='O7'):
     # Set CABBI feedstock target
     br = cane.Biorefinery(configuration, simulate=False)
     file = monte_carlo_file(configuration, across_lines=False, across_oil_content='oilcane vs sugarcane')
-    CBY_df = pd.read_excel(
+    CBY_df = get_monte_carlo_sheet(
         file, 
-        sheet_name=cane.competitive_biomass_yield.short_description,
-        index_col=0)
+        cane.competitive_biomass_yield.short_description,
+    )
     CBY_df = CBY_df.dropna()
     oil_content = np.array(CBY_df.columns) * 100
     q = np.max(CBY_df, axis=0)
@@ -0,0 +1,156 @@
+# -*- coding: utf-8 -*-
+"""
+"""
+import numpy as np
+
+__all__ = ('ResponseSurface',)
+
+class ResponseSurface:
+    """
+    Create a ResponseSurface object that fits responses of simulated samples
+    (e.g., net earnings and TCI at a perturbed biomass yield) linearly with
+    respect to features of the sample (e.g., net earnings and TCI at the
+    sample) by least squares. Predictions are only made within the bounds of
+    the training data and are periodically validated against simulation; if
+    a validation fails, predictions are suspended until more samples are
+    simulated.
+
+    Parameters
+    ----------
+    log : Iterable[bool], optional
+        Whether to fit the logarithm of each response (e.g., for power-law
+        responses). Defaults to fitting all responses linearly.
+    N_min : int, optional
+        Number of simulated samples required before making predictions.
+        Defaults to 50.
+    tolerance : float, optional
+        Maximum relative error of any response at validation. Defaults
+        to 0.01.
+    validation_interval : int, optional
+        Every `validation_interval` prediction is simulated instead to
+        validate the response surface. After a failed validation, this
+        number of samples must be simulated before predicting again.
+        Defaults to 10.
+    margin : float, optional
+        Fraction of the range of each feature in the training data by which
+        predictions may extrapolate. Defaults to 0.
+    active : bool, optional
+        Whether to make predictions. Defaults to True.
+
+    Attributes
+    ----------
+    predictions : int
+        Number of predictions made (i.e., simulations avoided).
+    validations : int
+        Number of predictions validated against simulation.
+    failures : int
+        Number of failed validations.
+
+    """
+    __slots__ = ('log', 'N_min', 'tolerance', 'validation_interval', 'margin',
+                 'active', 'features', 'responses', 'coefficients', 'mean',
+                 'std', 'lb', 'ub', 'pending', 'suspended', 'count',
+                 'predictions', 'validations', 'failures')
+
+    def __init__(self, log=None, N_min=50, tolerance=0.01,
+                 validation_interval=10, margin=0., active=True):
+        self.log = None if log is None else np.array(log, dtype=bool)
+        self.N_min = N_min
+        self.tolerance = tolerance
+        self.validation_interval = validation_interval
+        self.margin = margin
+        self.active = active
+        self.reset()
+
+    def reset(self):
+        """Discard all training data and counters."""
+        self.features = []
+        self.responses = []
+        self.coefficients = self.mean = self.std = self.lb = self.ub = None
+        self.pending = None
+        self.suspended = 0
+        self.count = self.predictions = self.validations = self.failures = 0
+
+    @property
+    def ready(self):
+        """[bool] Whether the response surface can make predictions."""
+        return (self.active and not self.suspended
+                and self.coefficients is not None)
+
+    def _transform(self, responses):
+        responses = np.array(responses, dtype=float)
+        log = self.log
+        if log is not None: responses[..., log] = np.log(responses[..., log])
+        return responses
+
+    def _untransform(self, responses):
+        log = self.log
+        if log is not None: responses[log] = np.exp(responses[log])
+        return responses
+
+    def _design(self, features):
+        features = (np.atleast_2d(features) - self.mean) / self.std
+        return np.hstack([np.ones([features.shape[0], 1]), features])
+
+    def fit(self):
+        """Fit the response surface to all simulated samples."""
+        features = np.array(self.features)
+        N, M = features.shape
+        if N < max(self.N_min, M + 1):
+            self.coefficients = None
+            return
+        lb = features.min(axis=0)
+        ub = features.max(axis=0)
+        self.mean = features.mean(axis=0)
+        std = features.std(axis=0)
+        std[std == 0.] = 1.
+        self.std = std
+        responses = self._transform(self.responses)
+        self.coefficients, *_ = np.linalg.lstsq(
+            self._design(features), responses, rcond=None
+        )
+        self.lb = lb - self.margin * (ub - lb)
+        self.ub = ub + self.margin * (ub - lb)
+
+    def predict(self, features):
+        """
+        Return predicted responses or None if the sample must be simulated
+        (i.e., not enough training data, features outside of bounds, or
+        sample selected for validation).
+
+        """
+        if not self.ready: return None
+        features = np.asarray(features, dtype=float)
+        if (features < self.lb).any() or (features > self.ub).any(): return None
+        responses = self._untransform((self._design(features) @ self.coefficients)[0])
+        self.count += 1
+        if not self.count % self.validation_interval:
+            self.pending = (features, responses)
+            return None
+        self.predictions += 1
+        return responses
+
+    def add(self, features, responses):
+        """Add simulated responses and refit. If the sample was selected for
+        validation, compare with the predicted responses."""
+        features = np.array(features, dtype=float)
+        responses = np.array(responses, dtype=float)
+        pending = self.pending
+        if pending is not None:
+            self.pending = None
+            predicted_features, predicted_responses = pending
+            if (predicted_features == features).all():
+                self.validations += 1
+                error = np.abs(predicted_responses / responses - 1.).max()
+                if not error <= self.tolerance:
+                    self.failures += 1
+                    self.suspended = self.validation_interval
+        elif self.suspended:
+            self.suspended -= 1
+        self.features.append(features)
+        self.responses.append(responses)
+        self.fit()
+
+    def __repr__(self):
+        N = len(self.features)
+        return f"<{type(self).__name__}: {N} samples, {self.predictions} predictions, {self.failures} failures>"
@@ -6,6 +6,9 @@ Created on Thu Nov  4 14:39:10 2021
 """
 from . import feature_mockups as f
 from .parse_configuration import parse_configuration, Configuration, ConfigurationComparison
+from .columnar_results import (
+    columnar_file_exists, load_columnar_table, load_columnar_sheet,
+)
 from warnings import warn
 from thermosteam.utils import roundsigfigs
 import os
@@ -18,7 +21,10 @@ __all__ = (
     'results_folder',
     'spearman_file',
     'monte_carlo_file',
+    'telemetry_file',
     'autoload_file_name',
+    'get_monte_carlo_sheet',
+    'get_spearman',
     'get_monte_carlo_across_oil_content',
     'get_monte_carlo',
     'get_line_monte_carlo',
@@ -41,13 +47,13 @@ images_folder = os.path.join(os.path.dirname(__file__), 'images')
 
 # %% Load simulation data
 
-def spearman_file(name):
+def spearman_file(name, extention='xlsx'):
     number, agile, line, case = parse_configuration(name)
     filename = f'oilcane_spearman_{number}'
     if agile: filename += '_agile'
     if line: filename += '_' + line
     if case: filename += '_' + case.replace(' ', '_')
-    filename += '.xlsx'
+    filename += '.' + extention
     return os.path.join(results_folder, filename)
 
 def monte_carlo_file(name, across_lines=False, across_oil_content=None, extention='xlsx'):
@@ -65,19 +71,38 @@ def monte_carlo_file(name, across_lines=False, across_oil_content=None, extentio
     filename += '.' + extention
     return os.path.join(results_folder, filename)
 
+def telemetry_file(name, extention='xlsx'):
+    # Convergence telemetry of Monte Carlo evaluations (next to results)
+    file = monte_carlo_file(name, extention=extention)
+    head, tail = os.path.split(file)
+    return os.path.join(head, tail.replace('monte_carlo', 'telemetry'))
+
 def autoload_file_name(name):
     return os.path.join(
         results_folder, 
         name.replace('.', '_').replace('|', '_').replace(' ', '_').replace('*', '_agigle')
     )
 
+def get_monte_carlo_sheet(file, sheet):
+    # Prefer the columnar store (loads only the given sheet) over Excel
+    if columnar_file_exists(file):
+        return load_columnar_sheet(file, sheet)
+    else:
+        return pd.read_excel(file, sheet_name=sheet, index_col=0)
+
+def get_spearman(name):
+    file = spearman_file(name)
+    if columnar_file_exists(file):
+        return load_columnar_table(file)
+    else:
+        return pd.read_excel(file, header=[0, 1], index_col=[0, 1])
+
 def get_monte_carlo_across_oil_content(name, metric, derivative=False):
     key = parse_configuration(name)
     if isinstance(key, Configuration):
-        df = pd.read_excel(
+        df = get_monte_carlo_sheet(
             monte_carlo_file(key, True),
-            sheet_name=metric if isinstance(metric, str) else metric.short_description,
-            index_col=0
+            metric if isinstance(metric, str) else metric.short_description,
         )
     elif isinstance(key, ConfigurationComparison):
         df = (
@@ -105,7 +130,7 @@ def get_line_monte_carlo(line, name, feature, cache={}):
             df = cache[key]
         else:
             file = monte_carlo_file(configuration, across_lines=True)
-            cache[key] = df = pd.read_excel(file, header=[0], index_col=[0], sheet_name=feature.short_description)
+            cache[key] = df = get_monte_carlo_sheet(file, feature.short_description)
             df.columns = [str(i) for i in df.columns]
         mc = df[line]
     elif isinstance(configuration, ConfigurationComparison):
@@ -115,6 +140,20 @@ def get_line_monte_carlo(line, name, feature, cache={}):
     mc = mc.dropna(how='all', axis=0)
     return mc
 
+def get_monte_carlo_table(key, index, cache):
+    file = monte_carlo_file(key)
+    if columnar_file_exists(file):
+        # Only load the columns of the given features
+        subkey = (key, index)
+        if subkey in cache:
+            df = cache[subkey]
+        else:
+            cache[subkey] = df = load_columnar_table(file, index)
+    else:
+        cache[key] = df = pd.read_excel(file, header=[0, 1], index_col=[0])
+        df = df[list(index)]
+    return df
+
 def get_monte_carlo(name, features=None, cache={}):
     if features is None: features = f.all_metric_mockups
     elif isinstance(features, bst.Feature): features = [features]
@@ -123,6 +162,7 @@ def get_monte_carlo(name, features=None, cache={}):
     if isinstance(key, Configuration):
         if key in cache:
             df = cache[key]
+            df = df[list(index)]
         elif key.line:
             if (subkey:=(key, index)) in cache:
                 df = cache[subkey]
@@ -131,9 +171,7 @@ def get_monte_carlo(name, features=None, cache={}):
                     file = monte_carlo_file(key, across_lines=True)
                     line = key.line
                     data = np.hstack([
-                        pd.read_excel(
-                            file, header=[0, 1], index_col=[0], sheet_name=i.short_description
-                        )[line].values
+                        get_monte_carlo_sheet(file, i.short_description)[[line]].values
                         for i in features
                     ])
                     cache[subkey] = df = pd.DataFrame(
@@ -143,13 +181,9 @@ def get_monte_carlo(name, features=None, cache={}):
                         )
                     )
                 except:
-                    file = monte_carlo_file(key)
-                    cache[key] = df = pd.read_excel(file, header=[0, 1], index_col=[0])
-                    df = df[list(index)]
+                    df = get_monte_carlo_table(key, index, cache)
         else:
-            file = monte_carlo_file(key)
-            cache[key] = df = pd.read_excel(file, header=[0, 1], index_col=[0])
-            df = df[list(index)]
+            df = get_monte_carlo_table(key, index, cache)
                 
     elif isinstance(key, ConfigurationComparison):
         df_a = get_monte_carlo(key.a, features)
@@ -43,6 +43,8 @@ from .results import (
     monte_carlo_file,
     get_monte_carlo,
     get_line_monte_carlo,
+    get_monte_carlo_sheet,
+    get_spearman,
     spearman_file,
 )
 import os
@@ -1705,7 +1707,7 @@ def _plot_competitive_biomass_yield_across_oil_content(
     ):
     if fs is None: fs = 8
     file = monte_carlo_file(configuration, across_lines=False, across_oil_content='oilcane vs sugarcane')
-    df = pd.read_excel(file, sheet_name=features.competitive_biomass_yield.short_description, index_col=0)
+    df = get_monte_carlo_sheet(file, features.competitive_biomass_yield.short_description)
     df = df.dropna()
     oil_content = np.array(df.columns) * 100
     plt.ylabel(f"Biomass yield\n[{format_units('DMT/ha/y')}]")
@@ -1744,7 +1746,7 @@ def plot_competitive_microbial_oil_yield_across_oil_content(
     ):
     if configuration is None: configuration = 'O7'
     file = monte_carlo_file(configuration, across_lines=False, across_oil_content='microbial oil vs bioethanol')
-    df = pd.read_excel(file, sheet_name=features.competitive_microbial_oil_yield.short_description, index_col=0)
+    df = get_monte_carlo_sheet(file, features.competitive_microbial_oil_yield.short_description)
     df = df.dropna(axis=0)
     fig = plt.figure()
     oil_fraction = np.array(df.columns) * 100
@@ -2025,7 +2027,7 @@ def plot_spearman(configurations, labels=None, metric=None,
     for name in configurations:
         file = spearman_file(name)
         try: 
-            df = pd.read_excel(file, header=[0, 1], index_col=[0, 1])
+            df = get_spearman(name)
         except: 
             warning = RuntimeWarning(f"file '{file}' not found")
             warn(warning)
@@ -2074,7 +2076,7 @@ def plot_spearman_YRCP2023(configurations=None, labels=None,
         names = get_YRCP2023_spearman_names(configuration, kind)
         file = spearman_file(configuration)
         try: 
-            df = pd.read_excel(file, header=[0, 1], index_col=[0, 1])
+            df = get_spearman(configuration)
         except: 
             warning = RuntimeWarning(f"file '{file}' not found")
             warn(warning)
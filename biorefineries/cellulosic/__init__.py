@@ -4,6 +4,7 @@
 from . import chemicals
 from . import units
 from . import systems
+from . import cache
 from . import biorefinery
 from . import process_settings
 
@@ -11,6 +12,7 @@ __all__ = (
     *chemicals.__all__, 
     *units.__all__, 
     *systems.__all__,
+    *cache.__all__,
     *biorefinery.__all__,
     *process_settings.__all__,
 )
@@ -18,5 +20,6 @@ __all__ = (
 from .chemicals import *
 from .units import *
 from .systems import *
+from .cache import *
 from .biorefinery import *
 from .process_settings import *
\ No newline at end of file
@@ -14,6 +14,11 @@ from .process_settings import load_process_settings
 from .systems import create_cellulosic_ethanol_system
 from biorefineries.tea import create_cellulosic_ethanol_tea
 from biosteam import main_flowsheet as F
+from .cache import BiorefineryCache
+from biorefineries.snapshot import (
+    dump_snapshot, load_header, load_snapshot, 
+    unit_ticket_numbers, loaded_ticket_numbers,
+)
 
 __all__ = (
     'Biorefinery',
@@ -24,7 +29,17 @@ liter_per_gallon = 3.78541
 ethanol_density_kggal = liter_per_gallon * ethanol_density_kgL # kg/gal
 
 class Biorefinery:
-    cache = {}
+    cache = BiorefineryCache()
+    
+    @classmethod
+    def clear_cache(cls):
+        """Remove all cached biorefineries and reset cache statistics."""
+        cls.cache.clear()
+    
+    @classmethod
+    def cache_info(cls):
+        """Return cache hit/miss statistics."""
+        return cls.cache.info()
     
     @property
     def chemicals(self):
@@ -34,8 +49,33 @@ class Biorefinery:
             self._chemicals = chemicals = create_cellulosic_ethanol_chemicals()
         return chemicals
     
+    def save(self, file):
+        """Save a snapshot of the converged biorefinery to a file."""
+        with open(file, 'wb') as f:
+            header = {'arguments': self._arguments, 'ticket_numbers': self._ticket_numbers}
+            dump_snapshot(f, header, self.flowsheet,
+                          {'biorefinery': self, 'tea': self.tea})
+    
+    @classmethod
+    def load(cls, file, chemicals=None):
+        """
+        Return a biorefinery restored from a snapshot file. The flowsheet is 
+        constructed (but not simulated) and the saved state is merged into it.
+        Custom chemicals used to create the saved biorefinery must be passed
+        again.
+        
+        """
+        with open(file, 'rb') as f:
+            header = load_header(f)
+            with loaded_ticket_numbers(header['ticket_numbers']):
+                self = cls(**header['arguments'], chemicals=chemicals, 
+                           cache=None, simulate=False)
+            load_snapshot(f, self.flowsheet,
+                          {'biorefinery': self, 'tea': self.tea}, self.sys)
+        return self
+    
     def __new__(cls, name=None, cache=cache, chemicals=None, include_blowdown_recycle=None,
-                feedstock_kwargs=None, prices=None, GWP_CFs=None):
+                feedstock_kwargs=None, prices=None, GWP_CFs=None, simulate=True):
         if include_blowdown_recycle is None: include_blowdown_recycle = False
         if name is None: name = 'corn stover ethanol'
         if 'ethanol' not in name:
@@ -43,11 +83,18 @@ class Biorefinery:
                               "only 'ethanol' is valid")
         
         key = (name, include_blowdown_recycle)
-        if key in cache:
+        if cache is not None and key in cache:
             return cache[key]
         else:
-            cache[key] = self = super().__new__(cls)
+            self = super().__new__(cls)
+            if cache is not None: cache[key] = self
+        self._arguments = dict(
+            name=name, include_blowdown_recycle=include_blowdown_recycle,
+            feedstock_kwargs=feedstock_kwargs and feedstock_kwargs.copy(),
+            prices=prices, GWP_CFs=GWP_CFs,
+        )
         if chemicals is not None: self._chemicals = chemicals
+        self._ticket_numbers = unit_ticket_numbers() # Saved in snapshots to reproduce default unit IDs
         self.flowsheet = bst.Flowsheet(name)
         F.set_flowsheet(self.flowsheet)
         bst.settings.set_thermo(self.chemicals)
@@ -79,7 +126,7 @@ class Biorefinery:
             e_CF = GWP_CFs.pop('Electricity', None)
             if e_CF: bst.PowerUtility.characterization_factors['GWP'] = e_CF
             for ID, CF in GWP_CFs.items(): stream.search(ID).characterization_factors['GWP'] = CF
-        sys.simulate()
+        if simulate: sys.simulate()
         u = F.unit
         OSBL_units = (u.WWTC, u.CWP, u.CT, u.PWC, u.ADP,
                       u.T701, u.T702, u.P701, u.P702, u.M701, u.FWT,
@@ -87,9 +134,10 @@ class Biorefinery:
         self.tea = self.cornstover_tea = tea = create_cellulosic_ethanol_tea(
             sys, OSBL_units=OSBL_units
         )
-        ethanol = F.stream.ethanol
-        ethanol.price = tea.solve_price(ethanol)
-        self.ethanol_price_gal = ethanol.price * ethanol_density_kggal
+        if simulate:
+            ethanol = F.stream.ethanol
+            ethanol.price = tea.solve_price(ethanol)
+            self.ethanol_price_gal = ethanol.price * ethanol_density_kggal
         UnitGroup = bst.process_tools.UnitGroup
         self.Area100 = UnitGroup('Area 100', (u.U101,))
         self.Area200 = UnitGroup('Area 200', (u.T201, u.M201, u.R201, u.P201, u.P202,
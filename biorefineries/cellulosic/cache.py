@@ -0,0 +1,217 @@
+# -*- coding: utf-8 -*-
+"""
+"""
+import os
+import pickle
+import hashlib
+import biosteam as bst
+from warnings import warn
+from collections import OrderedDict, namedtuple
+
+__all__ = (
+    'BiorefineryCache',
+    'CacheInfo',
+)
+
+CacheInfo = namedtuple('CacheInfo', ('hits', 'misses', 'evictions', 'maxsize', 'currsize'))
+
+def dump_pickle(obj, file):
+    with open(file, 'wb') as f: pickle.dump(obj, f)
+
+def load_pickle(file):
+    with open(file, 'rb') as f: return pickle.load(f)
+
+def dump_biorefinery(obj, file):
+    if hasattr(obj, 'save'):
+        obj.save(file)
+    else:
+        dump_pickle(obj, file)
+
+def load_biorefinery(file, cls):
+    if hasattr(cls, 'load'):
+        return cls.load(file)
+    else:
+        return load_pickle(file)
+
+def release_biorefinery(obj):
+    """
+    Unregister the flowsheet of a biorefinery and clear the specifications of
+    its systems (which may be bound to the biorefinery) so that it can be 
+    garbage collected. The biorefinery should not be used afterwards.
+    
+    """
+    flowsheet = getattr(obj, 'flowsheet', None)
+    if not isinstance(flowsheet, bst.Flowsheet): return
+    ID = flowsheet.ID
+    registry = bst.Flowsheet.flowsheet.__dict__
+    if registry.get(ID) is flowsheet: 
+        if bst.main_flowsheet.ID == ID: bst.main_flowsheet.set_flowsheet('default')
+        del registry[ID]
+    for system in flowsheet.system: system.specifications = []
+
+def process_memory():
+    """Return the resident memory of the current process [MB]."""
+    try:
+        import psutil
+    except ImportError:
+        try:
+            # Linux only
+            with open('/proc/self/statm') as f: pages = int(f.read().split()[1])
+        except (OSError, IndexError, ValueError):
+            raise RuntimeError('memory-bounded caches require psutil') from None
+        else:
+            return pages * os.sysconf('SC_PAGE_SIZE') / 1e6
+    else:
+        return psutil.Process().memory_info().rss / 1e6
+
+class BiorefineryCache:
+    """
+    Create a BiorefineryCache object that stores biorefinery instances by
+    configuration key and evicts the least recently used instances once the
+    number of instances or the memory of the process exceeds a limit.
+    Evicted instances can optionally be persisted to disk and restored the
+    next time they are requested.
+
+    Parameters
+    ----------
+    maxsize : int, optional
+        Maximum number of instances. Defaults to no limit.
+    max_memory : float, optional
+        Maximum resident memory of the process [MB]. Least recently used
+        instances are evicted after adding an instance while the process
+        exceeds this limit (the last instance added is never evicted).
+        Defaults to no limit.
+    folder : str, optional
+        If given, evicted instances are persisted to this folder and
+        restored on request.
+    dump : Callable(obj, file), optional
+        Persist an instance to a file. Defaults to the `save` method of the 
+        instance (e.g., `Biorefinery.save`) or pickling if not available.
+    load : Callable(file), optional
+        Restore an instance from a file. Defaults to the `load` class method
+        of the instance (e.g., `Biorefinery.load`) or unpickling if not 
+        available.
+    release : Callable(obj), optional
+        Release an evicted instance after persisting it. Defaults to 
+        unregistering the flowsheet of the biorefinery and clearing the 
+        specifications of its systems, which would otherwise keep evicted
+        biorefineries alive. Evicted instances should not be used afterwards.
+
+    Examples
+    --------
+    >>> cache = BiorefineryCache(maxsize=2)
+    >>> cache['a'] = 1; cache['b'] = 2
+    >>> cache['a']
+    1
+    >>> cache['c'] = 3 # Evicts 'b', the least recently used
+    >>> 'b' in cache
+    False
+    >>> cache.info()
+    CacheInfo(hits=1, misses=1, evictions=1, maxsize=2, currsize=2)
+
+    """
+    __slots__ = ('maxsize', 'max_memory', 'folder', 'dump', 'load', 'release',
+                 'data', 'persisted', 'hits', 'misses', 'evictions')
+
+    def __init__(self, maxsize=None, max_memory=None, folder=None,
+                 dump=None, load=None, release=None):
+        self.maxsize = maxsize
+        self.max_memory = max_memory
+        self.folder = folder
+        self.dump = dump_biorefinery if dump is None else dump
+        self.load = load
+        self.release = release_biorefinery if release is None else release
+        self.data = OrderedDict()
+        self.persisted = {}
+        self.hits = self.misses = self.evictions = 0
+
+    def _file(self, key):
+        name = hashlib.sha1(repr(key).encode()).hexdigest()
+        return os.path.join(self.folder, name + '.pkl')
+
+    def __contains__(self, key):
+        if key in self.data or key in self.persisted:
+            return True
+        else:
+            self.misses += 1
+            return False
+
+    def __getitem__(self, key):
+        data = self.data
+        if key in data:
+            data.move_to_end(key)
+            self.hits += 1
+            return data[key]
+        file, cls = self.persisted.pop(key, (None, None))
+        if file is None: raise KeyError(key)
+        self.hits += 1
+        load = self.load
+        obj = load_biorefinery(file, cls) if load is None else load(file)
+        os.remove(file)
+        self[key] = obj
+        return obj
+
+    def __setitem__(self, key, obj):
+        data = self.data
+        data[key] = obj
+        data.move_to_end(key)
+        file, cls = self.persisted.pop(key, (None, None))
+        if file is not None and os.path.exists(file): os.remove(file)
+        maxsize = self.maxsize
+        if maxsize is not None:
+            while len(data) > maxsize: self._evict()
+        max_memory = self.max_memory
+        if max_memory is not None:
+            while len(data) > 1 and process_memory() > max_memory: self._evict()
+
+    def get(self, key, default=None):
+        return self[key] if key in self else default
+
+    def _evict(self):
+        key, obj = self.data.popitem(last=False)
+        self.evictions += 1
+        folder = self.folder
+        if folder is not None:
+            os.makedirs(folder, exist_ok=True)
+            file = self._file(key)
+            try:
+                self.dump(obj, file)
+            except Exception as error:
+                if os.path.exists(file): os.remove(file)
+                warn(f"could not persist {key!r}; {error}", RuntimeWarning)
+            else:
+                self.persisted[key] = (file, type(obj))
+        self.release(obj)
+
+    def __len__(self):
+        return len(self.data)
+
+    def __iter__(self):
+        return iter(self.data)
+
+    def keys(self):
+        return self.data.keys()
+
+    def values(self):
+        return self.data.values()
+
+    def items(self):
+        return self.data.items()
+
+    def info(self):
+        """Return cache hit/miss statistics."""
+        return CacheInfo(self.hits, self.misses, self.evictions,
+                         self.maxsize, len(self.data))
+
+    def clear(self):
+        """Remove all instances (including persisted ones) and reset
+        statistics."""
+        for file, cls in self.persisted.values():
+            if os.path.exists(file): os.remove(file)
+        self.persisted.clear()
+        self.data.clear()
+        self.hits = self.misses = self.evictions = 0
+
+    def __repr__(self):
+        hits, misses, evictions, maxsize, currsize = self.info()
+        return f"<{type(self).__name__}: {currsize} instances, {hits} hits, {misses} misses>"
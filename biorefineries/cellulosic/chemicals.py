@@ -20,7 +20,7 @@ Data
 
 """
 import thermosteam as tmo
-from thermosteam.utils import chemical_cache
+from biorefineries.chemicals_cache import persistent_chemical_cache
 from thermosteam import functional as fn
 import pandas as pd
 
@@ -121,7 +121,7 @@ def get_grouped_chemicals(stream, units='kmol/hr'):
 
 # %% Chemicals object and define functions
 
-@chemical_cache
+@persistent_chemical_cache(modules=['biorefineries.cane.chemicals'])
 def create_cellulosic_ethanol_chemicals():
     from biorefineries import cane
     chems = tmo.Chemicals([])
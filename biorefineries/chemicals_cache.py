@@ -0,0 +1,221 @@
+# -*- coding: utf-8 -*-
+# BioSTEAM: The Biorefinery Simulation and Techno-Economic Analysis Modules
+# Copyright (C) 2020-2024, Yoel Cortes-Pena <yoelcortes@gmail.com>
+#
+# This module is under the UIUC open-source license. See
+# github.com/BioSTEAMDevelopmentGroup/biosteam/blob/master/LICENSE.txt
+# for license details.
+"""
+On-disk cache of chemicals shared across processes. Chemical sets created by
+functions decorated with `persistent_chemical_cache` and chemicals loaded
+from the databanks through `cached_chemical` are pickled to the cache folder
+(keyed by the creating function, its arguments, the sources it depends on,
+and the versions of the thermodynamic libraries), so that new processes (e.g., process pool workers)
+load them instead of building them from the databanks.
+
+The on-disk cache is disabled by default (chemicals are only cached within
+the process). Enable it by setting the BIOREFINERIES_CHEMICALS_CACHE 
+environment variable to a folder (inherited by process pool workers) or
+through `set_chemicals_cache_folder` (e.g., 
+`set_chemicals_cache_folder('~/.cache/biorefineries/chemicals')`).
+
+"""
+import io
+import os
+import sys
+import pickle
+import hashlib
+import tempfile
+from importlib.util import find_spec
+from warnings import warn
+from functools import wraps
+import thermosteam as tmo
+from thermosteam.utils import chemical_cache
+
+__all__ = (
+    'persistent_chemical_cache',
+    'cached_chemical',
+    'get_chemicals_cache_folder',
+    'set_chemicals_cache_folder',
+    'clear_chemicals_cache',
+)
+
+def _default_folder():
+    folder = os.environ.get('BIOREFINERIES_CHEMICALS_CACHE')
+    return os.path.expanduser(folder) if folder else None
+
+_folder = _default_folder()
+_loaded = {} # Pickled chemicals by key, to avoid reading files more than once
+_versions = None
+_file_hashes = {}
+
+def get_chemicals_cache_folder():
+    """Return the folder of the chemicals cache (None if disabled)."""
+    return _folder
+
+def set_chemicals_cache_folder(folder):
+    """Set the folder of the chemicals cache. Pass None to disable it."""
+    global _folder
+    _folder = os.path.expanduser(folder) if folder else None
+    _loaded.clear()
+
+def clear_chemicals_cache():
+    """Remove all cached chemicals from the cache folder."""
+    _loaded.clear()
+    if _folder is None or not os.path.isdir(_folder): return
+    for file in os.listdir(_folder):
+        if file.endswith('.pkl'): os.remove(os.path.join(_folder, file))
+
+def library_versions():
+    global _versions
+    if _versions is None:
+        import chemicals, thermo
+        from biorefineries import __version__
+        _versions = (
+            sys.version_info[:2], tmo.__version__, chemicals.__version__,
+            thermo.__version__, __version__,
+        )
+    return _versions
+
+def file_hash(file):
+    """Return the hash of the content of a file (None if not available)."""
+    if file in _file_hashes: return _file_hashes[file]
+    try:
+        with open(file, 'rb') as f:
+            value = hashlib.sha1(f.read()).hexdigest()
+    except (TypeError, OSError):
+        value = None
+    _file_hashes[file] = value
+    return value
+
+def module_hash(module):
+    """Return the hash of the source file of a module (so that cached
+    chemicals are invalidated when their creating functions change)."""
+    try:
+        file = sys.modules[module].__file__
+    except (KeyError, AttributeError):
+        try:
+            spec = find_spec(module)
+        except (ImportError, ValueError):
+            spec = None
+        file = None if spec is None else spec.origin
+    return file_hash(file)
+
+def cache_key(name, args, kwargs, source=None):
+    """Return the cache key of a call or None if the arguments cannot be
+    represented in a stable way (e.g., functions or arbitrary objects)."""
+    signature = repr((name, args, sorted(kwargs.items()), source, library_versions()))
+    if ' at 0x' in signature: return None
+    return hashlib.sha1(signature.encode()).hexdigest()
+
+def restore_chemicals(cls, state):
+    chemicals = object.__new__(cls)
+    chemicals.__dict__.update(state)
+    return chemicals
+
+class ChemicalsPickler(pickle.Pickler):
+    """Pickle chemicals with all their state (by default, only the
+    chemicals are pickled and synonyms and groups are lost)."""
+    def reducer_override(self, obj):
+        if isinstance(obj, tmo.Chemicals):
+            return restore_chemicals, (type(obj), obj.__dict__)
+        return NotImplemented
+
+def dumps(obj):
+    file = io.BytesIO()
+    ChemicalsPickler(file, protocol=pickle.HIGHEST_PROTOCOL).dump(obj)
+    return file.getvalue()
+
+def load(key):
+    if key in _loaded: return pickle.loads(_loaded[key])
+    file = os.path.join(_folder, key + '.pkl')
+    try:
+        with open(file, 'rb') as f: data = f.read()
+        obj = pickle.loads(data)
+    except FileNotFoundError:
+        return None
+    except Exception: # Corrupted or incompatible file; rebuild
+        return None
+    _loaded[key] = data
+    return obj
+
+def dump(key, obj):
+    try:
+        data = dumps(obj)
+        pickle.loads(data) # Some thermo models cannot be restored
+    except Exception as error:
+        warn(f"could not cache chemicals; {error!r}", RuntimeWarning)
+        return
+    _loaded[key] = data
+    try:
+        os.makedirs(_folder, exist_ok=True)
+        # Write to a temporary file first so that concurrent processes
+        # never read a partially written file
+        fd, temporary = tempfile.mkstemp(dir=_folder, suffix='.tmp')
+        with os.fdopen(fd, 'wb') as f: f.write(data)
+        os.replace(temporary, os.path.join(_folder, key + '.pkl'))
+    except OSError: # For example, in read-only file systems
+        pass
+
+def persistent_chemical_cache(f=None, *, modules=(), files=()):
+    """
+    Decorate a function that creates chemicals to cache its results within
+    the process (as `thermosteam.utils.chemical_cache`) and on disk across
+    processes. Cached results are keyed by the function, its arguments, the
+    source of its module and dependencies, and library versions. Pass 
+    `cache=False` to bypass both caches.
+    
+    Parameters
+    ----------
+    modules : Iterable[str], optional
+        Names of other modules the chemicals are created from (e.g., modules
+        of other chemical creating functions).
+    files : Iterable[str], optional
+        Data files the chemicals are created from. Relative paths are with
+        respect to the folder of the module of the decorated function.
+
+    """
+    if f is None: 
+        return lambda f: persistent_chemical_cache(f, modules=modules, files=files)
+    name = f"{f.__module__}.{f.__qualname__}"
+    module = sys.modules.get(f.__module__)
+    folder = os.path.dirname(getattr(module, '__file__', None) or '')
+    files = tuple([os.path.join(folder, i) for i in files])
+    modules = (f.__module__, *modules)
+    def source():
+        return (*[module_hash(i) for i in modules], *[file_hash(i) for i in files])
+    def load_or_build(*args, **kwargs):
+        if _folder is None: return f(*args, **kwargs)
+        key = cache_key(name, args, kwargs, source())
+        if key is None: return f(*args, **kwargs)
+        obj = load(key)
+        if obj is None:
+            obj = f(*args, **kwargs)
+            dump(key, obj)
+        return obj
+    memoized = chemical_cache(load_or_build)
+    @wraps(f)
+    def create(*args, cache=True, **kwargs):
+        return memoized(*args, **kwargs) if cache else f(*args, **kwargs)
+    return create
+
+def cached_chemical(ID, **kwargs):
+    """
+    Return a new chemical as in `thermosteam.Chemical(ID, **kwargs)`,
+    loading it from the on-disk cache when available. Chemicals are not
+    shared between calls, so they can be modified freely (unless
+    `thermosteam.Chemical.cache` is enabled, in which case this is the same
+    as `thermosteam.Chemical`).
+
+    """
+    Chemical = tmo.Chemical
+    cache = kwargs.get('cache', Chemical.cache)
+    if _folder is None or cache:
+        return Chemical(ID, **kwargs)
+    key = cache_key('thermosteam.Chemical', (ID,), kwargs)
+    if key is None: return Chemical(ID, **kwargs)
+    chemical = load(key)
+    if chemical is None:
+        chemical = Chemical(ID, **kwargs)
+        dump(key, chemical)
+    return chemical
@@ -12,11 +12,11 @@
 import thermosteam as tmo
 from biorefineries.cane import create_oilcane_chemicals
 from biorefineries.cellulosic import create_cellulosic_ethanol_chemicals
-from thermosteam.utils import chemical_cache
+from biorefineries.chemicals_cache import persistent_chemical_cache
 
 __all__ = ('create_chemicals',)
 
-@chemical_cache
+@persistent_chemical_cache(modules=['biorefineries.cane.chemicals', 'biorefineries.cellulosic.chemicals'])
 def create_chemicals():
     oc_chemicals = create_oilcane_chemicals()
     chemicals = oc_chemicals['Water', 'Ethanol', 'Glucose', 'H3PO4', 'P4O10', 
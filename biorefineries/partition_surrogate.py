@@ -0,0 +1,327 @@
+# -*- coding: utf-8 -*-
+# BioSTEAM: The Biorefinery Simulation and Techno-Economic Analysis Modules
+# Copyright (C) 2020-2024, Yoel Cortes-Pena <yoelcortes@gmail.com>
+#
+# This module is under the UIUC open-source license. See
+# github.com/BioSTEAMDevelopmentGroup/biosteam/blob/master/LICENSE.txt
+# for license details.
+"""
+Surrogate models of liquid-liquid partition coefficients. A
+`PartitionSurrogate` object interpolates partition coefficients (molar
+composition ratios of the extract over the raffinate) of a solvent system
+over temperature and composition, so that repeated liquid-liquid
+equilibrium (LLE) calculations can be skipped. Mixtures outside the trust
+region of the surrogate (i.e., far from the points it was fitted to) are
+solved rigorously and added to the surrogate.
+
+Surrogates can be saved and loaded, validated against rigorous LLE, and
+attached to mixer-settlers (e.g., MultiStageMixerSettlers) to update their
+partition data before each run.
+
+Examples
+--------
+>>> import biosteam as bst # doctest: +SKIP
+>>> from biorefineries.partition_surrogate import PartitionSurrogate # doctest: +SKIP
+>>> bst.settings.set_thermo(['Water', 'Methanol', 'Octanol']) # doctest: +SKIP
+>>> mixture = bst.Stream(Water=500, Methanol=50, Octanol=500, T=300) # doctest: +SKIP
+>>> surrogate = PartitionSurrogate(('Water', 'Methanol', 'Octanol'), solvent='Octanol') # doctest: +SKIP
+>>> surrogate.sample(mixture, N=100, T_bounds=(290, 340)) # doctest: +SKIP
+>>> surrogate.validate(mixture, N=20, T_bounds=(290, 340)).max() # doctest: +SKIP
+>>> surrogate.save('water_methanol_octanol.npz') # doctest: +SKIP
+>>> surrogate.attach(MSMS1) # doctest: +SKIP
+
+"""
+import numpy as np
+import pandas as pd
+import thermosteam as tmo
+from scipy.interpolate import RBFInterpolator
+from scipy.spatial import cKDTree
+from scipy.stats import qmc
+
+__all__ = (
+    'PartitionSurrogate',
+)
+
+class PartitionSurrogate:
+    """
+    Create a PartitionSurrogate object that interpolates the partition
+    coefficients of chemicals over temperature and composition with a
+    radial basis function interpolator fitted to rigorous LLE calculations.
+
+    Parameters
+    ----------
+    IDs : tuple[str]
+        Chemicals in equilibrium. Composition is defined by the mole
+        fractions of these chemicals (excluding all others).
+    solvent : str
+        Main chemical of the extract phase.
+    thermo : Thermo, optional
+        Thermodynamic property package. Defaults to the default package.
+    trust_margin : float, optional
+        Fraction of the range of the fitted temperatures and mole fractions
+        that the trust region extends beyond them. Defaults to 0.05.
+    learn : bool, optional
+        Whether to add rigorous LLE results of mixtures outside the trust
+        region to the surrogate. Defaults to True.
+    kernel : str, optional
+        Kernel of the RBF interpolator. Defaults to 'thin_plate_spline'.
+    refit : int, optional
+        Number of points learned between refits of the interpolator (fitting
+        is cubic in the number of points). Until then, predictions and the 
+        trust region are based on the points of the last fit. Defaults to 10.
+
+    Attributes
+    ----------
+    lle_calls : int
+        Number of rigorous LLE calculations.
+    skipped_lle_calls : int
+        Number of partition coefficients predicted by the surrogate (i.e.,
+        LLE calculations skipped).
+
+    Notes
+    -----
+    Partition coefficients are interpolated in logarithmic space. Mixtures
+    are within the trust region when their temperature and mole fractions
+    lie within the (extended) range of the fitted points and their distance
+    to the nearest fitted point (in normalized coordinates) is no greater
+    than twice the 90th percentile of distances between neighboring fitted
+    points. Predictions outside the (extended) range of fitted partition
+    coefficients are solved rigorously as well. Features that are constant
+    over the fitted points (e.g., the temperature of an extraction at a set
+    temperature) are not interpolated and must match within a small
+    tolerance. If the points are degenerate (e.g., along a line), mixtures
+    are solved rigorously until `refit` more points are learned, while
+    `predict`, `in_trust_region`, and `validate` raise a RuntimeError.
+
+    """
+    __slots__ = ('IDs', 'solvent', 'thermo', 'trust_margin', 'learn', 'kernel',
+                 'refit', 'features', 'logK', 'lle_calls', 'skipped_lle_calls',
+                 '_interpolator', '_tree', '_bounds', '_active', '_radius', 
+                 '_mixture', '_unfitted', '_fit_failed')
+
+    def __init__(self, IDs, solvent, thermo=None, trust_margin=0.05, learn=True,
+                 kernel='thin_plate_spline', refit=10):
+        self.IDs = tuple(IDs)
+        self.solvent = solvent
+        self.thermo = tmo.settings.get_default_thermo(thermo)
+        self.trust_margin = trust_margin
+        self.learn = learn
+        self.kernel = kernel
+        self.refit = refit
+        self.features = np.zeros([0, len(self.IDs)])
+        self.logK = np.zeros([0, len(self.IDs)])
+        self.lle_calls = self.skipped_lle_calls = 0
+        self._interpolator = None
+        self._mixture = None
+        self._unfitted = 0
+        self._fit_failed = False
+
+    def get_features(self, stream, T=None):
+        """Return the temperature and mole fractions of all chemicals in
+        equilibrium but the last (which are not independent) as a 1d array."""
+        mol = stream.imol[self.IDs]
+        F_mol = mol.sum()
+        if not F_mol: raise ValueError('stream has no chemicals in equilibrium')
+        return np.array([stream.T if T is None else T, *(mol[:-1] / F_mol)])
+
+    def lle(self, stream, T=None):
+        """
+        Return the partition coefficients of a stream by rigorous LLE or None
+        if the stream does not split into two liquid phases.
+
+        """
+        mixture = self._mixture
+        if mixture is None: self._mixture = mixture = tmo.Stream(None, thermo=self.thermo)
+        mixture.phases = ('l', 'L')
+        mixture.mix_from([stream])
+        self.lle_calls += 1
+        mixture.lle(T=stream.T if T is None else T, top_chemical=self.solvent)
+        IDs = self.IDs
+        l, L = mixture['l'], mixture['L']
+        if l.isempty() or L.isempty(): return None
+        extract, raffinate = (l, L) if l.imol[self.solvent] >= L.imol[self.solvent] else (L, l)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            K = (extract.imol[IDs] / extract.F_mol) / (raffinate.imol[IDs] / raffinate.F_mol)
+        if not (np.isfinite(K).all() and (K > 0.).all()): return None
+        return K
+
+    def add(self, features, K):
+        """Add partition coefficients at given features to the surrogate 
+        (fitted on the next prediction once `refit` points are added)."""
+        self.features = np.vstack([self.features, features])
+        self.logK = np.vstack([self.logK, np.log(K)])
+        self._unfitted += 1
+
+    def fit(self):
+        """Fit the interpolator and trust region to all points."""
+        features = self.features
+        if len(features) <= len(self.IDs) + 1:
+            raise RuntimeError('not enough points to fit surrogate; sample more mixtures')
+        self._interpolator = None
+        self._unfitted = 0
+        lb = features.min(0)
+        ub = features.max(0)
+        # Constant features (e.g., the temperature of a heated stream) are not
+        # interpolated and must match within a small tolerance
+        self._active = active = ub - lb > 1e-9 * np.maximum(np.abs(lb), 1.)
+        constant = ~active
+        ub[constant] = lb[constant] + 1e-3 * np.maximum(np.abs(lb[constant]), 1.)
+        self._bounds = (lb, ub)
+        scaled = ((features - lb) / (ub - lb))[:, active]
+        interpolator = RBFInterpolator(scaled, self.logK, kernel=self.kernel)
+        self._tree = tree = cKDTree(scaled)
+        distances, _ = tree.query(scaled, k=2)
+        self._radius = 2. * np.quantile(distances[:, 1], 0.9) # Robust to isolated points
+        self._interpolator = interpolator
+        self._fit_failed = False
+
+    def _fitted(self):
+        # Fit initially and after every `refit` points learned; return 
+        # whether the surrogate is fitted
+        if len(self.features) <= len(self.IDs) + 1: return False
+        if self._unfitted >= self.refit or (self._interpolator is None and not self._fit_failed):
+            try:
+                self.fit()
+            except (np.linalg.LinAlgError, ValueError): # Degenerate points (e.g., along a line)
+                self._fit_failed = True
+        return self._interpolator is not None
+
+    def _scale(self, features):
+        if not self._fitted():
+            raise RuntimeError('surrogate could not be fitted (not enough or '
+                               'degenerate points); sample more mixtures')
+        lb, ub = self._bounds
+        return (features - lb) / (ub - lb)
+
+    def in_trust_region(self, features):
+        """Return whether features are within the trust region of the surrogate."""
+        scaled = self._scale(features)
+        margin = self.trust_margin
+        if ((scaled < -margin) | (scaled > 1. + margin)).any(): return False
+        distance, _ = self._tree.query(scaled[self._active])
+        return distance <= self._radius
+
+    def _within_fitted_range(self, K):
+        # Predictions outside the (extended) range of fitted partition 
+        # coefficients are extrapolations of degenerate points
+        logK = self.logK
+        lb = logK.min(0)
+        ub = logK.max(0)
+        margin = self.trust_margin * (ub - lb)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            logK = np.log(K)
+        return bool(((logK >= lb - margin) & (logK <= ub + margin)).all())
+
+    def predict(self, features):
+        """Return partition coefficients predicted by the surrogate at given
+        features (1d or 2d array) regardless of the trust region."""
+        features = np.asarray(features, dtype=float)
+        scaled = self._scale(np.atleast_2d(features))
+        K = np.exp(self._interpolator(scaled[:, self._active]))
+        return K[0] if features.ndim == 1 else K
+
+    def __call__(self, stream, T=None):
+        """
+        Return the partition coefficients of a stream, predicted by the
+        surrogate within its trust region or by rigorous LLE otherwise (None
+        if the stream does not split into two liquid phases).
+
+        """
+        features = self.get_features(stream, T)
+        if self._fitted() and self.in_trust_region(features):
+            K = self.predict(features)
+            if self._within_fitted_range(K):
+                self.skipped_lle_calls += 1
+                return K
+        K = self.lle(stream, T)
+        if K is not None and self.learn: self.add(features, K)
+        return K
+
+    def _sample_streams(self, stream, N, T_bounds, flow_bounds, seed):
+        IDs = self.IDs
+        sampler = qmc.LatinHypercube(d=len(IDs) + 1, seed=seed)
+        lb = [T_bounds[0], *[flow_bounds[0]] * len(IDs)]
+        ub = [T_bounds[1], *[flow_bounds[1]] * len(IDs)]
+        mol = stream.imol[IDs]
+        sample = tmo.Stream(None, thermo=self.thermo)
+        for T, *factors in qmc.scale(sampler.random(N), lb, ub):
+            sample.mix_from([stream])
+            sample.imol[IDs] = mol * factors
+            sample.T = T
+            yield sample
+
+    def sample(self, stream, N, T_bounds, flow_bounds=(0.5, 2.), seed=0):
+        """
+        Add rigorous LLE results of N mixtures around a reference stream
+        to the surrogate and fit it. Temperatures and flow rates of chemicals
+        in equilibrium (relative to the reference stream) are sampled by
+        Latin hypercube sampling within given bounds; mixtures that do not
+        split into two liquid phases are ignored.
+
+        """
+        for sample in self._sample_streams(stream, N, T_bounds, flow_bounds, seed):
+            K = self.lle(sample)
+            if K is not None: self.add(self.get_features(sample), K)
+        self.fit()
+
+    def validate(self, stream, N, T_bounds, flow_bounds=(0.5, 2.), seed=1):
+        """
+        Return a table of relative errors of predicted partition coefficients
+        with respect to rigorous LLE for N mixtures around a reference
+        stream (sampled as in `sample`, but with a different seed). Mixtures
+        outside the trust region are not included.
+
+        """
+        errors = []
+        for sample in self._sample_streams(stream, N, T_bounds, flow_bounds, seed):
+            features = self.get_features(sample)
+            if not self.in_trust_region(features): continue
+            K = self.lle(sample)
+            if K is None: continue
+            errors.append(np.abs(self.predict(features) / K - 1.))
+        return pd.DataFrame(errors, columns=self.IDs)
+
+    def attach(self, unit):
+        """
+        Add a specification to a mixer-settler (e.g., MultiStageMixerSettlers)
+        that updates the partition coefficients of its partition data from the
+        mixture of its inlets before other specifications and its run.
+
+        """
+        data = unit.partition_data
+        unit.partition_data = data = {} if data is None else data
+        data['IDs'] = self.IDs
+        mixture = tmo.Stream(None, thermo=self.thermo)
+        def update_partition_coefficients():
+            mixture.mix_from(unit.ins)
+            if mixture.imol[self.IDs].sum() == 0.: return
+            K = self(mixture)
+            if K is not None: data['K'] = K
+        run = None if unit.specifications else True
+        unit.add_specification(update_partition_coefficients, run=run)
+        unit.specifications.insert(0, unit.specifications.pop())
+        return update_partition_coefficients
+
+    def save(self, file):
+        """Save fitted points of the surrogate as an npz file."""
+        np.savez(file, IDs=np.array(self.IDs), solvent=np.array(self.solvent),
+                 features=self.features, logK=self.logK,
+                 trust_margin=np.array(self.trust_margin))
+
+    @classmethod
+    def load(cls, file, thermo=None, **kwargs):
+        """Load a surrogate saved as an npz file."""
+        with np.load(file) as data:
+            self = cls(data['IDs'].tolist(), str(data['solvent']), thermo,
+                       trust_margin=float(data['trust_margin']), **kwargs)
+            self.features = data['features']
+            self.logK = data['logK']
+        chemicals = self.thermo.chemicals
+        missing = [i for i in self.IDs if i not in chemicals]
+        if missing: raise ValueError(f"chemicals {missing} not defined in thermo")
+        if len(self.features) > len(self.IDs) + 1: self.fit()
+        return self
+
+    def __repr__(self):
+        return (f"<{type(self).__name__}: {', '.join(self.IDs)}, {len(self.features)} points, "
+                f"{self.lle_calls} LLE calls, {self.skipped_lle_calls} skipped>")
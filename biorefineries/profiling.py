@@ -0,0 +1,205 @@
+# -*- coding: utf-8 -*-
+# BioSTEAM: The Biorefinery Simulation and Techno-Economic Analysis Modules
+# Copyright (C) 2020-2024, Yoel Cortes-Pena <yoelcortes@gmail.com>
+#
+# This module is under the UIUC open-source license. See
+# github.com/BioSTEAMDevelopmentGroup/biosteam/blob/master/LICENSE.txt
+# for license details.
+"""
+Opt-in instrumentation of system simulations. While a `SystemProfiler` is
+active, the mass and energy balances (`_run`), design (`_design`), and cost
+(`_cost`) of every unit operation in a system and the functions of their
+process specifications are timed, so that the time spent in each of them
+can be tracked across recycle iterations, simulations, and Monte Carlo runs.
+
+Examples
+--------
+>>> from biorefineries import cane # doctest: +SKIP
+>>> from biorefineries.profiling import SystemProfiler # doctest: +SKIP
+>>> br = cane.Biorefinery('O1') # doctest: +SKIP
+>>> with SystemProfiler(br.sys) as profiler: # doctest: +SKIP
+...     br.sys.simulate()
+>>> profiler.table() # doctest: +SKIP
+>>> profiler.save_flame_graph('O1.folded') # doctest: +SKIP
+
+"""
+from time import perf_counter
+from functools import wraps
+import pandas as pd
+
+__all__ = (
+    'SystemProfiler',
+)
+
+unit_phases = ('_run', '_design', '_cost')
+
+class Record:
+    __slots__ = ('calls', 'time', 'self_time')
+
+    def __init__(self):
+        self.calls = 0
+        self.time = self.self_time = 0.
+
+
+class SystemProfiler:
+    """
+    Create a SystemProfiler object that records wall time and number of
+    calls of each unit operation phase and process specification function
+    of a system (including subsystems and facilities) while active.
+    Profilers can be used as context managers or activated and deactivated
+    explicitly; results accumulate over all periods of activity.
+
+    Parameters
+    ----------
+    system : System
+        System to instrument.
+
+    Notes
+    -----
+    Total times include nested calls (e.g., unit operations simulated
+    by a specification), while self times exclude them. Timers add an
+    overhead of about a microsecond per call.
+
+    """
+    __slots__ = ('system', 'records', 'stacks', 'elapsed',
+                 '_stack', '_patched', '_start')
+
+    def __init__(self, system):
+        self.system = system
+        self.records = {}
+        self.stacks = {}
+        self.elapsed = 0.
+        self._stack = []
+        self._patched = None
+        self._start = None
+
+    def _timed(self, key, f):
+        records = self.records
+        stacks = self.stacks
+        stack = self._stack
+        if key not in records: records[key] = Record()
+        record = records[key]
+        @wraps(f)
+        def timed(*args, **kwargs):
+            frame = [key, 0.] # Key and time of nested calls
+            stack.append(frame)
+            start = perf_counter()
+            try:
+                return f(*args, **kwargs)
+            finally:
+                time = perf_counter() - start
+                stack.pop()
+                self_time = time - frame[1]
+                record.calls += 1
+                record.time += time
+                record.self_time += self_time
+                if stack: stack[-1][1] += time
+                path = tuple([i[0] for i in stack]) + (key,)
+                stacks[path] = stacks.get(path, 0.) + self_time
+        return timed
+
+    @property
+    def active(self):
+        """[bool] Whether the profiler is active."""
+        return self._patched is not None
+
+    def activate(self):
+        """Start timing unit operations and process specifications."""
+        if self._patched is not None: return
+        self._patched = patched = []
+        for unit in self.system.units:
+            dct = unit.__dict__
+            for name in unit_phases:
+                patched.append((dct, name, dct.get(name)))
+                dct[name] = self._timed((unit.ID, name), getattr(unit, name))
+            for specification in unit._specifications:
+                f = specification.f
+                patched.append((specification, 'f', f))
+                name = getattr(f, '__name__', type(f).__name__)
+                specification.f = self._timed((unit.ID, name), f)
+        self._start = perf_counter()
+
+    def deactivate(self):
+        """Stop timing and restore unit operations and process specifications."""
+        patched = self._patched
+        if patched is None: return
+        self.elapsed += perf_counter() - self._start
+        for obj, name, original in reversed(patched):
+            if isinstance(obj, dict):
+                if original is None: del obj[name]
+                else: obj[name] = original
+            else:
+                setattr(obj, name, original)
+        self._patched = self._start = None
+        self._stack.clear()
+
+    def __enter__(self):
+        self.activate()
+        return self
+
+    def __exit__(self, type, exception, traceback):
+        self.deactivate()
+
+    def reset(self):
+        """Clear all records."""
+        self.records.clear()
+        self.stacks.clear()
+        self.elapsed = 0.
+        if self._start is not None: self._start = perf_counter()
+
+    def table(self):
+        """
+        Return a table of the number of calls and times of each unit
+        operation phase and process specification function sorted by self
+        time.
+
+        """
+        elapsed = self.elapsed
+        if self._start is not None: elapsed += perf_counter() - self._start
+        data = [
+            (ID, name.lstrip('_') if name in unit_phases else 'specification',
+             '' if name in unit_phases else name, record.calls,
+             record.time, record.self_time, 1e3 * record.time / record.calls,
+             100 * record.self_time / elapsed if elapsed else float('nan'))
+            for (ID, name), record in self.records.items() if record.calls
+        ]
+        table = pd.DataFrame(
+            data, columns=('Unit', 'Phase', 'Specification', 'Calls',
+                           'Time [s]', 'Self time [s]', 'Time per call [ms]',
+                           'Self time [% elapsed]')
+        )
+        return table.sort_values('Self time [s]', ascending=False, ignore_index=True)
+
+    def save_table(self, file):
+        """Save the table of results as a CSV or Excel file (by extension)."""
+        table = self.table()
+        if file.endswith(('.xlsx', '.xls')): table.to_excel(file, index=False)
+        else: table.to_csv(file, index=False)
+
+    def folded_stacks(self):
+        """
+        Return self times in microseconds by call stack in the folded
+        format of flame graph tools (e.g., flamegraph.pl and speedscope).
+        The root frame is the system and time spent outside instrumented
+        calls (e.g., in convergence algorithms and model metrics) is
+        reported as the system's self time.
+
+        """
+        root = self.system.ID
+        elapsed = self.elapsed
+        if self._start is not None: elapsed += perf_counter() - self._start
+        lines = []
+        for path, time in self.stacks.items():
+            frames = ';'.join([f"{ID}.{name}" for ID, name in path])
+            lines.append(f"{root};{frames} {round(1e6 * time)}")
+        other = elapsed - sum([j.self_time for j in self.records.values()])
+        if other > 0: lines.insert(0, f"{root} {round(1e6 * other)}")
+        return '\n'.join(lines)
+
+    def save_flame_graph(self, file):
+        """Save folded call stacks for flame graph tools."""
+        with open(file, 'w') as f: f.write(self.folded_stacks() + '\n')
+
+    def __repr__(self):
+        status = 'active' if self.active else 'inactive'
+        return f"<{type(self).__name__}: {self.system.ID}, {status}>"
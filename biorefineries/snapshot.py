@@ -0,0 +1,542 @@
+# -*- coding: utf-8 -*-
+# BioSTEAM: The Biorefinery Simulation and Techno-Economic Analysis Modules
+# Copyright (C) 2020-2024, Yoel Cortes-Pena <yoelcortes@gmail.com>
+#
+# This module is under the UIUC open-source license. See
+# github.com/BioSTEAMDevelopmentGroup/biosteam/blob/master/LICENSE.txt
+# for license details.
+"""
+Snapshots of fully constructed and converged flowsheets. Streams, units, and
+other objects are pickled by state, with references to objects that cannot
+be serialized (e.g., closures, systems, and thermodynamic property packages)
+kept by identity. A snapshot is restored into a newly constructed (but not
+simulated) flowsheet: saved streams, units, and named objects are merged in
+place into their counterparts, so that references held by specifications
+and model parameters remain valid, while objects that do not exist yet
+(e.g., auxiliary units created during simulation) are recreated. Units are identified by ID, so the ticket numbers of default
+unit IDs taken before the flowsheet was constructed are saved in the header
+and loaded only while the new flowsheet is constructed.
+
+"""
+import io
+import re
+import sys
+import types
+import pickle
+import numpy as np
+import pandas as pd
+import thermosteam as tmo
+import biosteam as bst
+from functools import partial
+from contextlib import contextmanager
+from thermosteam.utils import Cache
+from thermosteam.network import ignore_docking_warnings
+
+__all__ = (
+    'dump_snapshot',
+    'load_header',
+    'load_snapshot',
+    'unit_ticket_numbers',
+    'loaded_ticket_numbers',
+    'StateMerger',
+)
+
+class Keep:
+    """Marker for references that are kept as they are in the restored
+    objects."""
+    __slots__ = ()
+    def __repr__(self): return 'KEEP'
+
+KEEP = Keep()
+MISSING = object()
+default_ID = re.compile(r's\d+')
+
+kept_types = (
+    types.FunctionType, types.MethodType, types.BuiltinFunctionType,
+    types.ModuleType, partial, bst.System, bst.Flowsheet, bst.Model,
+    tmo.Chemical, tmo.Chemicals, tmo.Thermo,
+)
+kept_modules = ( # Equilibrium solvers are rebuilt as needed and units of measure are constant
+    'thermosteam.equilibrium', 'thermosteam.units_of_measure',
+)
+atomic_types = (
+    int, float, complex, str, bytes, bool, type(None), type, np.generic,
+    pd.DataFrame, pd.Series, pd.Index,
+)
+container_types = (list, dict, tuple, set, frozenset)
+
+def is_global(obj):
+    # Functions and classes that can be pickled by reference
+    module = sys.modules.get(getattr(obj, '__module__', None))
+    if module is None: return False
+    value = module
+    for name in getattr(obj, '__qualname__', '<locals>').split('.'):
+        value = getattr(value, name, None)
+    return value is obj
+
+def subclasses(cls):
+    for i in cls.__subclasses__():
+        yield i
+        yield from subclasses(i)
+
+def local_classes():
+    # Classes created within functions are referenced through their owners
+    # (e.g., superposition streams of auxiliary units)
+    classes = {}
+    for owner in subclasses(tmo.AbstractUnit):
+        if 'Stream' not in owner.__dict__ or not is_global(owner): continue
+        for name in ('SuperpositionInlet', 'SuperpositionOutlet'):
+            cls = owner.__dict__.get(name)
+            if cls is not None: classes[cls] = (owner, name)
+    return classes
+
+def class_reference(cls, local_classes):
+    if is_global(cls): return cls
+    elif cls in local_classes: return local_classes[cls]
+    else: return None
+
+def class_from_reference(reference):
+    if isinstance(reference, tuple):
+        owner, name = reference
+        return getattr(owner, name)
+    return reference
+
+def library_versions():
+    from biorefineries import __version__
+    return (__version__, bst.__version__, tmo.__version__)
+
+def slot_descriptors(cls, cache={}):
+    if cls in cache: return cache[cls]
+    descriptors = {}
+    for base in reversed(cls.__mro__):
+        slots = base.__dict__.get('__slots__', ())
+        if isinstance(slots, str): slots = (slots,)
+        for name in slots:
+            if name in ('__dict__', '__weakref__'): continue
+            if name.startswith('__') and not name.endswith('__'):
+                name = f"_{base.__name__.lstrip('_')}{name}"
+            descriptors[name] = base.__dict__[name]
+    cache[cls] = descriptors
+    return descriptors
+
+def get_state(obj):
+    """Return a dictionary of all attributes of an object (including
+    slots)."""
+    state = {}
+    for name, descriptor in slot_descriptors(type(obj)).items():
+        try: state[name] = descriptor.__get__(obj)
+        except AttributeError: pass
+    dct = getattr(obj, '__dict__', None)
+    if dct is not None: state.update(dct)
+    return state
+
+def set_attribute(obj, name, value):
+    descriptors = slot_descriptors(type(obj))
+    if name in descriptors:
+        descriptors[name].__set__(obj, value)
+    else:
+        obj.__dict__[name] = value
+
+def saved_by_state(obj):
+    # Whether an object is pickled with its attributes (instead of its own
+    # reduction); streams and indexers are included because their
+    # reductions register streams in the flowsheet and drop locked phases
+    if isinstance(obj, (tmo.Stream, tmo.indexer.Indexer)): return True
+    cls = type(obj)
+    return (
+        not isinstance(obj, (type, *container_types))
+        and cls.__reduce_ex__ is object.__reduce_ex__
+        and cls.__reduce__ is object.__reduce__
+        and cls.__getstate__ is object.__getstate__
+        and (hasattr(obj, '__dict__') or bool(slot_descriptors(cls)))
+    )
+
+class StateMerger:
+    """
+    Merge saved objects into existing objects in place. Arrays, lists,
+    dictionaries, and objects of the same type are updated in place;
+    everything else is replaced by the saved objects, which are finalized
+    (i.e., references to merged objects are redirected to the existing ones
+    and kept references are removed) once all objects are merged.
+
+    Parameters
+    ----------
+    objects : Iterable[object]
+        Existing objects that are referenced as they are (and never merged
+        other than with their own saved state).
+
+    """
+    __slots__ = ('merged', 'claimed', 'adopted')
+
+    def __init__(self, objects=()):
+        #: dict[int, object] Existing objects by ID of saved objects.
+        self.merged = {}
+        #: dict[int, object] Saved objects by ID of existing objects.
+        self.claimed = {}
+        #: list[object] Saved objects kept as they are.
+        self.adopted = []
+        for i in objects: self.merged[id(i)] = self.claimed[id(i)] = i
+
+    def adopt(self, saved):
+        if not isinstance(saved, atomic_types): self.adopted.append(saved)
+        return saved
+
+    def merge(self, existing, saved):
+        """Merge a saved object into an existing object and return the
+        merged object."""
+        if saved is KEEP or saved is existing: return existing
+        key = id(saved)
+        merged = self.merged
+        if key in merged: return merged[key]
+        if existing is MISSING or type(existing) is not type(saved) or isinstance(saved, atomic_types):
+            return self.adopt(saved)
+        # Objects shared differently in the saved and existing objects (e.g.,
+        # indexers viewing different phases) are replaced instead of merged
+        claimed = self.claimed
+        if claimed.get(id(existing), saved) is not saved: return self.adopt(saved)
+        if isinstance(saved, np.ndarray):
+            if (existing.shape != saved.shape or existing.dtype != saved.dtype
+                or not existing.flags.writeable): return self.adopt(saved)
+            existing[...] = saved
+        elif isinstance(saved, (set, frozenset)):
+            return self.adopt(saved)
+        claimed[id(existing)] = saved
+        merged[key] = existing
+        if isinstance(saved, np.ndarray):
+            pass
+        elif isinstance(saved, list):
+            if len(existing) == len(saved):
+                for i, j in enumerate(saved): existing[i] = self.merge(existing[i], j)
+            else:
+                existing[:] = saved
+                self.adopted.append(existing)
+        elif isinstance(saved, dict):
+            for i in tuple(existing):
+                if i not in saved: del existing[i]
+            for i, j in saved.items():
+                value = self.merge(existing.get(i, MISSING), j)
+                if value is not MISSING and value is not KEEP: existing[i] = value
+        elif isinstance(saved, tuple):
+            if len(existing) != len(saved):
+                del merged[key]
+                return self.adopt(saved)
+            values = tuple([self.merge(i, j) for i, j in zip(existing, saved)])
+            if any([i is not j for i, j in zip(existing, values)]):
+                merged[key] = existing = values
+        else:
+            self.merge_attributes(existing, get_state(saved))
+        return existing
+
+    def merge_attributes(self, obj, state):
+        """Merge a dictionary of saved attributes into an existing
+        object."""
+        current = get_state(obj)
+        for name, value in state.items():
+            old = current.get(name, MISSING)
+            new = self.merge(old, value)
+            if new is not old and new is not MISSING and new is not KEEP:
+                set_attribute(obj, name, new)
+
+    def finalize(self, objects=()):
+        """Redirect references to merged objects within adopted objects and
+        the given new objects (which are finalized unless merged)."""
+        merged = self.merged
+        visited = set()
+        def finalize(value):
+            key = id(value)
+            if value is KEEP: return None
+            elif key in merged: return merged[key]
+            elif key in visited: return value
+            cls = type(value)
+            if cls is list:
+                visited.add(key)
+                value[:] = [finalize(i) for i in value if i is not KEEP]
+            elif cls is dict:
+                visited.add(key)
+                for i, j in tuple(value.items()):
+                    if j is KEEP: del value[i]
+                    else: value[i] = finalize(j)
+            elif cls is tuple:
+                values = tuple([finalize(i) for i in value])
+                if any([i is not j for i, j in zip(value, values)]): return values
+            return value
+        for obj in self.adopted: finalize(obj)
+        for obj in objects:
+            if merged.get(id(obj), obj) is not obj: continue
+            for name, value in get_state(obj).items():
+                new = finalize(value)
+                if new is not value: set_attribute(obj, name, new)
+
+def units_by_key(flowsheet):
+    # Units and auxiliary units by path
+    units = {}
+    for unit in flowsheet.unit:
+        units[unit.ID] = unit
+        for name, auxunit in unit.get_nested_auxiliary_units_with_names():
+            if isinstance(auxunit, bst.Unit): units[f"{unit.ID}.{name}"] = auxunit
+    return units
+
+def streams_by_key(units, flowsheet):
+    # Streams are identified by their connections to units (default IDs of
+    # anonymous streams depend on how many streams were created before);
+    # sources take precedence because some units are connected to their
+    # feeds in simulation (e.g., mixers of combustible streams)
+    streams = {}
+    for name, unit in units.items():
+        for i, stream in enumerate(unit.outs): streams.setdefault(id(stream), (('out', name, i), stream))
+    for name, unit in units.items():
+        for i, stream in enumerate(unit.ins): streams.setdefault(id(stream), (('in', name, i), stream))
+    for stream in flowsheet.stream:
+        if default_ID.fullmatch(stream.ID): continue
+        streams.setdefault(id(stream), (('ID', stream.ID), stream))
+    return dict([i for i in streams.values() if hasattr(i[1], 'imol')])
+
+def thermodynamic_objects(flowsheet):
+    # Thermodynamic property packages and chemicals in order of appearance
+    # (construction is deterministic, so the order is the same in new
+    # flowsheets)
+    thermos = {}
+    for i in (*flowsheet.stream, *flowsheet.unit):
+        thermo = getattr(i, 'thermo', None) or getattr(i, '_thermo', None)
+        if isinstance(thermo, tmo.Thermo): thermos[id(thermo)] = thermo
+    thermos = list(thermos.values())
+    chemicals = list({id(i.chemicals): i.chemicals for i in thermos}.values())
+    return thermos, chemicals
+
+class FlowsheetObjects:
+    # Streams, units, named objects, and thermodynamic objects of a
+    # flowsheet by key; models are not saved, but their parameters and 
+    # metrics are referenced by index (e.g., by keys of dictionaries)
+    __slots__ = ('objects', 'thermos', 'chemicals', 'features')
+
+    def __init__(self, flowsheet, objects):
+        units = units_by_key(flowsheet)
+        self.objects = {
+            **{('stream', i): j for i, j in streams_by_key(units, flowsheet).items()},
+            **{('unit', i): j for i, j in units.items()},
+            **{('object', i): j for i, j in objects.items() if not isinstance(j, bst.Model)},
+        }
+        self.thermos, self.chemicals = thermodynamic_objects(flowsheet)
+        self.features = [j for i in objects.values() if isinstance(i, bst.Model)
+                         for j in (*i._parameters, *i._metrics)]
+
+
+class SnapshotPickler(pickle.Pickler):
+
+    def __init__(self, file, flowsheet_objects):
+        super().__init__(file, protocol=pickle.HIGHEST_PROTOCOL)
+        self.keys = {id(j): i for i, j in flowsheet_objects.objects.items()}
+        self.thermos = {id(j): i for i, j in enumerate(flowsheet_objects.thermos)}
+        self.chemicals = {id(j): i for i, j in enumerate(flowsheet_objects.chemicals)}
+        self.chemical_sets = flowsheet_objects.chemicals
+        self.features = {id(j): i for i, j in enumerate(flowsheet_objects.features)}
+        self.local_classes = local_classes()
+
+    def persistent_id(self, obj):
+        key = id(obj)
+        if key in self.keys: # Saved separately (avoids deep recursion)
+            return ('object', self.keys[key], class_reference(type(obj), self.local_classes))
+        elif key in self.thermos:
+            return ('thermo', self.thermos[key])
+        elif key in self.chemicals:
+            return ('chemicals', self.chemicals[key])
+        elif key in self.features:
+            return ('feature', self.features[key])
+        elif isinstance(obj, tmo.Chemical):
+            for i, chemicals in enumerate(self.chemical_sets):
+                if getattr(chemicals, obj.ID, None) is obj: return ('chemical', i, obj.ID)
+            return ('keep',)
+        elif isinstance(obj, bst.UtilityAgent):
+            return ('agent', obj.ID)
+        elif isinstance(obj, types.MethodType) and is_global(obj.__self__):
+            return None # For example, alternative constructors used to reduce objects
+        elif isinstance(obj, kept_types) or hasattr(obj, 'py_func'): # Including numba functions
+            if is_global(obj): return ('global', obj.__module__, obj.__qualname__)
+            return ('keep',)
+        elif isinstance(obj, type):
+            if is_global(obj): return None
+            elif obj in self.local_classes: return ('class', *self.local_classes[obj])
+            else: return ('keep',)
+        elif saved_by_state(obj) and class_reference(type(obj), self.local_classes) is None:
+            return ('keep',) # Instances of other local classes cannot be recreated
+        elif (type(obj).__module__.startswith(kept_modules)
+              and not isinstance(obj, Cache) # Caches are saved without their values
+              and not type(obj).__name__.endswith('Values')): # Results are saved
+            return ('keep',)
+        else:
+            return None
+
+    def reducer_override(self, obj):
+        if saved_by_state(obj):
+            return new_object, (type(obj),), get_state(obj), None, None, set_state
+        elif isinstance(obj, Cache): # Without values
+            return new_object, (type(obj),), {'args': obj.args, 'value': None}, None, None, set_state
+        return NotImplemented
+
+
+class SnapshotUnpickler(pickle.Unpickler):
+    active = None # Unpickler loading objects
+
+    def __init__(self, file, flowsheet_objects):
+        super().__init__(file)
+        self.objects = flowsheet_objects.objects
+        self.thermos = flowsheet_objects.thermos
+        self.chemicals = flowsheet_objects.chemicals
+        self.features = flowsheet_objects.features
+        self.new = {}
+
+    def get_object(self, key, cls):
+        objects = self.objects
+        obj = objects.get(key)
+        cls = class_from_reference(cls)
+        if cls is None: # Local classes
+            if obj is None: obj = KEEP
+        elif obj is None or type(obj) is not cls: # For example, auxiliary units created in simulation
+            objects[key] = obj = new_object(cls)
+        return obj
+
+    def load(self):
+        SnapshotUnpickler.active = self
+        try:
+            return super().load()
+        finally:
+            SnapshotUnpickler.active = None
+
+    def persistent_load(self, pid):
+        kind = pid[0]
+        if kind == 'object':
+            return self.get_object(*pid[1:])
+        elif kind == 'class':
+            return getattr(pid[1], pid[2])
+        elif kind == 'thermo':
+            return self.thermos[pid[1]]
+        elif kind == 'chemicals':
+            return self.chemicals[pid[1]]
+        elif kind == 'chemical':
+            return getattr(self.chemicals[pid[1]], pid[2])
+        elif kind == 'feature':
+            return self.features[pid[1]]
+        elif kind == 'agent':
+            return bst.HeatUtility.get_agent(pid[1])
+        elif kind == 'global':
+            value = sys.modules[pid[1]]
+            for name in pid[2].split('.'): value = getattr(value, name)
+            return value
+        else:
+            return KEEP
+
+
+def new_object(cls):
+    obj = object.__new__(cls)
+    SnapshotUnpickler.active.new[id(obj)] = obj
+    return obj
+
+def set_state(obj, state):
+    # Kept references are resolved once it is known whether the object is
+    # merged into an existing one
+    for name, value in state.items(): set_attribute(obj, name, value)
+    return obj
+
+def unit_ticket_numbers():
+    """
+    Return a copy of the ticket numbers of default unit IDs. Take them before
+    constructing a flowsheet and save them in the header of its snapshots.
+    
+    """
+    return bst.Unit.ticket_numbers.copy()
+
+@contextmanager
+def loaded_ticket_numbers(ticket_numbers):
+    """
+    Context manager that loads the ticket numbers of default unit IDs saved 
+    in the header of a snapshot, so that a flowsheet constructed within 
+    the context has the same unit IDs as the saved one. The ticket numbers 
+    of the process are restored on exit.
+    
+    """
+    current = bst.Unit.ticket_numbers
+    previous = current.copy()
+    current.clear()
+    current.update(ticket_numbers)
+    try:
+        yield
+    finally:
+        current.clear()
+        current.update(previous)
+
+def dump_snapshot(file, header, flowsheet, objects):
+    """
+    Save a snapshot to a file object.
+
+    Parameters
+    ----------
+    file :
+        Binary file object.
+    header : dict
+        Plain data needed to reconstruct the flowsheet (e.g., configuration
+        arguments).
+    flowsheet : Flowsheet
+        Flowsheet of the objects. All streams and units are saved.
+    objects : dict[str, object]
+        Other objects to save by name. Models are not saved, but references
+        to their parameters and metrics are.
+
+    """
+    pickle.dump({'versions': library_versions(), **header}, file,
+                protocol=pickle.HIGHEST_PROTOCOL)
+    flowsheet_objects = FlowsheetObjects(flowsheet, objects)
+    pickler = SnapshotPickler(file, flowsheet_objects)
+    states = [(i, class_reference(type(j), pickler.local_classes), get_state(j))
+              for i, j in flowsheet_objects.objects.items()]
+    pickler.dump(states)
+
+def load_header(file):
+    """Load the header of a snapshot from a file object."""
+    header = pickle.load(file)
+    versions = header.pop('versions')
+    if versions != library_versions():
+        raise RuntimeError(
+            f"snapshot was saved with biorefineries, biosteam, and thermosteam "
+            f"versions {versions}, but {library_versions()} are installed"
+        )
+    return header
+
+@ignore_docking_warnings
+def load_snapshot(file, flowsheet, objects, system=None):
+    """
+    Load a snapshot from a file object (after the header) and merge it in
+    place into the flowsheet and objects.
+
+    Parameters
+    ----------
+    file :
+        Binary file object.
+    flowsheet : Flowsheet
+        Newly constructed flowsheet.
+    objects : dict[str, object]
+        Other objects to restore by name.
+    system : System, optional
+        System to set up before merging (so that temporary connections 
+        made by specifications exist) and to update if connections made in 
+        simulation were restored.
+
+    """
+    data = file.read()
+    if system is not None: system._setup()
+    merge_snapshot(data, flowsheet, objects)
+    if system is not None and system._connections != [i.get_connection() for i in system.streams]:
+        # Setting up the system clears results, so the snapshot is merged again
+        system._setup(update_configuration=True)
+        merge_snapshot(data, flowsheet, objects)
+
+def merge_snapshot(data, flowsheet, objects):
+    unpickler = SnapshotUnpickler(io.BytesIO(data), FlowsheetObjects(flowsheet, objects))
+    states = unpickler.load()
+    merger = StateMerger(unpickler.objects.values())
+    new = unpickler.new
+    for key, cls, state in states:
+        obj = unpickler.get_object(key, cls)
+        if obj is KEEP: continue
+        elif id(obj) in new: set_state(obj, state)
+        else: merger.merge_attributes(obj, state)
+    merger.finalize(new.values())
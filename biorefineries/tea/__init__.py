@@ -3,11 +3,14 @@
 """
 from . import cellulosic_ethanol_tea
 from . import conventional_ethanol_tea
+from . import batch_tea
 
 __all__ = (
     *cellulosic_ethanol_tea.__all__,
     *conventional_ethanol_tea.__all__,
+    *batch_tea.__all__,
 )
 
 from .cellulosic_ethanol_tea import *
-from .conventional_ethanol_tea import *
\ No newline at end of file
+from .conventional_ethanol_tea import *
+from .batch_tea import *
\ No newline at end of file
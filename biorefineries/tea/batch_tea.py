@@ -0,0 +1,477 @@
+# -*- coding: utf-8 -*-
+# BioSTEAM: The Biorefinery Simulation and Techno-Economic Analysis Modules
+# Copyright (C) 2020-2024, Yoel Cortes-Pena <yoelcortes@gmail.com>
+#
+# This module is under the UIUC open-source license. See
+# github.com/BioSTEAMDevelopmentGroup/biosteam/blob/master/LICENSE.txt
+# for license details.
+"""
+Vectorized cash flow analysis of economic scenarios. A `BatchTEA` object
+evaluates the net present value, the internal rate of return, and break even
+prices of a simulated system for many scenarios of prices, IRR, venture
+duration, operating days, capital and operating costs, income tax, and
+depreciation at once, without resimulating the system.
+
+Examples
+--------
+>>> import numpy as np
+>>> from biorefineries import cornstover as cs # doctest: +SKIP
+>>> from biorefineries.tea import BatchTEA # doctest: +SKIP
+>>> cs.load() # doctest: +SKIP
+>>> tea = BatchTEA(
+...     cs.cornstover_tea,
+...     IRR=np.array([0.10, 0.15]),
+...     prices={cs.ethanol: np.array([0.80, 0.85])},
+...     installed_equipment_cost=np.array([2.0e8, 2.5e8]),
+...     income_tax=np.array([0.21, 0.35]),
+...     depreciation=np.array(['MACRS7', 'MACRS10']),
+... ) # doctest: +SKIP
+>>> tea.solve_price(cs.ethanol) # MESP [USD/kg] # doctest: +SKIP
+>>> tea.solve_IRR() # doctest: +SKIP
+>>> tea.NPV # doctest: +SKIP
+
+"""
+import biosteam as bst
+import numpy as np
+from biosteam._tea import add_all_replacement_costs_to_cashflow_array
+
+__all__ = ('BatchTEA',)
+
+def taxable_earnings_with_forwarded_losses(taxable_cashflows, derivatives=None):
+    """Return taxable earnings by scenario (rows) and year (columns),
+    forwarding losses to later years to reduce future taxes. If the
+    derivatives of taxable cash flows with respect to a variable are given,
+    also return the derivatives of taxable earnings."""
+    taxed_earnings = taxable_cashflows.copy()
+    if derivatives is not None: derivatives = derivatives.copy()
+    for i in range(taxed_earnings.shape[1] - 1):
+        x = taxed_earnings[:, i]
+        losses = x < 0
+        taxed_earnings[losses, i + 1] += x[losses]
+        x[losses] = 0
+        if derivatives is not None:
+            dx = derivatives[:, i]
+            derivatives[losses, i + 1] += dx[losses]
+            dx[losses] = 0
+    x = taxed_earnings[:, -1]
+    losses = x < 0
+    x[losses] = 0
+    if derivatives is None: return taxed_earnings
+    derivatives[losses, -1] = 0
+    return taxed_earnings, derivatives
+
+
+def solve_bracketed(f, xa, ya, xb, yb, xtol, ytol, maxiter=1000):
+    """Return roots of vectorized function `f` by the Illinois method given
+    brackets [xa, xb] with function values ya and yb (1d arrays)."""
+    unsolved = (np.abs(yb) >= ytol) & (np.abs(xb - xa) >= xtol)
+    for _ in range(maxiter):
+        if not unsolved.any(): break
+        with np.errstate(divide='ignore', invalid='ignore'):
+            x = xb - yb * (xb - xa) / (yb - ya)
+        x = np.where(unsolved & np.isfinite(x), x, xb)
+        y = f(x)
+        flip = y * yb < 0.
+        xa = np.where(flip, xb, xa)
+        ya = np.where(flip, yb, 0.5 * ya)
+        xb, yb = x, y
+        unsolved = (np.abs(yb) >= ytol) & (np.abs(xb - xa) >= xtol)
+    return xb
+
+
+def startup_coefficients(start, years, startup_time, startup_fraction):
+    # Fraction of annual flows by year (zero during construction)
+    coefficients = np.zeros(start + years)
+    coefficients[start:] = 1.
+    coefficients[start] = startup_time * startup_fraction + (1. - startup_time)
+    return coefficients
+
+
+class CashflowGroup:
+    # Cash flows of scenarios with the same years of operation and depreciation schedule
+    __slots__ = ('index', 'duration', 'taxable', 'nontaxable', 'depreciation',
+                 'sales_coefficients', 'duration_array')
+
+    def __init__(self, index, duration, taxable, nontaxable, depreciation,
+                 sales_coefficients, duration_array):
+        self.index = index
+        self.duration = duration
+        self.taxable = taxable
+        self.nontaxable = nontaxable
+        self.depreciation = depreciation
+        self.sales_coefficients = sales_coefficients
+        self.duration_array = duration_array
+
+
+class BatchTEA:
+    """
+    Create a BatchTEA object for the cash flow analysis of N economic
+    scenarios of a simulated system. Cash flows of all scenarios are
+    evaluated at once as arrays (scenarios by year) and break even points
+    are solved simultaneously for all scenarios.
+
+    Parameters
+    ----------
+    tea : TEA
+        Techno-economic analysis of the system (already simulated).
+    IRR : 1d array, optional
+        Internal rate of return of each scenario. Defaults to `tea.IRR`.
+    duration : tuple[1d array, 1d array], optional
+        Start and end years of each scenario. Defaults to `tea.duration`.
+    operating_days : 1d array, optional
+        Number of operating days per year of each scenario (at the same
+        hourly flow rates). Defaults to `tea.operating_days`.
+    prices : dict[Stream, 1d array], optional
+        Price [USD/kg] of feeds and products of each scenario. Defaults
+        to the current price of each stream.
+    installed_equipment_cost : 1d array, optional
+        Installed equipment cost [USD] of each scenario. Defaults to
+        `tea.installed_equipment_cost`. Equipment replacement costs scale
+        with it by default (see `replacement_cost_factor`).
+    FOC : 1d array, optional
+        Fixed operating cost [USD/yr] of each scenario. Defaults to the
+        fixed operating cost estimated by the TEA from the fixed capital
+        investment of each scenario.
+    utility_cost : 1d array, optional
+        Utility cost [USD/yr] of each scenario. Defaults to the utility cost
+        of the system at the operating days of each scenario.
+    income_tax : 1d array, optional
+        Income tax rate of each scenario. Defaults to `tea.income_tax`.
+    depreciation : 1d array[str], optional
+        Depreciation schedule of each scenario (e.g., 'MACRS7'). Defaults
+        to `tea.depreciation`.
+    replacement_cost_factor : 1d array, optional
+        Equipment replacement costs of each scenario relative to those of 
+        the system. Defaults to `installed_equipment_cost` over 
+        `tea.installed_equipment_cost`. Pass 1 to keep replacement costs of
+        the system in all scenarios (as the scalar TEA does when only its 
+        installed equipment cost changes).
+
+    Notes
+    -----
+    Results correspond to the state of the system at creation. The total
+    depreciable capital, fixed capital investment, and fixed operating cost
+    of all scenarios are estimated at once by the TEA from installed
+    equipment costs, and depreciation is evaluated once per schedule and
+    venture duration (it is linear in the total depreciable capital).
+    Equipment replacement costs scale with installed equipment costs 
+    unless a `replacement_cost_factor` is given.
+    Construction schedule, startup, and financing are the same in all
+    scenarios, while sales and material and utility costs scale with
+    operating hours and prices.
+
+    """
+    __slots__ = ('tea', 'IRR', 'operating_hours', 'sales', 'material_cost',
+                 'utility_cost', 'installed_equipment_cost', 'TDC', 'FCI',
+                 'FOC', 'TCI', 'income_tax', 'depreciation', 
+                 'replacement_cost_factor', '_groups',
+                 '_prices', '_vectorized_tax')
+
+    def __init__(self, tea, IRR=None, duration=None, operating_days=None, prices=None,
+                 installed_equipment_cost=None, FOC=None, utility_cost=None,
+                 income_tax=None, depreciation=None, replacement_cost_factor=None):
+        arrays = [np.asarray(i) for i in (
+            IRR, *(duration or ()), operating_days, installed_equipment_cost,
+            FOC, utility_cost, income_tax, depreciation, replacement_cost_factor,
+            *(prices or {}).values()
+        ) if i is not None]
+        N = max([i.size for i in arrays], default=1)
+        def full(x): return np.broadcast_to(np.asarray(x, dtype=float), N).copy()
+        self.tea = tea
+        self.IRR = full(tea.IRR if IRR is None else IRR)
+        hours0 = tea.operating_hours
+        hours = self.operating_hours = full(
+            hours0 if operating_days is None else 24. * np.asarray(operating_days, dtype=float)
+        )
+        system = tea.system
+        sales_rate = np.full(N, tea.sales / hours0)
+        material_cost_rate = np.full(N, tea.material_cost / hours0)
+        self._prices = prices = {} if prices is None else {i: full(j) for i, j in prices.items()}
+        for stream, price in prices.items():
+            flow_rate = system._price2cost(stream) / hours0 # Positive for products and negative for feeds
+            if flow_rate > 0.: sales_rate += (price - stream.price) * flow_rate
+            else: material_cost_rate -= (price - stream.price) * flow_rate
+        self.sales = hours * sales_rate
+        self.material_cost = hours * material_cost_rate
+        self.utility_cost = full(
+            hours * (tea.utility_cost / hours0) if utility_cost is None else utility_cost
+        )
+        self.installed_equipment_cost = installed_equipment_cost = full(
+            tea.installed_equipment_cost if installed_equipment_cost is None else installed_equipment_cost
+        )
+        try: # Cost factors of the TEA apply element-wise to all scenarios
+            self.TDC = TDC = full(tea._TDC(tea._DPI(installed_equipment_cost)))
+            self.FCI = FCI = full(tea._FCI(TDC))
+            self.FOC = full(tea._FOC(FCI) if FOC is None else FOC)
+        finally:
+            tea.FOC # Reset cached costs of the TEA
+        self.TCI = (1. + tea.WC_over_FCI) * FCI
+        self.replacement_cost_factor = full(
+            installed_equipment_cost / tea.installed_equipment_cost
+            if replacement_cost_factor is None else replacement_cost_factor
+        )
+        self.income_tax = full(tea.income_tax if income_tax is None else income_tax)
+        if depreciation is None:
+            self.depreciation = None
+            schedules = np.zeros(N, int)
+        else:
+            self.depreciation = np.broadcast_to(np.asarray(depreciation), N).copy()
+            schedules = np.unique(self.depreciation, return_inverse=True)[1].reshape(N)
+        self._vectorized_tax = type(tea)._fill_tax_and_incentives is bst.TEA._fill_tax_and_incentives
+        if duration is None:
+            start_years = full(tea.duration[0])
+            end_years = full(tea.duration[1])
+        else:
+            start_years, end_years = [full(i) for i in duration]
+        years = end_years - start_years
+        self._groups = groups = []
+        duration0 = tea.duration
+        depreciation0 = tea.depreciation
+        try:
+            for n, schedule in dict.fromkeys(zip(years.tolist(), schedules.tolist())):
+                index = np.flatnonzero((years == n) & (schedules == schedule))
+                tea.duration = (int(start_years[index[0]]), int(end_years[index[0]]))
+                if depreciation is not None: tea.depreciation = self.depreciation[index[0]]
+                groups.append(self._cashflow_group(index))
+        finally:
+            tea.duration = duration0
+            tea.depreciation = depreciation0
+
+    def _cashflow_group(self, index):
+        # Cash flows of scenarios with the duration and depreciation schedule
+        # of the TEA (as in `TEA._taxable_nontaxable_depreciation_cashflows`)
+        tea = self.tea
+        system = tea.system
+        start = tea._start
+        years = tea._years
+        D0, D1, replacement = np.zeros([3, start + years])
+        tea._fill_depreciation_array(D0, start, years, 0.)
+        tea._fill_depreciation_array(D1, start, years, 1.)
+        D = D0 + self.TDC[index, None] * (D1 - D0)
+        units = system.unit_capital_costs if isinstance(system, bst.AgileSystem) else system.cost_units
+        for i in units:
+            add_all_replacement_costs_to_cashflow_array(i, replacement, years, start, tea.lang_factor)
+        w0 = tea._startup_time
+        sales_coefficients = startup_coefficients(start, years, w0, tea.startup_salesfrac)
+        S = self.sales[index, None] * sales_coefficients
+        C = (self.VOC[index, None] * startup_coefficients(start, years, w0, tea.startup_VOCfrac)
+             + self.FOC[index, None] * startup_coefficients(start, years, w0, tea.startup_FOCfrac))
+        FCI = self.FCI[index]
+        C_FC = self.replacement_cost_factor[index, None] * replacement
+        C_FC[:, :start] += FCI[:, None] * tea._construction_schedule
+        C_WC = np.zeros_like(C_FC)
+        WC = tea.WC_over_FCI * FCI
+        C_WC[:, start - 1] = WC
+        C_WC[:, -1] = -WC
+        interest = tea.finance_interest
+        if interest:
+            Loan = np.zeros_like(C_FC)
+            Loan[:, :start] = loan = tea.finance_fraction * C_FC[:, :start]
+            if tea.accumulate_interest_during_construction:
+                principal = np.zeros(index.size)
+                for i in loan.T: principal = principal * (1. + interest) + i
+            else:
+                principal = loan.sum(1)
+            finance_years = tea.finance_years
+            fn = (1. + interest) ** finance_years
+            LP = np.zeros_like(C_FC)
+            LP[:, start:start + finance_years] = (principal * interest * fn / (fn - 1.))[:, None]
+            taxable = S - C - D - LP
+            nontaxable = D + Loan - C_FC - C_WC
+            if not tea.accumulate_interest_during_construction:
+                nontaxable[:, :start] -= loan * interest
+        else:
+            taxable = S - C - D
+            nontaxable = D - C_FC - C_WC
+        return CashflowGroup(index, tea.duration, taxable, nontaxable, D,
+                             sales_coefficients, tea._get_duration_array().copy())
+
+    @property
+    def N(self):
+        """[int] Number of scenarios."""
+        return self.IRR.size
+
+    @property
+    def VOC(self):
+        """[1d array] Variable operating costs [USD/yr]."""
+        return self.material_cost + self.utility_cost
+
+    @property
+    def AOC(self):
+        """[1d array] Annual operating cost excluding depreciation [USD/yr]."""
+        return self.FOC + self.VOC
+
+    def _cashflows(self, group, taxable):
+        # Return cash flows by scenario and year given taxable cash flows
+        nontaxable = group.nontaxable
+        income_tax = self.income_tax[group.index]
+        if self._vectorized_tax:
+            tax = income_tax[:, None] * taxable_earnings_with_forwarded_losses(taxable)
+            return nontaxable + taxable - tax
+        tea = self.tea
+        forwarded_taxable = taxable_earnings_with_forwarded_losses(taxable)
+        cashflows = np.empty_like(taxable)
+        duration = tea.duration
+        income_tax0 = tea.income_tax
+        tea.duration = group.duration
+        try:
+            for i, row in enumerate(taxable):
+                tax = np.zeros_like(row)
+                incentives = tax.copy()
+                tea.income_tax = income_tax[i]
+                tea._fill_tax_and_incentives(
+                    incentives, forwarded_taxable[i], nontaxable[i], tax, group.depreciation[i]
+                )
+                cashflows[i] = nontaxable[i] + row + incentives - tax
+        finally:
+            tea.duration = duration
+            tea.income_tax = income_tax0
+        return cashflows
+
+    def _discount_factors(self, group, IRR=None):
+        if IRR is None: IRR = self.IRR[group.index]
+        return (1. + IRR[:, None]) ** group.duration_array
+
+    def cashflow_arrays(self):
+        """Return a list of cash flows by year [USD/yr] as 1d arrays for each scenario."""
+        cashflow_arrays = [None] * self.N
+        for group in self._groups:
+            for i, row in zip(group.index, self._cashflows(group, group.taxable)):
+                cashflow_arrays[i] = row
+        return cashflow_arrays
+
+    @property
+    def NPV(self):
+        """[1d array] Net present value [USD]."""
+        NPV = np.empty(self.N)
+        for group in self._groups:
+            cashflows = self._cashflows(group, group.taxable)
+            NPV[group.index] = (cashflows / self._discount_factors(group)).sum(1)
+        return NPV
+
+    def solve_IRR(self):
+        """
+        Return the IRR of each scenario at the break even point (NPV = 0).
+        Scenarios without a break even point at IRRs between -0.99 and 1000
+        (e.g., with negative cash flows every year) result in nan.
+
+        """
+        IRR = np.empty(self.N)
+        for group in self._groups:
+            cashflows = self._cashflows(group, group.taxable)
+            duration_array = group.duration_array
+            f = lambda x: (cashflows / (1. + x[:, None]) ** duration_array).sum(1)
+            xa = self.IRR[group.index].copy()
+            xa[~(xa > 0.)] = 0.10
+            ya = f(xa)
+            # The NPV of conventional cash flows (investment followed by
+            # earnings) decreases with the IRR; search between -0.99 and 1000
+            # in geometric steps to find the break even point closest to the
+            # initial guess
+            step = lambda x, y: np.where(
+                y > 0., np.minimum(1.5 * x + 0.5, 1e3), np.maximum(0.75 * x - 0.25, -0.99)
+            )
+            xb = step(xa, ya)
+            yb = f(xb)
+            for _ in range(100): # Bracket break even point
+                unbracketed = (ya * yb > 0.) & (np.abs(yb) >= 10.) & (xa != xb)
+                if not unbracketed.any(): break
+                xa = np.where(unbracketed, xb, xa)
+                ya = np.where(unbracketed, yb, ya)
+                xb = np.where(unbracketed, step(xb, yb), xb)
+                yb = f(xb)
+            x = solve_bracketed(f, xa, ya, xb, yb, 1e-6, 10.)
+            x[(ya * yb > 0.) & (np.abs(yb) >= 10.)] = np.nan
+            IRR[group.index] = x
+        return IRR
+
+    def _solve_sales_by_newton(self, group, discount_factors, maxiter=20):
+        # NPV is piecewise linear in sales (losses are forwarded), so Newton's
+        # method with exact derivatives converges within a few iterations;
+        # scenarios that do not converge result in nan
+        coefficients = np.broadcast_to(group.sales_coefficients, group.taxable.shape)
+        income_tax = self.income_tax[group.index, None]
+        nontaxable = group.nontaxable
+        x = np.zeros(group.index.size)
+        for _ in range(maxiter):
+            taxable = group.taxable + x[:, None] * coefficients
+            earnings, derivatives = taxable_earnings_with_forwarded_losses(taxable, coefficients)
+            y = ((nontaxable + taxable - income_tax * earnings) / discount_factors).sum(1)
+            converged = np.abs(y) < 100.
+            if converged.all(): return x
+            dy = ((coefficients - income_tax * derivatives) / discount_factors).sum(1)
+            with np.errstate(divide='ignore', invalid='ignore'):
+                x = np.where(converged, x, x - y / dy)
+        x[~converged] = np.nan
+        return x
+
+    def solve_sales(self):
+        """
+        Return the required additional sales [USD/yr] of each scenario to
+        reach the break even point (NPV = 0).
+
+        """
+        sales = np.empty(self.N)
+        for group in self._groups:
+            discount_factors = self._discount_factors(group)
+            coefficients = group.sales_coefficients
+            if self._vectorized_tax:
+                x = self._solve_sales_by_newton(group, discount_factors)
+                sales[group.index] = x
+                unsolved = np.isnan(x)
+                if not unsolved.any(): continue
+                discount_factors = discount_factors[unsolved]
+                group = CashflowGroup(
+                    group.index[unsolved], group.duration, group.taxable[unsolved],
+                    group.nontaxable[unsolved], group.depreciation[unsolved],
+                    coefficients, group.duration_array,
+                )
+            taxable = group.taxable
+            f = lambda x: (
+                self._cashflows(group, taxable + x[:, None] * coefficients) / discount_factors
+            ).sum(1)
+            # NPV increases with sales at a rate no greater than the
+            # discounted sales coefficients (i.e., no taxes), so the first
+            # estimate never overshoots the break even point
+            xa = np.zeros(taxable.shape[0])
+            ya = f(xa)
+            xb = - ya / (coefficients / discount_factors).sum(1)
+            yb = f(xb)
+            for _ in range(100): # Bracket break even point
+                unbracketed = (ya * yb > 0.) & (np.abs(yb) >= 100.)
+                if not unbracketed.any(): break
+                dx = xb - xa
+                xa = np.where(unbracketed, xb, xa)
+                ya = np.where(unbracketed, yb, ya)
+                xb = np.where(unbracketed, xb + 2. * dx, xb)
+                yb = f(xb)
+            sales[group.index] = solve_bracketed(f, xa, ya, xb, yb, 10., 100.)
+        return sales
+
+    def solve_price(self, streams):
+        """
+        Return the price [USD/kg] of a stream(s) at the break even point
+        (NPV = 0) of each scenario (e.g., the minimum ethanol selling price).
+
+        Parameters
+        ----------
+        streams : Stream|Collection[Stream]
+            Streams with variable selling price.
+
+        """
+        if isinstance(streams, bst.Stream): streams = [streams]
+        system = self.tea.system
+        hours = self.operating_hours
+        hours0 = self.tea.operating_hours
+        prices = self._prices
+        flow_rates = [system._price2cost(i) / hours0 for i in streams]
+        price2cost = hours * sum(flow_rates)
+        if (price2cost == 0.).any(): raise ValueError('cannot solve price of empty streams')
+        market_value = hours * sum([
+            prices[i] * abs(j) if i in prices else i.price * abs(j)
+            for i, j in zip(streams, flow_rates)
+        ])
+        return market_value / np.abs(price2cost) + self.solve_sales() / price2cost
+
+    def __repr__(self):
+        return f'{type(self).__name__}({self.tea!r}, N={self.N})'
@@ -0,0 +1,302 @@
+# -*- coding: utf-8 -*-
+# BioSTEAM: The Biorefinery Simulation and Techno-Economic Analysis Modules
+# Copyright (C) 2020-2024, Yoel Cortes-Pena <yoelcortes@gmail.com>
+#
+# This module is under the UIUC open-source license. See
+# github.com/BioSTEAMDevelopmentGroup/biosteam/blob/master/LICENSE.txt
+# for license details.
+"""
+Convergence telemetry of Monte Carlo evaluations. A `ConvergenceTelemetry`
+object attached to a model records, for every evaluated sample, the wall
+time, the number of simulations (more than one when the evaluation is
+retried), the recycle iterations and final residuals of each recycle
+system, switches of convergence methods (e.g., by bug fix barrages within
+model specifications), and exceptions. Results are indexed by sample, just
+as the table of the model, so that slow or failing regions of the
+parameter space can be located.
+
+Examples
+--------
+>>> from biorefineries import cane # doctest: +SKIP
+>>> from biorefineries.telemetry import ConvergenceTelemetry # doctest: +SKIP
+>>> br = cane.Biorefinery('O1') # doctest: +SKIP
+>>> model = br.model # doctest: +SKIP
+>>> model.load_samples(model.sample(100, rule='L')) # doctest: +SKIP
+>>> with ConvergenceTelemetry(model) as telemetry: # doctest: +SKIP
+...     model.evaluate()
+>>> telemetry.table() # doctest: +SKIP
+>>> telemetry.iteration_table() # doctest: +SKIP
+
+"""
+from time import perf_counter
+from functools import wraps
+import numpy as np
+import pandas as pd
+
+__all__ = (
+    'ConvergenceTelemetry',
+    'save_telemetry_tables',
+)
+
+def recycle_systems(system):
+    systems = [system] if system._recycle else []
+    for i in system.subsystems: systems.extend(recycle_systems(i))
+    return systems
+
+def format_exception(exception):
+    return f"{type(exception).__name__}: {exception}"
+
+def save_telemetry_tables(table, iteration_table, file):
+    """Save telemetry tables (e.g., merged from several evaluations) as a 
+    CSV or Excel file (by extension); Excel files include iterations by 
+    recycle system in a second sheet."""
+    if file.endswith(('.xlsx', '.xls')):
+        with pd.ExcelWriter(file) as writer:
+            table.to_excel(writer, sheet_name='Telemetry')
+            iteration_table.to_excel(writer, sheet_name='Iterations')
+    else:
+        table.to_csv(file)
+
+class SampleRecord:
+    __slots__ = ('values', 'start', 'end', 'simulations', 'simulation_time',
+                 'iterations', 'residuals', 'unconverged', 'switches',
+                 'exceptions', 'failed')
+
+    def __init__(self, values, start):
+        self.values = values
+        self.start = start
+        self.end = None
+        self.simulations = 0
+        self.simulation_time = 0.
+        self.iterations = {}
+        self.residuals = (0., 0., 0., 0.)
+        self.unconverged = 0
+        self.switches = []
+        self.exceptions = []
+        self.failed = False
+
+
+class ConvergenceTelemetry:
+    """
+    Create a ConvergenceTelemetry object that records the convergence of
+    the system of a model for each sample evaluated while attached.
+    Telemetry can be attached as a context manager or explicitly with
+    `attach` and `detach`; records accumulate over all periods of
+    attachment.
+
+    Parameters
+    ----------
+    model : Model
+        Model to attach to.
+
+    Notes
+    -----
+    While attached, the model specification (or system simulation, if no
+    specification is given), the exception hook, and the parameter setters
+    and metric getters of the model are wrapped; they are restored on
+    detachment. Keyword arguments passed to `Model.evaluate` are not
+    forwarded to `System.simulate` while attached.
+
+    Recycle iterations and residuals correspond to the last convergence of
+    each recycle system within the simulation of a sample.
+
+    """
+    __slots__ = ('model', 'records', '_patched', '_values', '_set_time',
+                 '_record', '_pending')
+
+    def __init__(self, model):
+        self.model = model
+        self.records = []
+        self._patched = None
+        self._values = {}
+        self._set_time = None
+        self._record = None
+        self._pending = False # Whether the last simulation failed (so it may be retried)
+
+    @property
+    def attached(self):
+        """[bool] Whether the telemetry is attached to the model."""
+        return self._patched is not None
+
+    def attach(self):
+        """Start recording sample evaluations."""
+        if self._patched is not None: return
+        model = self.model
+        self._patched = patched = [
+            ('specification', model.specification),
+            ('exception_hook', model._exception_hook),
+        ]
+        specification = model.specification or model.system.simulate
+        model.specification = self._wrap_specification(specification)
+        model.exception_hook = self._wrap_exception_hook(model._exception_hook)
+        for n, parameter in enumerate(model._parameters):
+            patched.append((parameter, parameter.setter))
+            parameter.setter = self._wrap_setter(n, parameter.setter)
+        metrics = model._metrics
+        last = len(metrics) - 1
+        for n, metric in enumerate(metrics):
+            patched.append((metric, metric.getter))
+            metric.getter = self._wrap_getter(metric.getter, n == last)
+
+    def detach(self):
+        """Stop recording and restore the model."""
+        patched = self._patched
+        if patched is None: return
+        model = self.model
+        (_, specification), (_, exception_hook), *features = patched
+        model.specification = specification
+        model.exception_hook = exception_hook
+        for feature, f in features:
+            if hasattr(feature, 'setter'): feature.setter = f
+            else: feature.getter = f
+        self._patched = self._record = None
+        self._pending = False
+        self._values.clear()
+
+    def __enter__(self):
+        self.attach()
+        return self
+
+    def __exit__(self, type, exception, traceback):
+        self.detach()
+
+    def reset(self):
+        """Clear all records."""
+        self.records.clear()
+        self._record = None
+        self._pending = False
+
+    def _wrap_setter(self, index, setter):
+        values = self._values
+        @wraps(setter)
+        def set_and_record(value):
+            if not values: self._set_time = perf_counter()
+            values[index] = value
+            return setter(value)
+        return set_and_record
+
+    def _wrap_getter(self, getter, last):
+        @wraps(getter)
+        def get_and_record():
+            try:
+                value = getter()
+            except Exception as exception:
+                record = self._record
+                if record is not None: record.exceptions.append(format_exception(exception))
+                raise
+            if last and self._record is not None: self._record.end = perf_counter()
+            return value
+        return get_and_record
+
+    def _wrap_exception_hook(self, exception_hook):
+        def record_exception(exception, sample):
+            record = self._record
+            if record is not None:
+                message = format_exception(exception)
+                if message not in record.exceptions: record.exceptions.append(message)
+                record.failed = True
+                record.end = perf_counter()
+            self._pending = False
+            return exception_hook(exception, sample) if exception_hook else None
+        return record_exception
+
+    def _wrap_specification(self, specification):
+        @wraps(specification)
+        def simulate_and_record():
+            values = self._values
+            values = tuple([values[i] for i in sorted(values)])
+            self._values.clear()
+            record = self._record
+            if not (self._pending and record is not None and record.values == values):
+                start = self._set_time or perf_counter()
+                self._record = record = SampleRecord(values, start)
+                self.records.append(record)
+            self._set_time = None
+            systems = recycle_systems(self.model.system)
+            methods = [i._method for i in systems]
+            record.simulations += 1
+            start = perf_counter()
+            try:
+                value = specification()
+            except Exception as exception:
+                record.exceptions.append(format_exception(exception))
+                self._pending = True
+                raise
+            else:
+                self._pending = False
+                return value
+            finally:
+                record.end = end = perf_counter()
+                record.simulation_time += end - start
+                for system, method in zip(systems, methods):
+                    if system._method != method:
+                        record.switches.append(f"{system.ID}: {method} -> {system._method}")
+                record.iterations = {i.ID: i._iter for i in systems}
+                record.unconverged = sum([i._iter >= i.maxiter for i in systems])
+                record.residuals = tuple([
+                    max([getattr(i, name) for i in systems], default=0.)
+                    for name in ('_mol_error', '_rmol_error', '_T_error', '_rT_error')
+                ])
+        return simulate_and_record
+
+    def _sample_index(self):
+        # Values of parameters as set by the model for each sample
+        model = self.model
+        samples = model._samples
+        if samples is None: return {}
+        scales = np.array([1. if i.scale is None else i.scale for i in model._parameters])
+        index = {}
+        for n, row in enumerate(samples): index.setdefault(tuple(row * scales), n)
+        return index
+
+    def table(self):
+        """
+        Return a table of the wall time, number of simulations, recycle
+        iterations, maximum final residuals, solver switches, and exceptions
+        of each sample. The table is indexed by sample number (as the table
+        of the model) and samples evaluated more than once (e.g., in
+        separate calls to `Model.evaluate`) are listed once per evaluation.
+
+        """
+        index = self._sample_index()
+        data = []
+        samples = []
+        for record in self.records:
+            samples.append(index.get(record.values, -1))
+            end = record.end or record.start
+            data.append((
+                end - record.start, record.simulation_time, record.simulations,
+                record.simulations > 1, record.failed,
+                sum(record.iterations.values()),
+                max(record.iterations, key=record.iterations.get, default=''),
+                record.unconverged, *record.residuals,
+                '; '.join(record.switches), '; '.join(record.exceptions),
+            ))
+        return pd.DataFrame(
+            data,
+            index=pd.Index(samples, name='Sample'),
+            columns=('Time [s]', 'Simulation time [s]', 'Simulations',
+                     'Retried', 'Failed', 'Iterations', 'Most iterations',
+                     'Unconverged systems', 'Molar flow error [kmol/hr]',
+                     'Relative molar flow error', 'Temperature error [K]',
+                     'Relative temperature error', 'Solver switches',
+                     'Exceptions'),
+        )
+
+    def iteration_table(self):
+        """Return a table of recycle iterations by sample and recycle system."""
+        index = self._sample_index()
+        samples = [index.get(i.values, -1) for i in self.records]
+        return pd.DataFrame(
+            [i.iterations for i in self.records],
+            index=pd.Index(samples, name='Sample'),
+        )
+
+    def save(self, file):
+        """Save the table of results as a CSV or Excel file (by extension);
+        Excel files include iterations by recycle system in a second sheet."""
+        save_telemetry_tables(self.table(), self.iteration_table(), file)
+
+    def __repr__(self):
+        status = 'attached' if self.attached else 'detached'
+        return f"<{type(self).__name__}: {len(self.records)} samples, {status}>"
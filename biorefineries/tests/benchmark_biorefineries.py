@@ -0,0 +1,253 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark biorefineries tested in `test_biorefineries`. For each biorefinery
+(and configuration), the following are timed in a fresh interpreter (with
+numba JIT compilation enabled, unlike the tests):
+
+* import: cold import of the biorefinery module.
+* construction: loading the biorefinery excluding system simulations.
+* first simulation: system simulations while loading (or the first
+  simulation if the biorefinery is not simulated while loading).
+* warm simulation: simulation of the converged system.
+* evaluation: Monte Carlo evaluation of the model of the biorefinery (if
+  any) with 20 samples by default.
+
+Results can be saved as JSON files and compared against a baseline to
+find regressions. Run as a script (e.g.,
+`python -m biorefineries.tests.benchmark_biorefineries sugarcane oilcane_S1
+--baseline benchmark.json`) or call `benchmark_biorefineries`.
+"""
+import os
+_NUMBA_DISABLE_JIT = os.environ.get('NUMBA_DISABLE_JIT') # Set by test_biorefineries
+import sys
+import json
+import argparse
+import subprocess
+import numpy as np
+import pandas as pd
+from biorefineries.tests.test_biorefineries import (
+    feedstocks_by_module, products_by_module, configurations, must_load, marked_slow,
+)
+
+__all__ = (
+    'stages',
+    'benchmark_names',
+    'benchmark_biorefinery',
+    'benchmark_biorefineries',
+    'save_results',
+    'load_results',
+    'compare_to_baseline',
+)
+
+stages = ('import', 'construction', 'first simulation', 'warm simulation', 'evaluation')
+
+# Models of biorefineries that do not define a `model` when loaded
+models_by_module = {
+    'cornstover': ('biorefineries.cornstover.model', 'cornstover_model'),
+    'sugarcane': ('biorefineries.sugarcane.model', 'sugarcane_model'),
+}
+
+timer = """
+import sys, time, json, warnings
+warnings.filterwarnings('ignore')
+from importlib import import_module
+results = dict.fromkeys({stages})
+errors = {{}}
+t = time.perf_counter()
+module = import_module('biorefineries.{module}')
+results['import'] = time.perf_counter() - t
+import biosteam as bst
+bst.process_tools.default()
+simulate = bst.System.simulate
+simulation = [0., 0] # Time and depth of simulations
+def timed_simulate(self, *args, **kwargs):
+    simulation[1] += 1
+    t = time.perf_counter()
+    try:
+        return simulate(self, *args, **kwargs)
+    finally:
+        simulation[1] -= 1
+        if not simulation[1]: simulation[0] += time.perf_counter() - t
+bst.System.simulate = timed_simulate
+t = time.perf_counter()
+try:
+    module.load(*{args})
+except Exception as error:
+    if {must_load}: raise
+load_time = time.perf_counter() - t
+bst.System.simulate = simulate
+for name in ('tea', '{module}_tea', '{feedstock}_tea', '{product}_tea'):
+    tea = getattr(module, name, None)
+    if tea is not None: break
+system = tea.system
+if simulation[0]:
+    results['construction'] = load_time - simulation[0]
+    results['first simulation'] = simulation[0]
+else:
+    results['construction'] = load_time
+    t = time.perf_counter()
+    system.simulate()
+    results['first simulation'] = time.perf_counter() - t
+t = time.perf_counter()
+system.simulate()
+results['warm simulation'] = time.perf_counter() - t
+model = {model}
+if model is None: model = getattr(module, 'model', None)
+if isinstance(model, bst.Model) and {samples}:
+    try:
+        model.load_samples(model.sample({samples}, rule='L', seed=0))
+        t = time.perf_counter()
+        model.evaluate()
+        results['evaluation'] = time.perf_counter() - t
+    except Exception as error:
+        errors['evaluation'] = f"{{type(error).__name__}}: {{error}}"
+print(json.dumps([results, errors]))
+"""
+
+def benchmark_names(slow=True):
+    """Return the names of all benchmarked biorefineries (as the tags of
+    the tests in `test_biorefineries`; e.g., 'oilcane_S1_agile' for the
+    'S1*' configuration of oilcane)."""
+    names = []
+    for module in feedstocks_by_module:
+        if not slow and module in marked_slow: continue
+        if module in configurations:
+            names.extend([f"{module}_{i}".replace('*', '_agile') for i in configurations[module]])
+        else:
+            names.append(module)
+    return names
+
+def parse_name(name):
+    """Return the module and configuration (None if not applicable) of a
+    benchmark name."""
+    for module in feedstocks_by_module:
+        if name == module: return module, None
+        for configuration in configurations.get(module, ()):
+            if name == f"{module}_{configuration}".replace('*', '_agile'):
+                return module, configuration
+    raise ValueError(f"no biorefinery named {name!r}; valid names include {benchmark_names()}")
+
+def benchmark_biorefinery(name, samples=20, timeout=None):
+    """
+    Time all benchmark stages of a biorefinery in a fresh interpreter and
+    return a dictionary of times [s] by stage (None for stages that are not
+    applicable or failed) and a dictionary of error messages by stage.
+
+    """
+    module, configuration = parse_name(name)
+    feedstock = feedstocks_by_module[module]
+    product = products_by_module.get(configuration) or products_by_module[module]
+    if module in models_by_module:
+        model_module, model_name = models_by_module[module]
+        model = f"getattr(import_module({model_module!r}), {model_name!r})"
+    else:
+        model = 'None'
+    code = timer.format(
+        stages=repr(stages), module=module, feedstock=feedstock, product=product,
+        args=repr(() if configuration is None else (configuration,)),
+        must_load=module in must_load, model=model, samples=int(samples),
+    )
+    root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    env = os.environ.copy()
+    env['PYTHONPATH'] = os.pathsep.join([root, env.get('PYTHONPATH', '')])
+    if _NUMBA_DISABLE_JIT is None: env.pop('NUMBA_DISABLE_JIT', None)
+    else: env['NUMBA_DISABLE_JIT'] = _NUMBA_DISABLE_JIT
+    try:
+        process = subprocess.run(
+            [sys.executable, '-W', 'ignore', '-c', code],
+            capture_output=True, text=True, env=env, timeout=timeout,
+        )
+    except subprocess.TimeoutExpired:
+        return dict.fromkeys(stages), {'benchmark': f'timed out after {timeout} s'}
+    lines = process.stdout.strip().splitlines()
+    if process.returncode or not lines:
+        error = process.stderr.strip().splitlines()
+        return dict.fromkeys(stages), {'benchmark': error[-1] if error else 'failed'}
+    results, errors = json.loads(lines[-1])
+    return results, errors
+
+def benchmark_biorefineries(names=None, samples=20, repeat=1, slow=True,
+                            timeout=None, verbose=True):
+    """
+    Benchmark biorefineries and return a dictionary of results by name,
+    including the minimum time [s] of each stage over all repetitions and
+    error messages (if any).
+
+    """
+    if names is None: names = benchmark_names(slow)
+    results = {}
+    for name in names:
+        times = {i: [] for i in stages}
+        errors = {}
+        for i in range(repeat):
+            stage_times, stage_errors = benchmark_biorefinery(name, samples, timeout)
+            for stage, t in stage_times.items():
+                if t is not None: times[stage].append(t)
+            errors.update(stage_errors)
+        results[name] = result = {i: (min(j) if j else None) for i, j in times.items()}
+        result['errors'] = errors
+        if verbose:
+            summary = ', '.join([f"{i} {result[i]:.3g} s" for i in stages if result[i] is not None])
+            print(f"{name}: {summary}")
+            for stage, error in errors.items(): print(f"    {stage} failed: {error}")
+    return results
+
+def save_results(results, file):
+    """Save benchmark results as a JSON file."""
+    with open(file, 'w') as f: json.dump(results, f, indent=2)
+
+def load_results(file):
+    """Load benchmark results from a JSON file."""
+    with open(file) as f: return json.load(f)
+
+def compare_to_baseline(results, baseline, tolerance=0.25, min_time=0.1):
+    """
+    Return a table of times [s] of each stage and biorefinery in both
+    results and baseline, their ratio, and whether it is a regression (i.e.,
+    the time increased by more than `min_time` [s] and the ratio is greater
+    than 1 + tolerance) or a failure (i.e., the stage failed in results but
+    not in the baseline). The absolute floor keeps timing noise of fast 
+    stages from being flagged.
+
+    """
+    if isinstance(baseline, str): baseline = load_results(baseline)
+    data = []
+    for name, result in results.items():
+        if name not in baseline: continue
+        reference = baseline[name]
+        errors = result.get('errors', {})
+        for stage in stages:
+            new = result.get(stage)
+            old = reference.get(stage)
+            if old is None and new is None: continue
+            ratio = new / old if (old and new is not None) else np.nan
+            failed = old is not None and new is None and (stage in errors or 'benchmark' in errors)
+            regression = bool(ratio > 1. + tolerance and new - old > min_time)
+            data.append((
+                name, stage, old, new, ratio, regression, failed,
+            ))
+    return pd.DataFrame(
+        data, columns=('Biorefinery', 'Stage', 'Baseline [s]', 'Time [s]',
+                       'Ratio', 'Regression', 'Failed'),
+    )
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Benchmark biorefineries.')
+    parser.add_argument('names', nargs='*', help='biorefineries to benchmark (defaults to all)')
+    parser.add_argument('--samples', type=int, default=20, help='number of samples to evaluate')
+    parser.add_argument('--repeat', type=int, default=1, help='number of repetitions')
+    parser.add_argument('--skip-slow', action='store_true', help='skip biorefineries marked as slow')
+    parser.add_argument('--timeout', type=float, default=None, help='timeout of each benchmark [s]')
+    parser.add_argument('--output', help='JSON file to save results to')
+    parser.add_argument('--baseline', help='JSON file of baseline results to compare to')
+    parser.add_argument('--tolerance', type=float, default=0.25, help='relative increase in time considered a regression')
+    parser.add_argument('--min-time', type=float, default=0.1, help='increase in time [s] below which no regression is reported')
+    args = parser.parse_args()
+    results = benchmark_biorefineries(
+        args.names or None, args.samples, args.repeat, not args.skip_slow, args.timeout
+    )
+    if args.output: save_results(results, args.output)
+    if args.baseline and os.path.exists(args.baseline):
+        comparison = compare_to_baseline(results, args.baseline, args.tolerance, args.min_time)
+        print(comparison.to_string(index=False))
+        if (comparison['Regression'] | comparison['Failed']).any(): sys.exit(1)
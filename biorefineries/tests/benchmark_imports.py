@@ -0,0 +1,85 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark cold-start import times of biorefinery packages. Each import is
+timed in a fresh interpreter, so nothing is shared between repetitions.
+
+Run as a script (e.g., `python -m biorefineries.tests.benchmark_imports`)
+or call `benchmark_imports` with the names of the modules to time.
+"""
+import os
+import sys
+import json
+import subprocess
+import numpy as np
+
+__all__ = (
+    'time_import',
+    'benchmark_imports',
+)
+
+default_modules = (
+    'biorefineries.cane',
+    'biorefineries.cellulosic',
+    'biorefineries.sugarcane',
+    'biorefineries.oilcane',
+)
+
+# Modules that should not be imported unless needed
+watched_modules = (
+    'biosteam',
+    'matplotlib.pyplot',
+    'colorpalette',
+    'sklearn',
+    'biorefineries.cane.evaluation',
+    'biorefineries.cane.contour_plots',
+    'biorefineries.cane.uncertainty_plots',
+    'biorefineries.cane.data.price_distributions_2023',
+)
+
+timer = """
+import sys, time, json
+t = time.perf_counter()
+import {module}
+t = time.perf_counter() - t
+watched = {watched}
+print(json.dumps([t, [i for i in watched if i in sys.modules]]))
+"""
+
+def time_import(module, watched=watched_modules):
+    """Return the time [s] to import a module in a fresh interpreter and the
+    watched modules that were imported along with it."""
+    root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    env = os.environ.copy()
+    env['PYTHONPATH'] = os.pathsep.join([root, env.get('PYTHONPATH', '')])
+    code = timer.format(module=module, watched=repr(tuple(watched)))
+    output = subprocess.run(
+        [sys.executable, '-W', 'ignore', '-c', code],
+        capture_output=True, text=True, env=env, check=True,
+    ).stdout
+    t, imported = json.loads(output.strip().splitlines()[-1])
+    return t, imported
+
+def benchmark_imports(modules=None, repeat=3, verbose=True):
+    """
+    Time cold-start imports and return a dictionary of results by module
+    name, including the minimum and median import times [s] and the watched
+    modules imported as a side effect.
+
+    """
+    if modules is None: modules = default_modules
+    results = {}
+    for module in modules:
+        times = []
+        for i in range(repeat):
+            t, imported = time_import(module)
+            times.append(t)
+        results[module] = dict(
+            min=min(times), median=float(np.median(times)), imported=imported,
+        )
+        if verbose:
+            print(f"{module}: {min(times):.3f} s (min), {np.median(times):.3f} s (median)")
+            for i in imported: print(f"    imports {i}")
+    return results
+
+if __name__ == '__main__':
+    benchmark_imports(sys.argv[1:] or None)
@@ -0,0 +1,140 @@
+# -*- coding: utf-8 -*-
+"""
+"""
+import numpy as np
+from biorefineries import TRY
+
+__all__ = (
+    'test_evaluate_across_specs_in_parallel',
+    'test_space_filling_orders',
+    'test_evaluate_across_specs_along_path',
+    'test_feasibility_boundary',
+)
+
+class MockTiterAndInhibitorsSpecification:
+    
+    def __init__(self):
+        self.infeasible_region = TRY.FeasibilityBoundary()
+
+class MockSpecification:
+    
+    def __init__(self):
+        self.titer_inhibitor_specification = MockTiterAndInhibitorsSpecification()
+
+    def evaluate_across_specs(self, system, spec_1, spec_2, metrics, spec_3):
+        self.count_exceptions = 0
+        infeasible_region = self.titer_inhibitor_specification.infeasible_region
+        infeasible_region.reset()
+        spec_1, spec_2 = np.broadcast_arrays(spec_1, spec_2)
+        results = []
+        for y, t in zip(spec_1.flat, spec_2.flat):
+            if infeasible_region.skip(y, t): 
+                results.append(np.nan * np.ones([len(metrics), len(spec_3)]))
+            elif t > 100 * y: # Infeasible sugar concentration
+                infeasible_region.add(y, t)
+                results.append(np.nan * np.ones([len(metrics), len(spec_3)]))
+            else:
+                results.append([[f(y, t, p) for p in spec_3] for f in metrics])
+        results = np.array(results)
+        return results.reshape([*spec_1.shape, *results.shape[1:]])
+
+def load_mock_specification():
+    metrics = [lambda y, t, p: y * t * p, lambda y, t, p: y + t + p]
+    return MockSpecification(), None, metrics
+
+def test_evaluate_across_specs_in_parallel():
+    yields = np.linspace(0.1, 0.9, 5)
+    titers = np.linspace(10, 100, 4)
+    productivities = np.array([0.5, 1.0, 1.5])
+    spec_1, spec_2 = np.meshgrid(yields, titers)
+    results, count_exceptions, simulations_avoided = TRY.evaluate_across_specs_in_parallel(
+        load_mock_specification, spec_1, spec_2, productivities,
+        processes=2, chunksize=3,
+    )
+    assert results.shape == (4, 5, 2, 3)
+    assert count_exceptions == 0
+    # Only the chunk with titers 10, 40, and 70 skips points (at a titer
+    # of 70 and yields of 0.1 and 0.3)
+    assert simulations_avoided == 2
+    spec, _, metrics = load_mock_specification()
+    expected = spec.evaluate_across_specs(
+        None, spec_1, spec_2, metrics, productivities
+    )
+    assert np.allclose(results, expected, equal_nan=True)
+    assert spec.titer_inhibitor_specification.infeasible_region.simulations_avoided == 5
+
+def test_space_filling_orders():
+    for order in (TRY.serpentine_order, TRY.hilbert_order):
+        for shape in [(4, 4), (3, 5), (6, 2)]:
+            indices = order(shape)
+            assert sorted(indices) == sorted(np.ndindex(*shape))
+    indices = np.array(TRY.serpentine_order((5, 7)))
+    assert (np.abs(np.diff(indices, axis=0)).sum(axis=1) == 1).all()
+    indices = np.array(TRY.hilbert_order((8, 8)))
+    assert (np.abs(np.diff(indices, axis=0)).sum(axis=1) == 1).all()
+
+class MockRecycleData:
+    
+    def __init__(self, system):
+        self.system = system
+        self.state = system.state
+        
+    def reset(self):
+        self.system.state = self.state
+    
+class MockSystem:
+    state = None
+    
+    def get_recycle_data(self):
+        return MockRecycleData(self)
+
+def test_evaluate_across_specs_along_path():
+    system = MockSystem()
+    seeds = {}
+    def f(spec, system, y, t, metrics, spec_3):
+        seeds[y, t] = system.state
+        if y > 0.8 and t > 90: return np.nan * np.ones([len(metrics), len(spec_3)])
+        system.state = (y, t)
+        return np.array([[y * t * p for p in spec_3]])
+    yields = np.linspace(0.1, 0.9, 5)
+    titers = np.linspace(10, 100, 4)
+    spec_1, spec_2 = np.meshgrid(yields, titers)
+    results, scheduler = TRY.evaluate_across_specs_along_path(
+        f, None, system, spec_1, spec_2, [None], [1., 2.], path='serpentine'
+    )
+    assert results.shape == (4, 5, 1, 2)
+    assert np.isnan(results[-1, -1]).all()
+    assert np.allclose(results[0, :, 0, 1], 2 * yields * titers[0])
+    assert scheduler.cold_starts == 1
+    assert scheduler.warm_starts == spec_1.size - 1
+    # Points are seeded from their nearest solved neighbor
+    assert seeds[yields[0], titers[1]] == (yields[1], titers[1])
+    assert seeds[yields[4], titers[1]] == (yields[4], titers[0])
+    assert seeds[yields[2], titers[1]] == (yields[3], titers[1])
+
+def test_feasibility_boundary():
+    boundary = TRY.FeasibilityBoundary()
+    # True infeasible region: titer > 200 * yield
+    yields = np.linspace(0.1, 0.9, 9)
+    titers = np.linspace(10, 190, 10)
+    simulated = 0
+    for t in titers:
+        for y in yields[::-1]:
+            if boundary.skip(y, t): continue
+            simulated += 1
+            if t > 200 * y: boundary.add(y, t)
+    assert simulated + boundary.simulations_avoided == yields.size * titers.size
+    assert boundary.simulations_avoided > 0
+    for y in yields:
+        for t in titers:
+            if boundary.is_infeasible(y, t): assert t > 200 * y
+    assert boundary.yields.size == boundary.titers.size
+    boundary.reset()
+    assert not boundary.is_infeasible(0.1, 190)
+    assert boundary.simulations_avoided == 0
+
+if __name__ == '__main__':
+    test_evaluate_across_specs_in_parallel()
+    test_space_filling_orders()
+    test_evaluate_across_specs_along_path()
+    test_feasibility_boundary()
@@ -0,0 +1,133 @@
+# -*- coding: utf-8 -*-
+"""
+"""
+import numpy as np
+from biorefineries.tea import BatchTEA
+
+__all__ = (
+    'test_batch_tea_economic_scenarios',
+    'test_batch_tea_capital_and_tax_scenarios',
+    'test_abm_evaluate_in_batches',
+)
+
+def installed_equipment_cost_subclass(cls, installed_equipment_cost):
+    return type(cls.__name__, (cls,), {
+        '__slots__': (),
+        'installed_equipment_cost': property(lambda self: installed_equipment_cost),
+    })
+
+def assert_scenarios_match_scalar_tea(tea, product, batch, scenarios):
+    NPV = batch.NPV
+    price = batch.solve_price(product)
+    IRR = batch.solve_IRR()
+    cls = tea.__class__
+    try:
+        for i, scenario in enumerate(scenarios):
+            for name, value in scenario.items():
+                if name == 'price':
+                    product.price = value
+                elif name == 'installed_equipment_cost':
+                    tea.__class__ = installed_equipment_cost_subclass(cls, value)
+                else:
+                    setattr(tea, name, value)
+            assert np.allclose(NPV[i], tea.NPV, rtol=1e-6, atol=1.)
+            assert np.allclose(price[i], tea.solve_price(product), rtol=1e-5)
+            # The scalar IRR solver may not converge at low IRRs, so the NPV
+            # is checked to break even within the tolerance of the batch IRR
+            tea.IRR = IRR[i] - 1e-6
+            assert tea.NPV > 0.
+            tea.IRR = IRR[i] + 1e-6
+            assert tea.NPV < 0.
+    finally:
+        tea.__class__ = cls
+
+def test_batch_tea_economic_scenarios():
+    from biorefineries import cornstover as cs
+    cs.load()
+    tea = cs.cornstover_tea
+    product = cs.ethanol
+    N = 8
+    rng = np.random.default_rng(0)
+    start = tea.duration[0]
+    IRR = rng.uniform(0.05, 0.20, N)
+    price = product.price * rng.uniform(0.8, 1.2, N)
+    end = start + rng.choice([20, 30], N)
+    operating_days = rng.uniform(300, 350, N)
+    income_tax = rng.uniform(0.15, 0.40, N)
+    depreciation = rng.choice(['MACRS5', 'MACRS7', 'MACRS10'], N)
+    batch = BatchTEA(
+        tea, IRR=IRR, duration=(np.full(N, start), end),
+        operating_days=operating_days, prices={product: price},
+        income_tax=income_tax, depreciation=depreciation,
+    )
+    scenarios = [
+        dict(IRR=IRR[i], price=price[i], duration=(start, int(end[i])),
+             operating_days=operating_days[i], income_tax=income_tax[i],
+             depreciation=str(depreciation[i]))
+        for i in range(N)
+    ]
+    original = dict(IRR=tea.IRR, price=product.price, duration=tea.duration,
+                    operating_days=tea.operating_days, income_tax=tea.income_tax,
+                    depreciation=tea.depreciation)
+    try:
+        assert_scenarios_match_scalar_tea(tea, product, batch, scenarios)
+    finally:
+        for name, value in original.items():
+            if name == 'price': product.price = value
+            else: setattr(tea, name, value)
+
+def assert_capital_and_tax_scenarios_match_scalar_tea(tea, product, N=6):
+    rng = np.random.default_rng(1)
+    installed_equipment_cost = tea.installed_equipment_cost * rng.uniform(0.7, 1.3, N)
+    income_tax = rng.uniform(0.15, 0.40, N)
+    depreciation = rng.choice(['MACRS5', 'MACRS7', 'MACRS10'], N)
+    # Replacement costs of units do not change with the installed equipment 
+    # cost of the scalar TEA
+    batch = BatchTEA(
+        tea, installed_equipment_cost=installed_equipment_cost,
+        income_tax=income_tax, depreciation=depreciation,
+        replacement_cost_factor=1.,
+    )
+    scenarios = [
+        dict(IRR=tea.IRR, installed_equipment_cost=installed_equipment_cost[i],
+             income_tax=income_tax[i], depreciation=str(depreciation[i]))
+        for i in range(N)
+    ]
+    original = dict(IRR=tea.IRR, income_tax=tea.income_tax,
+                    depreciation=tea.depreciation)
+    try:
+        assert_scenarios_match_scalar_tea(tea, product, batch, scenarios)
+    finally:
+        for name, value in original.items(): setattr(tea, name, value)
+
+def test_batch_tea_capital_and_tax_scenarios():
+    from biorefineries import cornstover as cs
+    cs.load()
+    assert_capital_and_tax_scenarios_match_scalar_tea(cs.cornstover_tea, cs.ethanol)
+    from biorefineries import sugarcane as sc
+    sc.load()
+    assert_capital_and_tax_scenarios_match_scalar_tea(sc.tea, sc.ethanol)
+
+def test_abm_evaluate_in_batches():
+    from biorefineries.abm import cornstover as abm
+    model = abm.ABM_TEA_model
+    # The last two samples are evaluated in one batch (same operating days,
+    # plant capacity, and feedstock composition)
+    samples = np.array([
+        [0.05159, 0.08, 0.80, 350.4, 0.10, 2020, 2050, 876072883, 0.1],
+        [0.06000, 0.09, 0.85, 350.4, 0.15, 2020, 2050, 876072883, 0.9],
+        [0.05500, 0.08, 0.70, 330.0, 0.12, 2020, 2040, 876072883, 0.5],
+        [0.06500, 0.10, 0.90, 330.0, 0.08, 2025, 2055, 876072883, 0.5],
+    ])
+    model.load_samples(samples)
+    model.evaluate()
+    expected = model.table.values.copy()
+    abm.evaluate_in_batches()
+    # Simulations start from different states, so results only agree 
+    # within the convergence of the system
+    assert np.allclose(model.table.values, expected, rtol=1e-2, equal_nan=True)
+
+if __name__ == '__main__':
+    test_batch_tea_economic_scenarios()
+    test_batch_tea_capital_and_tax_scenarios()
+    test_abm_evaluate_in_batches()
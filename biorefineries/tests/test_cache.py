@@ -0,0 +1,35 @@
+# -*- coding: utf-8 -*-
+"""
+"""
+import gc
+import weakref
+import biosteam as bst
+from biorefineries import cellulosic
+from biorefineries.cellulosic import BiorefineryCache
+
+__all__ = (
+    'test_evicted_biorefinery_is_collected_and_restored',
+)
+
+def test_evicted_biorefinery_is_collected_and_restored(tmp_path):
+    cache = BiorefineryCache(maxsize=1, folder=str(tmp_path))
+    br = cellulosic.Biorefinery(cache=cache)
+    MESP = br.tea.solve_price(br.ethanol)
+    ID = br.flowsheet.ID
+    ref = weakref.ref(br)
+    del br
+    other = cellulosic.Biorefinery(include_blowdown_recycle=True, cache=cache)
+    gc.collect()
+    assert ref() is None
+    assert bst.Flowsheet.flowsheet.__dict__[ID] is other.flowsheet
+    assert cache.info().evictions == 1
+    assert len(list(tmp_path.iterdir())) == 1
+    br = cellulosic.Biorefinery(cache=cache)
+    assert cache.info().hits == 1
+    assert br.tea.solve_price(br.ethanol) == MESP
+    br.sys.simulate()
+    assert abs(br.tea.solve_price(br.ethanol) - MESP) < 1e-3 * MESP
+
+if __name__ == '__main__':
+    import tempfile, pathlib
+    test_evicted_biorefinery_is_collected_and_restored(pathlib.Path(tempfile.mkdtemp()))
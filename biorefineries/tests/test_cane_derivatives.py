@@ -0,0 +1,91 @@
+# -*- coding: utf-8 -*-
+"""
+"""
+import numpy as np
+import biosteam as bst
+from biorefineries.cane.derivatives import BaseStateMetrics
+
+__all__ = (
+    'test_base_state_is_discarded_after_failed_sample',
+    'test_derivatives_match_resimulation',
+)
+
+def test_base_state_is_discarded_after_failed_sample():
+    state = {}
+    model = bst.Model(None, specification=lambda: None, exception_hook='ignore')
+
+    @model.parameter
+    def set_x(x): state['x'] = x
+
+    @model.metric
+    def first():
+        base_state.save()
+        if state['x'] == 1.: raise RuntimeError('sample failed after saving')
+        return state['x']
+
+    @model.metric
+    def second():
+        return 10. * state['x']
+
+    base_state = BaseStateMetrics([second])
+    base_state.record_parameters(model._parameters)
+    model.load_samples(np.array([[1.], [2.]]))
+    model.evaluate()
+    first, second = [model.table[i.index].values for i in model.metrics]
+    assert np.isnan(first[0]) and np.isnan(second[0])
+    assert first[1] == 2. and second[1] == 20.
+
+def test_derivatives_match_resimulation():
+    from biorefineries import cane
+    br = cane.Biorefinery('O1')
+    model = br.model
+    metrics = {i.getter.__name__: i for i in model.metrics}
+    base_metrics = ('MFPP', 'ROI', 'IRR', 'TCI', 'ethanol_production',
+                    'biodiesel_production', 'competitive_biomass_yield')
+    derivative_metrics = ('MFPP', 'TCI', 'ethanol_production', 'biodiesel_production')
+    columns = [
+        *[metrics[i].index for i in base_metrics],
+        *[metrics[i + '_derivative'].index for i in derivative_metrics],
+    ]
+    derivative_disabled = br._derivative_disabled
+    ROI_target = br.ROI_target
+    np.random.seed(1)
+    samples = model.sample(2, 'L')
+    try:
+        br.ROI_target = 10.
+        cane.Biorefinery.enable_derivative()
+        model.load_samples(samples)
+        model.evaluate()
+        values = model.table[columns].values
+        # Brute force: simulate each sample at the base point (for base
+        # state metrics) and at the perturbed oil content (for derivatives)
+        cane.Biorefinery.disable_derivative()
+        expected = []
+        step = br.derivatives.step
+        for sample in samples:
+            model(sample)
+            br.sys.simulate()
+            # The competitive biomass yield perturbs the system, so it is last
+            base = [metrics[i]() for i in base_metrics]
+            oil = br.composition_specification.oil
+            br.composition_specification.load_oil_content(oil + step)
+            br.sys.simulate()
+            perturbed = [metrics[i]() for i in derivative_metrics]
+            br.composition_specification.load_oil_content(oil)
+            expected.append([
+                *base, *[(j - base[base_metrics.index(i)]) * br.derivatives.unit / step
+                         for i, j in zip(derivative_metrics, perturbed)]
+            ])
+    finally:
+        br.ROI_target = ROI_target
+        cane.Biorefinery.disable_derivative(derivative_disabled)
+    expected = np.array(expected)
+    N = len(base_metrics)
+    # Results agree within the convergence of the system (which is
+    # amplified by finite differences)
+    assert np.allclose(values[:, :N], expected[:, :N], rtol=1e-3)
+    assert np.allclose(values[:, N:], expected[:, N:], rtol=5e-2)
+
+if __name__ == '__main__':
+    test_base_state_is_discarded_after_failed_sample()
+    test_derivatives_match_resimulation()
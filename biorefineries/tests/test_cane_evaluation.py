@@ -0,0 +1,43 @@
+# -*- coding: utf-8 -*-
+"""
+"""
+import numpy as np
+
+__all__ = (
+    'test_sample_chunks_match_serial_evaluation',
+)
+
+def test_sample_chunks_match_serial_evaluation():
+    from biorefineries import cane
+    from biorefineries.cane.evaluation import (
+        _evaluate_samples_chunk, load_uncertainty_samples
+    )
+    name = 'S1'
+    N = 4
+    derivative_disabled = cane.Biorefinery._derivative_disabled
+    try:
+        # Chunks are evaluated in this process (as by each worker of the pool)
+        chunks = [
+            _evaluate_samples_chunk(
+                (name, N, 'L', chunk, 2, False, False, False, True, True, {})
+            )
+            for chunk in range(2)
+        ]
+        br = cane.Biorefinery(name)
+        load_uncertainty_samples(br, N)
+        br.model.evaluate()
+        columns = [i.index for i in br.model.metrics]
+        expected = br.model.table[columns].values
+    finally:
+        cane.Biorefinery.disable_derivative(derivative_disabled)
+    assert [(start, stop) for _, start, stop, *_ in chunks] == [(0, 2), (2, 4)]
+    data = np.concatenate([values for _, _, _, values, _ in chunks])
+    assert not np.isnan(data).all()
+    # Chunks start from different states, so results only agree within the
+    # convergence of the system
+    assert np.allclose(data, expected, rtol=1e-3, equal_nan=True)
+    # Telemetry is indexed by the sample number of the whole evaluation
+    assert [list(tables[0].index) for *_, tables in chunks] == [[0, 1], [2, 3]]
+
+if __name__ == '__main__':
+    test_sample_chunks_match_serial_evaluation()
@@ -0,0 +1,38 @@
+# -*- coding: utf-8 -*-
+"""
+"""
+import sys
+import subprocess
+from importlib import import_module
+
+__all__ = (
+    'test_lazy_names_match_submodules',
+    'test_missing_names_do_not_load_submodules',
+)
+
+def test_lazy_names_match_submodules():
+    from biorefineries import cane
+    for name, names in cane._lazy_submodules.items():
+        module = import_module(f'biorefineries.cane.{name}')
+        assert tuple(module.__all__) == names, name
+
+def test_missing_names_do_not_load_submodules():
+    # Run in a fresh interpreter so that no submodules are loaded yet
+    code = (
+        "import sys\n"
+        "from biorefineries import cane\n"
+        "assert not hasattr(cane, '__wrapped__')\n"
+        "assert not hasattr(cane, 'missing_name')\n"
+        "lazy = [f'biorefineries.cane.{i}' for i in cane._lazy_submodules]\n"
+        "assert not any([i in sys.modules for i in lazy])\n"
+        "cane.ContourEngine\n"
+        "assert 'biorefineries.cane.contour_engine' in sys.modules\n"
+        "assert 'biorefineries.cane.contour_plots' not in sys.modules\n"
+        "assert 'plot_all' in cane.__all__\n"
+        "assert 'biorefineries.cane.uncertainty_plots' not in sys.modules\n"
+    )
+    subprocess.run([sys.executable, '-c', code], check=True)
+
+if __name__ == '__main__':
+    test_lazy_names_match_submodules()
+    test_missing_names_do_not_load_submodules()
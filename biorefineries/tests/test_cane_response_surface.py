@@ -0,0 +1,79 @@
+# -*- coding: utf-8 -*-
+"""
+"""
+import numpy as np
+from biorefineries.cane.response_surface import ResponseSurface
+
+__all__ = (
+    'test_response_surface_predictions_and_validation',
+    'test_biomass_yield_surface_depends_on_settings',
+)
+
+def responses(features):
+    x, y = features
+    return (2. * x - y + 1., 3. * np.exp(0.5 * x + y))
+
+def test_response_surface_predictions_and_validation():
+    surface = ResponseSurface(log=(False, True), N_min=5, tolerance=1e-6,
+                              validation_interval=3)
+    rng = np.random.default_rng(0)
+    training = rng.uniform(0., 1., [5, 2])
+    for features in training[:-1]:
+        assert surface.predict(features) is None
+        surface.add(features, responses(features))
+    assert not surface.ready
+    surface.add(training[-1], responses(training[-1]))
+    assert surface.ready
+
+    # Predictions are exact for linear and power-law responses within the
+    # bounds of the training data
+    features = training.mean(axis=0)
+    assert np.allclose(surface.predict(features), responses(features))
+    assert surface.predict([2., 0.5]) is None
+    features = 0.5 * (training[0] + training[1])
+    assert np.allclose(surface.predict(features), responses(features))
+    assert surface.predictions == 2
+
+    # Every third prediction is simulated for validation
+    features = 0.5 * (training[1] + training[2])
+    assert surface.predict(features) is None
+    surface.add(features, responses(features))
+    assert surface.validations == 1 and surface.failures == 0
+    assert surface.ready
+
+    # Failed validations suspend predictions until enough samples are
+    # simulated and refit
+    for i in range(2):
+        features = 0.5 * (training[2] + training[3]) + 0.01 * i
+        assert surface.predict(features) is not None
+    assert surface.predict(features) is None
+    surface.add(features, 1.1 * np.array(responses(features)))
+    assert surface.failures == 1 and not surface.ready
+    coefficients = surface.coefficients
+    for features in rng.uniform(0., 1., [2, 2]):
+        surface.add(features, responses(features))
+        assert surface.coefficients is not coefficients
+        coefficients = surface.coefficients
+    assert not surface.ready
+    surface.add(features, responses(features))
+    assert surface.ready
+    assert len(surface.features) == 10
+    surface.reset()
+    assert not surface.ready and not surface.features
+
+def test_biomass_yield_surface_depends_on_settings():
+    from biorefineries import cane
+    br = cane.Biorefinery('O1')
+    surface = br.biomass_yield_surface
+    income_tax_range = cane.Biorefinery.default_income_tax_range
+    try:
+        cane.Biorefinery.default_income_tax_range = [21, 21 + 1e-6]
+        assert cane.Biorefinery('O1') is br
+        assert br.biomass_yield_surface is not surface
+    finally:
+        cane.Biorefinery.default_income_tax_range = income_tax_range
+    assert cane.Biorefinery('O1').biomass_yield_surface is surface
+
+if __name__ == '__main__':
+    test_response_surface_predictions_and_validation()
+    test_biomass_yield_surface_depends_on_settings()
@@ -0,0 +1,38 @@
+# -*- coding: utf-8 -*-
+"""
+"""
+import pytest
+import numpy as np
+import thermosteam as tmo
+from biorefineries.partition_surrogate import PartitionSurrogate
+
+__all__ = (
+    'test_surrogate_predictions_require_a_fit',
+)
+
+def test_surrogate_predictions_require_a_fit():
+    thermo = tmo.Thermo(['Water', 'Methanol', 'Octanol'], cache=True)
+    surrogate = PartitionSurrogate(('Water', 'Methanol', 'Octanol'), 'Octanol',
+                                   thermo=thermo, refit=2)
+    def logK(features):
+        T, x_water, x_methanol = features
+        return np.array([T / 300. - x_water, 1. + x_methanol, 2. - x_water])
+    features = np.array([300., 0.3, 0.1])
+    with pytest.raises(RuntimeError, match='not enough'):
+        surrogate.predict(features)
+    # Degenerate points (along a line) cannot be fitted
+    for i in np.linspace(0., 1., 5):
+        point = np.array([288. + 16. * i, 0.25 + 0.5 * i, 0.125 + 0.25 * i])
+        surrogate.add(point, np.exp(logK(point)))
+    for method in (surrogate.predict, surrogate.in_trust_region):
+        with pytest.raises(RuntimeError, match='degenerate'):
+            method(features)
+    # Refits are attempted once `refit` more points are learned
+    rng = np.random.default_rng(0)
+    for point in rng.uniform([290., 0.2, 0.05], [310., 0.4, 0.15], [2, 3]):
+        surrogate.add(point, np.exp(logK(point)))
+    assert surrogate.in_trust_region(features)
+    assert np.allclose(surrogate.predict(features), np.exp(logK(features)), rtol=1e-2)
+
+if __name__ == '__main__':
+    test_surrogate_predictions_require_a_fit()
@@ -0,0 +1,61 @@
+# -*- coding: utf-8 -*-
+"""
+"""
+import numpy as np
+import biosteam as bst
+
+__all__ = (
+    'test_cellulosic_snapshot_round_trip',
+    'test_cane_snapshot_round_trip',
+)
+
+def unit_IDs(flowsheet):
+    return [i.ID for i in flowsheet.unit]
+
+def test_cellulosic_snapshot_round_trip(tmp_path):
+    from biorefineries import cellulosic
+    file = tmp_path / 'cellulosic.snapshot'
+    br = cellulosic.Biorefinery(cache=None)
+    MESP = br.tea.solve_price(br.ethanol)
+    br.save(file)
+    # Default unit IDs of flowsheets constructed later do not match the saved ones
+    cellulosic.Biorefinery(include_blowdown_recycle=True, cache=None)
+    ticket_numbers = bst.Unit.ticket_numbers.copy()
+    loaded = cellulosic.Biorefinery.load(file)
+    assert bst.Unit.ticket_numbers == ticket_numbers
+    assert unit_IDs(loaded.flowsheet) == unit_IDs(br.flowsheet)
+    assert loaded.tea.solve_price(loaded.ethanol) == MESP
+    loaded.sys.simulate()
+    assert abs(loaded.tea.solve_price(loaded.ethanol) - MESP) < 1e-3 * MESP
+
+def test_cane_snapshot_round_trip(tmp_path):
+    from biorefineries import cane
+    file = tmp_path / 'cane.snapshot'
+    br = cane.Biorefinery('S1', cache=None)
+    columns = [i.index for i in br.model.metrics]
+    metrics = {i.getter.__name__: i for i in br.model.metrics}
+    MFPP = metrics['MFPP']()
+    TCI = metrics['TCI']()
+    br.save(file)
+    ticket_numbers = bst.Unit.ticket_numbers.copy()
+    loaded = cane.Biorefinery.load(file)
+    assert bst.Unit.ticket_numbers == ticket_numbers
+    assert unit_IDs(loaded.flowsheet) == unit_IDs(br.flowsheet)
+    metrics = {i.getter.__name__: i for i in loaded.model.metrics}
+    # Unit costs are summed in arbitrary order
+    assert abs(metrics['MFPP']() - MFPP) < 1e-9 * MFPP
+    assert abs(metrics['TCI']() - TCI) < 1e-9 * TCI
+    # Models of loaded biorefineries evaluate as the saved ones
+    np.random.seed(1)
+    samples = br.model.sample(2, 'L')
+    for i in (br, loaded):
+        i.model.load_samples(samples)
+        i.model.evaluate()
+    values = loaded.model.table[columns].values
+    assert not np.isnan(values).all()
+    assert np.allclose(values, br.model.table[columns].values, rtol=1e-3, equal_nan=True)
+
+if __name__ == '__main__':
+    import tempfile, pathlib
+    test_cellulosic_snapshot_round_trip(pathlib.Path(tempfile.mkdtemp()))
+    test_cane_snapshot_round_trip(pathlib.Path(tempfile.mkdtemp()))
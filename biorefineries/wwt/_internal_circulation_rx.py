@@ -17,7 +17,8 @@ TODO:
     - Check with Brian's AnMBR paper and see the COD<1300 mg/L not preferable thing
 '''
 
-import sympy as sp, biosteam as bst
+from math import sqrt
+import biosteam as bst
 from biosteam.exceptions import DesignError
 from . import (
     get_BD_dct,
@@ -246,24 +247,8 @@ class InternalCirculationRx(bst.MixTank):
     def _run_separate(self, run_inputs):
         Qi, Si, Xi, Qe, Se, Vliq, Y, mu_max, b, Fxb, Fxt = run_inputs
 
-        Qw = Qi - Qe
-        Xb, Xe, Sb, Vb = sp.symbols('Xb, Xe, Sb, Vb', real=True)
-
-        # Mass balances based on biomass/substrate changes in the bottom/top rx,
-        # (0 at steady state)
-        biomass_b = Qi*Xi - (Qe*Xb*Fxb+Qw*Xb) + Xb*Vb*(mu_max-b)
-        biomass_t = Qe*(Fxb*Xb-Fxt*Xe) + Xe*(Vliq-Vb)*(mu_max-b)
-        substrate_b = Qi*(Si-Sb) - mu_max*(Xb*Vb/Y)
-        substrate_t = Qe*(Sb-Se) - mu_max*((Vliq-Vb)*Xe/Y)
-
         parameters = (Qi, Qe, Si, Se, Vliq)
-
-        results = sp.solve(
-            (sp.Eq(biomass_b, 0),
-             sp.Eq(biomass_t, 0),
-             sp.Eq(substrate_b, 0),
-             sp.Eq(substrate_t, 0)), (Xb, Xe, Sb, Vb))
-
+        results = self._solve_separate(*run_inputs)
         Xb, Xe, Sb, Vb = self._filter_results('separate', parameters, results)
 
         Vt = Vliq - Vb # volume of the top rx, m3
@@ -271,6 +256,59 @@ class InternalCirculationRx(bst.MixTank):
         return Xb, Xe
 
 
+    @staticmethod
+    def _solve_separate(Qi, Si, Xi, Qe, Se, Vliq, Y, mu_max, b, Fxb, Fxt):
+        r'''
+        Return all real (Xb, Xe, Sb, Vb) roots of the steady-state mass balances
+        of the bottom and top reactors:
+
+        .. math::
+            Q_i X_i - (Q_e F_{xb} + Q_w) X_b + X_b V_b (\mu_{max}-b) = 0
+
+            Q_e (F_{xb} X_b - F_{xt} X_e) + X_e V_t (\mu_{max}-b) = 0
+
+            Q_i (S_i - S_b) - \mu_{max} X_b V_b / Y = 0
+
+            Q_e (S_b - S_e) - \mu_{max} X_e V_t / Y = 0
+
+        Eliminating the biomass concentrations and Sb gives a quadratic in Vb
+        (with Vt = Vliq - Vb), so the roots are computed in closed form.
+        '''
+        Qw = Qi - Qe
+        k = mu_max - b # net specific growth rate
+        c = mu_max / Y
+        A = Qe*Fxb + Qw
+        D = Qe*Fxt - k*Vliq
+        dS = Si - Se
+        a2 = -dS*k*k - c*Xi*k
+        a1 = dS*k*(A-D) - c*Xi*(D-Qi*Fxb)
+        a0 = dS*A*D - c*Xi*Qi*Fxb*Vliq
+        if a2 == 0:
+            Vbs = () if a1 == 0 else (-a0/a1,)
+        else:
+            disc = a1*a1 - 4*a2*a0
+            if disc < 0: Vbs = ()
+            else:
+                sqrt_disc = sqrt(disc)
+                Vbs = ((-a1+sqrt_disc)/(2*a2), (-a1-sqrt_disc)/(2*a2))
+
+        results = []
+        for Vb in Vbs:
+            Vt = Vliq - Vb
+            denominator = Qe*Fxt - k*Vt
+            if denominator == 0: # no biomass retained in the bottom rx
+                if Vt == 0: continue
+                Xb = 0.
+                Sb = Si
+                Xe = Qe*dS/(c*Vt)
+            else:
+                Xb = dS / (c*(Vb/Qi + Fxb*Vt/denominator))
+                Xe = Qe*Fxb*Xb / denominator
+                Sb = Si - c*Xb*Vb/Qi
+            results.append((Xb, Xe, Sb, Vb))
+        return results
+
+
     @staticmethod
     def _filter_results(method, parameters, results):
         '''Check if the solution satisfies the design constraints.'''
@@ -298,6 +336,8 @@ class InternalCirculationRx(bst.MixTank):
             index = Xbs.index(min(Xbs)) # choose the one with lowest effluent biomass
             return solutions[index]
 
+        return solutions[0]
+
 
     _units = {
         'HRT': 'hr',
@@ -59,6 +59,7 @@ __all__ = (
     # Digestion
     'get_BD_dct',
     'get_digestable_chemicals',
+    'get_stoichiometric_vectors', 'clear_stoichiometric_vectors',
     'compute_stream_COD', 'get_COD_breakdown',
     'get_CN_ratio',
     'get_digestion_rxns',
@@ -355,6 +356,40 @@ def get_BD_dct(chemicals, default_BD=1, **kwargs):
     return BD_dct
 
 
+# Keyed by id(chemicals), values are (chemicals, chemicals.tuple, vectors);
+# the chemicals object is kept so that its id cannot be reused
+_stoichiometric_vectors = {}
+_MW_O2 = molecular_weight({'O': 2})
+
+def get_stoichiometric_vectors(chemicals):
+    r'''
+    Return a dict with the CHONSP atom counts (as a N x 6 array),
+    theoretical COD (in mol O2/mol chemical), and theoretical BMP
+    (in mol CH4/mol chemical) of each chemical in the compiled `chemicals`.
+
+    Vectors are cached per chemicals object and rebuilt if the
+    chemicals change, see also :func:`clear_stoichiometric_vectors`.
+    '''
+    chemicals_tuple = chemicals.tuple
+    cached = _stoichiometric_vectors.get(id(chemicals))
+    if cached and cached[1] is chemicals_tuple: return cached[2]
+    vectors = {
+        'CHONSP': np.array([get_CHONSP(i) for i in chemicals_tuple], dtype=float).reshape(-1, 6),
+        'COD': np.array([-get_COD_stoichiometry(i)['O2'] for i in chemicals_tuple], dtype=float),
+        'BMP': np.array([get_BMP_stoichiometry(i)['CH4'] for i in chemicals_tuple], dtype=float),
+        }
+    _stoichiometric_vectors[id(chemicals)] = (chemicals, chemicals_tuple, vectors)
+    return vectors
+
+
+def clear_stoichiometric_vectors():
+    '''
+    Clear the cached stoichiometric vectors
+    (e.g., after changing the formula or locked state of chemicals).
+    '''
+    _stoichiometric_vectors.clear()
+
+
 def compute_stream_COD(stream):
     r'''
     Compute the chemical oxygen demand (COD) of a given stream in kg-O2/m3
@@ -363,38 +398,35 @@ def compute_stream_COD(stream):
     .. math::
         COD [\frac{kg}{m^3}] = mol_{chemical} [\frac{kmol}{m^3}] * \frac{g O_2}{mol chemical}
     '''
-    chems = stream.chemicals
-    mol = stream.mol
-    if stream.F_vol == 0: return 0
-    iCOD = np.array([-get_COD_stoichiometry(i)['O2'] for i in chems])
-    COD = (mol*iCOD).sum()*molecular_weight({'O': 2}) / stream.F_vol
-    return COD
+    F_vol = stream.F_vol
+    if F_vol == 0: return 0
+    iCOD = get_stoichiometric_vectors(stream.chemicals)['COD']
+    return stream.mol.dot(iCOD)*_MW_O2 / F_vol
 
 
 def get_COD_breakdown(stream):
     '''
-    Print the estimated breakdown of COD resulting from each chemical
-    by creating a new mock stream with the same water flowrate as
-    the original stream, then copying the flowrate of each chemical
-    at a time and calculate the COD.
+    Print the estimated breakdown of COD resulting from each chemical,
+    calculated as the COD of a mock liquid stream (at 25°C and 1 atm) with
+    the same water flowrate as the original stream and only that chemical.
     '''
     chems = stream.chemicals
     COD = compute_stream_COD(stream)
     print(f'\nTotal COD of {stream.ID}: {round(COD*1000, 2)} mg/L:')
-    foo = tmo.Stream()
-    foo.imass['Water'] = stream.imass['Water']
-    COD_dct = {}
-    for chem in chems:
-        if chem is chems.Water: continue
-        chem_ID = chem.ID
-        foo.copy_flow(stream, (chem_ID,))
-        chem_COD = compute_stream_COD(foo)
-        if chem_COD == 0: continue
-        COD_dct[chem_ID] = chem_COD
-        foo.imass[chem_ID] = 0
+    mol = stream.mol.to_array()
+    O2 = mol * get_stoichiometric_vectors(chems)['COD']
+    water_index = chems.index('Water')
+    O2[water_index] = 0
+    index, = np.nonzero(O2)
+    # Molar volumes of the mock stream, m3/kmol
+    V_models = stream.mixture.V.models
+    V = 1000. * np.array([V_models[i]('l', 298.15, 101325.) for i in index])
+    V_water = 1000. * V_models[water_index]('l', 298.15, 101325.)
+    F_vol = mol[water_index]*V_water + mol[index]*V
+    chem_CODs = O2[index]*_MW_O2 / F_vol
     df = pd.DataFrame({
-        'ID': COD_dct.keys(),
-        'COD [mg/L]': COD_dct.values(),
+        'ID': [chems.IDs[i] for i in index],
+        'COD [mg/L]': chem_CODs,
         })
     df['ratio'] = df.iloc[:,1]/COD
     df.iloc[:,1] *= 1000
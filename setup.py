@@ -36,6 +36,7 @@ setup(
                            'biodiesel/*',
                            'biodiesel/units/*',
                            'tea/*',
+                           'TRY/*',
                            'lipidcane/*', 
                            'lipidcane/utils/*', 
                            'oilcane/*',